@@ -65,6 +65,109 @@ def safety(s: Session) -> None:
     s.run("safety", "check")
 
 
+@session(python=python)
+def startup(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/startup.py")
+
+
+@session(python=python)
+def interactions(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/interactions.py")
+
+
+@session(python=python)
+def moderation(s: Session) -> None:
+    s.run("python", "scripts/moderation.py")
+
+
+@session(python=python)
+def scheduler(s: Session) -> None:
+    s.run("python", "scripts/scheduler.py")
+
+
+@session(python=python)
+def gateway(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/gateway.py")
+
+
+@session(python=python)
+def logs(s: Session) -> None:
+    s.run("python", "scripts/logs.py")
+
+
+@session(python=python)
+def playlists(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/playlists.py")
+
+
+@session(python=python)
+def replay(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/replay.py")
+
+
+@session(python=python)
+def memory(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/memory.py")
+
+
+@session(python=python)
+def panels(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/panels.py")
+
+
+@session(python=python)
+def workers(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/workers.py")
+
+
+@session(python=python)
+def autoplay(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/autoplay.py")
+
+
+@session(python=python)
+def errors(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/errors.py")
+
+
+@session(python=python)
+def dashboard(s: Session) -> None:
+    if python:
+        s.install("-r", "requirements.txt")
+
+    s.run("python", "scripts/dashboard.py")
+
+
 def clean(s: Session) -> None:
     s.run("python", "scripts/clean.py")
 
@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+
+from playlists import encode_track
+
+TRACKS = int(os.environ.get("AUTOPLAY_TRACKS", "20000"))
+PAIRINGS = int(os.environ.get("AUTOPLAY_PAIRINGS", "300000"))
+LOOKUPS = int(os.environ.get("AUTOPLAY_LOOKUPS", "100000"))
+# Tracks are listened to in clusters of this size, like genres.
+CLUSTER = 200
+
+
+def main() -> None:
+    """
+    Feed ``PAIRINGS`` back to back plays, drawn from clusters of tracks,
+    into a co-occurrence index, then time ``LOOKUPS`` top-k lookups, and
+    check that recommendations stay in the cluster they came from.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from zeusbot.utils import CoOccurrenceIndex
+    from zeusbot.utils.playlists import b64decode, decode_track
+
+    rng = random.Random(0)
+    tracks = [
+        decode_track(b64decode(encode_track(rng, i))) for i in range(TRACKS)
+    ]
+    cluster = {
+        track.identifier: i // CLUSTER for i, track in enumerate(tracks)
+    }
+
+    tracemalloc.start()
+    index = CoOccurrenceIndex(capacity=TRACKS // 2, half_life=PAIRINGS // 4)
+    started_at = perf_counter()
+
+    for _ in range(PAIRINGS):
+        first = rng.randrange(TRACKS)
+        start = first - first % CLUSTER
+
+        # Mostly within the cluster, sometimes anywhere.
+        if rng.random() < 0.9:
+            second = start + rng.randrange(CLUSTER)
+
+        else:
+            second = rng.randrange(TRACKS)
+
+        index.observe(tracks[first], tracks[second])
+
+    observing = perf_counter() - started_at
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    kept = [track for track in tracks if track.identifier in index]
+    lookups = [rng.choice(kept).identifier for _ in range(LOOKUPS)]
+    started_at = perf_counter()
+
+    for identifier in lookups:
+        index.top(identifier, 5)
+
+    lookup = (perf_counter() - started_at) / LOOKUPS
+    hits = total = 0
+
+    for identifier in lookups[:1000]:
+        if (encoded := index.recommend(identifier)) is not None:
+            total += 1
+            picked = decode_track(b64decode(encoded)).identifier
+            hits += cluster[picked] == cluster[identifier]
+
+    print(
+        f"{PAIRINGS} pairings of {TRACKS} tracks in {observing:.2f}s "
+        f"({observing / PAIRINGS * 1e6:.1f}us each)"
+    )
+    print(
+        f"kept {len(index)} tracks and {index.edges} edges "
+        f"in {size / 2**20:.1f}MiB"
+    )
+    print(
+        f"top 5 lookup: {lookup * 1e6:.1f}us, "
+        f"{hits}/{total} recommendations in the same cluster"
+    )
+
+
+if __name__ == "__main__":
+    main()
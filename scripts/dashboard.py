@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+from time import perf_counter, time
+
+VIEWERS = int(os.environ.get("DASHBOARD_VIEWERS", "2000"))
+GUILDS = int(os.environ.get("DASHBOARD_GUILDS", "4"))
+CHANGES = int(os.environ.get("DASHBOARD_CHANGES", "200"))
+DURATION = float(os.environ.get("DASHBOARD_DURATION", "5"))
+
+
+class Player:
+    """Stands in for a guild's player, changing as commands would."""
+
+    def __init__(self, rng: random.Random, guild_id: int) -> None:
+        self.rng = rng
+        self.queue = [self.track(guild_id, i) for i in range(30)]
+        self.paused = False
+        self.volume = 100
+        self.started_at = int(time() * 1000)
+        self.added = 30
+        self.guild_id = guild_id
+
+    @staticmethod
+    def track(guild_id: int, index: int) -> dict:
+        return {
+            "identifier": f"{guild_id}-{index}",
+            "title": f"Track {index} of guild {guild_id}",
+            "author": "Someone",
+            "uri": f"https://example.com/watch?v={guild_id}-{index}",
+            "length": 200_000,
+            "requester": "1",
+        }
+
+    def change(self) -> None:
+        kind = self.rng.choice(("end", "queue", "pause", "volume", "remove"))
+
+        if kind == "end" and len(self.queue) > 1:
+            del self.queue[0]
+            self.started_at = int(time() * 1000)
+
+        elif kind == "queue":
+            self.queue.append(self.track(self.guild_id, self.added))
+            self.added += 1
+
+        elif kind == "pause":
+            self.paused = not self.paused
+
+        elif kind == "volume":
+            self.volume = self.rng.randrange(1, 101)
+
+        elif len(self.queue) > 2:
+            del self.queue[self.rng.randrange(1, len(self.queue))]
+
+    async def state(self) -> dict:
+        return {
+            "track": self.queue[0],
+            "paused": self.paused,
+            "position": 1000 if self.paused else None,
+            "started_at": None if self.paused else self.started_at,
+            "volume": self.volume,
+            "repeat": False,
+            "queue_repeat": False,
+            "autoplay": False,
+            "queued": len(self.queue) - 1,
+            "queue": self.queue[1:101],
+        }
+
+
+def apply(state: dict, message: dict) -> None:
+    """Apply a change to a state, as the dashboard's page would."""
+
+    state.update(message.get("set", {}))
+
+    if "queue" in message:
+        start, removed, inserted = message["queue"]
+        stop = start + removed
+        state["queue"][start:stop] = inserted
+
+
+async def view(session, url: str, states: dict, guild_id: int) -> dict:
+    """
+    Follow a guild's player, returning the messages received, and the
+    bytes of those that were not snapshots.
+    """
+
+    received = {"bytes": 0, "messages": 0, "snapshots": 0, "state": None}
+    snapshot_bytes = 0
+
+    async with session.ws_connect(url) as websocket:
+        states.setdefault(guild_id, []).append(received)
+
+        async for frame in websocket:
+            received["bytes"] += len(frame.data)
+            received["messages"] += 1
+            message = json.loads(frame.data)
+
+            if "state" in message:
+                snapshot_bytes += len(frame.data)
+                received["snapshots"] += 1
+                received["state"] = message["state"]
+
+            else:
+                apply(received["state"], message)
+
+            received["version"] = message["v"]
+
+    received["bytes"] -= snapshot_bytes
+
+    return received
+
+
+async def main() -> None:
+    """
+    Connect ``VIEWERS`` websockets, spread over ``GUILDS`` guilds, to the
+    dashboard, make ``CHANGES`` player changes over ``DURATION`` seconds,
+    and check that every viewer ends up with its player's state, from the
+    changes alone.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from aiohttp import ClientSession, TCPConnector
+
+    import zeusbot.utils.dashboard as dashboard
+    from zeusbot.bot.dashboard import DashboardApp
+    from zeusbot.utils import Metrics, PlayerFeeds
+    from zeusbot.utils.player import PlayerEvent
+
+    encoded = 0
+    encode = dashboard._encode
+
+    def counting(message):
+        nonlocal encoded
+        encoded += 1
+        return encode(message)
+
+    dashboard._encode = counting
+    rng = random.Random(0)
+    players = {guild_id: Player(rng, guild_id) for guild_id in range(GUILDS)}
+    metrics = Metrics()
+    feeds = PlayerFeeds(metrics, interval=0.1)
+    feeds.render = lambda guild_id: players[guild_id].state()
+    app = DashboardApp(feeds)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    await app.start("127.0.0.1", port)
+    states: dict = {}
+
+    async with ClientSession(connector=TCPConnector(limit=0)) as session:
+        started_at = perf_counter()
+        viewers = [
+            asyncio.ensure_future(
+                view(
+                    session,
+                    f"http://127.0.0.1:{port}/guilds/{i % GUILDS}/player/live",
+                    states,
+                    i % GUILDS,
+                )
+            )
+            for i in range(VIEWERS)
+        ]
+
+        while feeds.viewers < VIEWERS:
+            await asyncio.sleep(0.05)
+
+        connecting = perf_counter() - started_at
+        started_at = perf_counter()
+
+        for _ in range(CHANGES):
+            await asyncio.sleep(DURATION / CHANGES)
+            guild_id = rng.randrange(GUILDS)
+            players[guild_id].change()
+            feeds.player_event(PlayerEvent("queue", guild_id))
+
+        await asyncio.sleep(0.5)
+        streaming = perf_counter() - started_at
+        encoded_before_stop = encoded
+        await app.stop()
+        results = await asyncio.gather(*viewers)
+
+    final = {
+        guild_id: await player.state() for guild_id, player in players.items()
+    }
+    snapshot = len(json.dumps({"v": 1, "state": final[0]}))
+    received = sum(result["bytes"] for result in results)
+    messages = sum(result["messages"] for result in results)
+    snapshots = sum(result["snapshots"] for result in results)
+    wrong = sum(
+        result["state"] != final[guild_id]
+        for guild_id, guild_results in states.items()
+        for result in guild_results
+    )
+    print(
+        f"{VIEWERS} viewers of {GUILDS} guilds connected in "
+        f"{connecting:.2f}s; {CHANGES} changes over {streaming:.1f}s"
+    )
+    print(
+        f"{messages} messages, {snapshots} snapshots, "
+        f"{received / max(messages - snapshots, 1) / 1024:.2f}KiB per "
+        f"message against a {snapshot / 1024:.1f}KiB snapshot, "
+        f"{encoded_before_stop} messages encoded, "
+        f"{metrics.counter('dashboard.coalesced')} changes coalesced, "
+        f"{metrics.counter('dashboard.resynced')} resyncs"
+    )
+
+    if wrong:
+        sys.exit(f"{wrong} viewers ended up with the wrong state")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+from time import perf_counter
+
+ERRORS = int(os.environ.get("ERRORS_COUNT", "20000"))
+GUILDS = int(os.environ.get("ERRORS_GUILDS", "50"))
+DURATION = float(os.environ.get("ERRORS_DURATION", "3"))
+
+
+class LavalinkError(Exception):
+    pass
+
+
+def play(guild_id: int) -> None:
+    raise LavalinkError(f"Node unavailable for {guild_id}")
+
+
+def skip(guild_id: int) -> None:
+    try:
+        raise ConnectionResetError(f"Connection lost in {guild_id}")
+
+    except ConnectionResetError as exc:
+        raise LavalinkError("Could not skip") from exc
+
+
+async def serve(events: list, requests: list):
+    """Stand in for Sentry, answering ``429`` to the second request."""
+
+    from aiohttp import web
+
+    async def envelope(request: web.Request) -> web.Response:
+        requests.append(request.headers["X-Sentry-Auth"])
+
+        if len(requests) == 2:
+            return web.Response(status=429, headers={"Retry-After": "1"})
+
+        header, item, payload = (await request.read()).split(b"\n")
+        assert json.loads(item)["length"] == len(payload)
+        events.append(json.loads(payload))
+
+        return web.Response(text=json.loads(header)["event_id"])
+
+    app = web.Application()
+    app.router.add_post("/api/{project}/envelope/", envelope)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    await web.SockSite(runner, sock).start()
+
+    return runner, sock.getsockname()[1]
+
+
+async def main() -> None:
+    """
+    Capture ``ERRORS`` exceptions, from two commands failing as Lavalink
+    flaps, spread over ``GUILDS`` guilds and ``DURATION`` seconds, and count
+    the events the stand-in Sentry receives, against one per exception.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from zeusbot.utils import ErrorReporter, Metrics
+
+    events: list = []
+    requests: list = []
+    runner, port = await serve(events, requests)
+    metrics = Metrics()
+    reporter = ErrorReporter(
+        f"http://key@127.0.0.1:{port}/1",
+        metrics,
+        release="test",
+        interval=0.5,
+    )
+    reporter.start()
+    rng = random.Random(0)
+    capturing = 0.0
+    started_at = perf_counter()
+
+    for index in range(ERRORS):
+        if (
+            delay := started_at + DURATION * index / ERRORS - perf_counter()
+        ) > 0:
+            await asyncio.sleep(delay)
+
+        command = rng.choice((play, skip))
+        guild_id = rng.randrange(GUILDS)
+
+        try:
+            command(guild_id)
+
+        except LavalinkError as exc:
+            captured_at = perf_counter()
+            reporter.capture(
+                exc,
+                command=command.__name__,
+                guild_id=guild_id,
+                user_id=rng.randrange(1000),
+            )
+            capturing += perf_counter() - captured_at
+
+    await asyncio.sleep(1)
+    await reporter.stop()
+    await runner.cleanup()
+
+    occurrences = sum(event["extra"]["occurrences"] for event in events)
+    fingerprints = {event["fingerprint"][0] for event in events}
+    print(
+        f"{ERRORS} errors over {DURATION:.0f}s: {len(events)} events in "
+        f"{len(requests)} requests, against {ERRORS} with one per error"
+    )
+    print(
+        f"{len(fingerprints)} fingerprints, {occurrences} occurrences "
+        f"reported, {capturing / ERRORS * 1e6:.1f}us per capture, "
+        f"{metrics.counter('errors.sampled')} sampled out, "
+        f"{metrics.counter('errors.limited')} rate limited"
+    )
+
+    if occurrences != ERRORS or len(fingerprints) != 2:
+        sys.exit("Occurrences were lost, or grouped wrongly")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
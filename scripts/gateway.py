@@ -0,0 +1,210 @@
+import asyncio
+import os
+import random
+import sys
+from time import process_time
+
+EVENTS = int(os.environ.get("GATEWAY_EVENTS", "10000"))
+GUILD_ID = "1000"
+# The share of each dispatch in a busy bot's gateway traffic.
+MIX = {
+    "PRESENCE_UPDATE": 45,
+    "TYPING_START": 15,
+    "MESSAGE_CREATE": 15,
+    "GUILD_MEMBER_UPDATE": 8,
+    "MESSAGE_REACTION_ADD": 7,
+    "MESSAGE_UPDATE": 5,
+    "VOICE_STATE_UPDATE": 5,
+}
+
+
+def user(user_id: int):
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id}",
+        "discriminator": "0001",
+        "avatar": None,
+    }
+
+
+def member(user_id: int):
+    return {
+        "user": user(user_id),
+        "roles": [],
+        "joined_at": "2022-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+    }
+
+
+def message(rng: random.Random, user_id: int):
+    return {
+        "id": str(rng.randint(10**17, 10**18)),
+        "channel_id": "2000",
+        "guild_id": GUILD_ID,
+        "author": user(user_id),
+        "member": member(user_id),
+        "content": "hello there " * rng.randint(1, 10),
+        "timestamp": "2022-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+        "flags": 0,
+    }
+
+
+def payload(name: str, rng: random.Random):
+    user_id = rng.randint(1, 5000)
+
+    if name == "PRESENCE_UPDATE":
+        return {
+            "user": {"id": str(user_id)},
+            "guild_id": GUILD_ID,
+            "status": "online",
+            "activities": [
+                {"name": "a game", "type": 0, "created_at": 1640995200000},
+            ],
+            "client_status": {"desktop": "online"},
+        }
+
+    if name == "TYPING_START":
+        return {
+            "channel_id": "2000",
+            "guild_id": GUILD_ID,
+            "user_id": str(user_id),
+            "timestamp": 1640995200,
+            "member": member(user_id),
+        }
+
+    if name in ("MESSAGE_CREATE", "MESSAGE_UPDATE"):
+        return message(rng, user_id)
+
+    if name == "GUILD_MEMBER_UPDATE":
+        return {"guild_id": GUILD_ID, **member(user_id)}
+
+    if name == "MESSAGE_REACTION_ADD":
+        return {
+            "user_id": str(user_id),
+            "channel_id": "2000",
+            "message_id": "3000",
+            "guild_id": GUILD_ID,
+            "member": member(user_id),
+            "emoji": {"id": None, "name": "\N{THUMBS UP SIGN}"},
+        }
+
+    return {
+        "guild_id": GUILD_ID,
+        "channel_id": "4000",
+        "user_id": str(user_id),
+        "member": member(user_id),
+        "session_id": "session",
+        "deaf": False,
+        "mute": False,
+        "self_deaf": False,
+        "self_mute": False,
+        "self_video": False,
+        "suppress": False,
+        "request_to_speak_timestamp": None,
+    }
+
+
+class Shard:
+    id = 0
+    shard_count = 1
+
+
+async def measure(bot, events) -> float:
+    """The CPU time spent handling the dispatches, in seconds."""
+
+    loop = asyncio.get_running_loop()
+    errors = []
+    loop.set_exception_handler(lambda _, context: errors.append(context))
+    shard = Shard()
+    # Capture hikari's dispatch tasks, so that they can be awaited.
+    tasks = []
+    create_task = asyncio.create_task
+
+    def track(coro, **kwargs):
+        task = create_task(coro, **kwargs)
+        tasks.append(task)
+        return task
+
+    asyncio.create_task = track
+
+    try:
+        started_at = process_time()
+
+        for name, data in events:
+            bot.event_manager.consume_raw_event(name, shard, data)
+
+        while tasks:
+            pending = tasks[:]
+            tasks.clear()
+            await asyncio.gather(*pending)
+
+        duration = process_time() - started_at
+
+    finally:
+        asyncio.create_task = create_task
+
+    if errors:
+        sys.exit(f"Dispatching failed: {errors[0]}")
+
+    return duration
+
+
+async def main() -> None:
+    """
+    Compare the CPU time hikari spends on ``EVENTS`` gateway dispatches with
+    its default cache and no pre-filter, to ZeusBot's.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from hikari import GatewayBot, Intents, InteractionCreateEvent
+
+    from zeusbot.bot import ZeusBot
+
+    zeus = ZeusBot("x", banner=None, logs=None)
+    zeus.client.load_modules()
+    plain = GatewayBot("x", banner=None, logs=None, intents=Intents.ALL)
+
+    # The listeners the client registers as it opens, and the bot's own.
+    # Both bots get the same ones, so that only the cache and the pre-filter
+    # differ.
+    event_types = {
+        InteractionCreateEvent,
+        *zeus.client.listeners,
+        *zeus.event_manager.manager._listeners,
+    }
+
+    for event_type in event_types:
+        for bot in (zeus, plain):
+            bot.event_manager.subscribe(event_type, noop)
+
+    rng = random.Random(0)
+    names = rng.choices(list(MIX), weights=list(MIX.values()), k=EVENTS)
+    events = [(name, payload(name, rng)) for name in names]
+
+    before = await measure(plain, events)
+    after = await measure(zeus, events)
+    dropped = zeus.client.metrics.counter("gateway.dropped")
+    print(f"{EVENTS} dispatches, {dropped} dropped before deserializing")
+    print(f"before: {before * 1000:.0f}ms of CPU time")
+    print(f"after: {after * 1000:.0f}ms of CPU time")
+    print(f"{before / after:.1f}x less CPU time per dispatch")
+
+
+async def noop(_) -> None:
+    pass
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+from time import perf_counter
+
+from nacl.signing import SigningKey
+
+REQUESTS = int(os.environ.get("INTERACTIONS_REQUESTS", "5000"))
+CONCURRENCY = int(os.environ.get("INTERACTIONS_CONCURRENCY", "32"))
+TARGET = float(os.environ.get("INTERACTIONS_TARGET", "1000"))
+
+key = SigningKey.generate()
+os.environ["INTERACTIONS_PUBLIC_KEY"] = f"str:{key.verify_key.encode().hex()}"
+
+
+def verification() -> float:
+    """Measure how many signatures can be verified per second."""
+
+    body = json.dumps({"type": 1}).encode()
+    timestamp = b"1669852800"
+    signature = key.sign(timestamp + body).signature
+    runs = REQUESTS * 4
+    started_at = perf_counter()
+
+    for _ in range(runs):
+        key.verify_key.verify(timestamp + body, signature)
+
+    return runs / (perf_counter() - started_at)
+
+
+async def serve() -> float:
+    """Measure how many signed pings the HTTP app answers per second."""
+
+    from aiohttp import ClientSession
+    from uvicorn import Config, Server
+
+    from zeusbot.bot.http import InteractionApp
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    url = f"http://127.0.0.1:{sock.getsockname()[1]}/interactions"
+    server = Server(Config(InteractionApp(), log_level="warning"))
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    requests = []
+
+    for index in range(64):
+        body = json.dumps({"type": 1, "id": str(index)}).encode()
+        timestamp = str(1669852800 + index)
+        signature = key.sign(timestamp.encode() + body).signature.hex()
+        headers = {
+            "Content-Type": "application/json",
+            "X-Signature-Ed25519": signature,
+            "X-Signature-Timestamp": timestamp,
+        }
+        requests.append((body, headers))
+
+    async with ClientSession() as session:
+
+        async def worker(offset: int) -> None:
+            for index in range(offset, REQUESTS, CONCURRENCY):
+                body, headers = requests[index % len(requests)]
+
+                async with session.post(
+                    url,
+                    data=body,
+                    headers=headers,
+                ) as response:
+                    assert response.status == 200, await response.text()
+
+        started_at = perf_counter()
+        await asyncio.gather(*map(worker, range(CONCURRENCY)))
+        rate = REQUESTS / (perf_counter() - started_at)
+
+        async with session.post(url, data=b'{"type":1}') as response:
+            assert response.status == 415
+
+        async with session.post(
+            url,
+            data=b'{"type":1}',
+            headers={
+                "Content-Type": "application/json",
+                "X-Signature-Ed25519": "0" * 128,
+                "X-Signature-Timestamp": "1669852800",
+            },
+        ) as response:
+            assert response.status == 400
+
+    server.should_exit = True
+    await serving
+
+    return rate
+
+
+def main() -> None:
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    if os.name != "nt":
+        from uvloop import install
+
+        install()
+
+    print(f"verification: {verification():10.0f}/s")
+    rate = asyncio.run(serve())
+    print(f"interactions: {rate:10.0f}/s")
+
+    if rate < TARGET:
+        sys.exit(f"Served {rate:.0f} interactions/s, target is {TARGET:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from time import monotonic, perf_counter
+
+RECORDS = int(os.environ.get("LOGS_RECORDS", "50000"))
+# How long writing a line blocks, as for a terminal or a busy log collector.
+WRITE_DELAY = float(os.environ.get("LOGS_WRITE_DELAY", "0.00005"))
+# The share of the burst coming from a noisy, rate limited, library logger.
+NOISY = 0.2
+
+
+class SlowStream:
+    """A file whose writes block for ``WRITE_DELAY`` each."""
+
+    def __init__(self, file) -> None:
+        self.file = file
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(WRITE_DELAY)
+        self.lines += text.count("\n")
+        return self.file.write(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+
+async def burst() -> tuple:
+    """Log ``RECORDS`` records, returning the time and the loop's lag."""
+
+    lags = []
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        while not done.is_set():
+            scheduled_at = monotonic()
+            await asyncio.sleep(0.001)
+            lags.append(monotonic() - scheduled_at - 0.001)
+
+    sampler = asyncio.ensure_future(sample())
+    await asyncio.sleep(0.01)
+    app = logging.getLogger("zeusbot.burst")
+    noisy = logging.getLogger("hikari.gateway.0")
+    every = int(1 / NOISY)
+    started_at = perf_counter()
+
+    for index in range(RECORDS):
+        if index % every:
+            app.info("Handled event %s in guild %s", index, 1000 + index % 7)
+
+        else:
+            noisy.info("Received heartbeat ACK %s", index)
+
+        if not index % 100:
+            await asyncio.sleep(0)
+
+    duration = perf_counter() - started_at
+    done.set()
+    await sampler
+
+    lags.sort()
+
+    return duration, lags[len(lags) // 2], lags[-1]
+
+
+def report(name: str, duration, median, worst, written: int) -> None:
+    print(
+        f"{name}: logged {RECORDS / duration:.0f} records/s, loop lag "
+        f"p50={median * 1000:.1f}ms max={worst * 1000:.1f}ms, "
+        f"{written} lines written"
+    )
+
+
+def main() -> None:
+    """
+    Compare a burst of logs written synchronously, as hikari's default
+    handler does, to the same burst through the log pipeline.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from zeusbot.utils.logs import LogPipeline
+    from zeusbot.utils.metrics import Metrics
+
+    with tempfile.TemporaryFile("w+") as file:
+        stream = SlowStream(file)
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(
+            logging.Formatter(
+                "%(levelname)-1.1s %(asctime)23.23s %(name)s: %(message)s"
+            )
+        )
+        logging.root.addHandler(handler)
+        logging.root.setLevel(logging.INFO)
+        duration, median, worst = asyncio.run(burst())
+        logging.root.removeHandler(handler)
+        report("synchronous", duration, median, worst, stream.lines)
+
+    with tempfile.TemporaryFile("w+") as file:
+        stream = SlowStream(file)
+        metrics = Metrics()
+        pipeline = LogPipeline(stream=stream, metrics=metrics)
+        pipeline.start()
+        duration, median, worst = asyncio.run(burst())
+        started_at = perf_counter()
+        pipeline.stop()
+        drained = perf_counter() - started_at
+        report("pipeline", duration, median, worst, stream.lines)
+        print(
+            f"pipeline: {metrics.counter('logs.limited')} rate limited, "
+            f"{metrics.counter('logs.dropped')} dropped as the queue was "
+            f"full, {drained:.2f}s to write the rest"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from replay import FRAMES, make_bot, record
+
+
+async def measure(path: str, frames: int) -> float:
+    """The CPU time spent replaying, tracing ``frames`` frames if set."""
+
+    from zeusbot.utils import TrafficReplayer
+
+    if frames:
+        tracemalloc.start(frames)
+
+    try:
+        bot = make_bot()
+        report = await TrafficReplayer(bot, bot.client.music, speed=0).replay(
+            path
+        )
+
+    finally:
+        tracemalloc.stop()
+
+    if report.errors:
+        sys.exit("Replaying failed")
+
+    return report.cpu_time
+
+
+async def main() -> None:
+    """
+    Compare the CPU time spent replaying ``FRAMES`` frames of traffic with
+    allocations untraced, and traced one and eight frames deep, then show
+    where the memory allocated during a replay went.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from zeusbot.utils import TrafficReplayer
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "traffic.jsonl.gz")
+        await record(path)
+        # Warm up, so that imports are not counted.
+        await measure(path, 0)
+        untraced = await measure(path, 0)
+
+        for frames in (1, 8):
+            traced = await measure(path, frames)
+            print(
+                f"traced {frames} frames deep: {traced * 1000:.0f}ms of CPU "
+                f"time, against {untraced * 1000:.0f}ms untraced "
+                f"(+{(traced / untraced - 1) * 100:.0f}%)"
+            )
+
+        tracemalloc.start(8)
+        bot = make_bot()
+        profiler = bot.client.memory
+        await TrafficReplayer(bot, bot.client.music, speed=0).replay(path)
+        report = await profiler.profile(0)
+        tracemalloc.stop()
+
+    print(
+        f"{report.traced / 2**20:.1f}MiB traced, "
+        f"{report.overhead / 2**20:.1f}MiB spent tracing, over "
+        f"{FRAMES} frames:"
+    )
+
+    for usage in report.subsystems[:10]:
+        print(f"  {usage.name}: {usage.size / 1024:.0f}KiB")
+
+    for name, count in report.counts.items():
+        print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+import os
+import random
+import string
+import sys
+from time import perf_counter
+
+MESSAGES = int(os.environ.get("MODERATION_MESSAGES", "10000"))
+PATTERNS = int(os.environ.get("MODERATION_PATTERNS", "5000"))
+TARGET = float(os.environ.get("MODERATION_TARGET", "10000"))
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+
+def main() -> None:
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from zeusbot.utils.moderation import PatternFilter
+
+    rng = random.Random(0)
+    words = {word(rng) for _ in range(PATTERNS * 9 // 10)}
+    regexes = {
+        f"{word(rng)}\\d+{rng.choice(['', '!+', 's?'])}"
+        for _ in range(PATTERNS - len(words))
+    }
+    vocabulary = [word(rng) for _ in range(20000)]
+    filtered = list(words)
+    messages = [
+        " ".join(
+            rng.choice(filtered)
+            if rng.random() < 0.002
+            else rng.choice(vocabulary)
+            for _ in range(rng.randint(5, 30))
+        )
+        for _ in range(MESSAGES)
+    ]
+
+    started_at = perf_counter()
+    filter_ = PatternFilter(words, regexes)
+    print(
+        f"built {len(words) + len(regexes)} patterns in "
+        f"{(perf_counter() - started_at) * 1000:.1f}ms"
+    )
+
+    started_at = perf_counter()
+    matched = sum(filter_.match(message) is not None for message in messages)
+    rate = MESSAGES / (perf_counter() - started_at)
+    characters = sum(map(len, messages)) / MESSAGES
+    print(
+        f"scanned {rate:.0f} messages/s ({characters:.0f} characters on "
+        f"average), {matched} matched"
+    )
+
+    if rate < TARGET:
+        sys.exit(f"Scanned {rate:.0f} messages/s, target is {TARGET:.0f}")
+
+
+if __name__ == "__main__":
+    main()
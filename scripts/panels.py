@@ -0,0 +1,102 @@
+import asyncio
+import os
+import random
+import sys
+from time import monotonic
+
+GUILDS = int(os.environ.get("PANELS_GUILDS", "5"))
+CHANGES = int(os.environ.get("PANELS_CHANGES", "1000"))
+DURATION = float(os.environ.get("PANELS_DURATION", "5"))
+INTERVAL = float(os.environ.get("PANELS_INTERVAL", "0.5"))
+KINDS = ("start", "end", "queue", "pause", "resume", "seek", "volume")
+
+
+class Message:
+    def __init__(self, message_id: int) -> None:
+        self.id = message_id
+
+
+class REST:
+    """Stands in for hikari's REST client, noting when each call was made."""
+
+    def __init__(self) -> None:
+        self.calls = {}
+
+    def _call(self, channel_id) -> None:
+        self.calls.setdefault(int(channel_id), []).append(monotonic())
+
+    async def create_message(self, channel_id, **_) -> Message:
+        self._call(channel_id)
+        await asyncio.sleep(0.02)
+        return Message(len(self.calls[int(channel_id)]))
+
+    async def edit_message(self, channel_id, _, **__) -> None:
+        self._call(channel_id)
+        await asyncio.sleep(0.02)
+
+
+async def main() -> None:
+    """
+    Send ``CHANGES`` player changes, spread randomly over ``GUILDS`` guilds
+    and ``DURATION`` seconds, through the player panels, and count the REST
+    calls it takes to show them, against one message per change.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from zeusbot.utils import HikariUtility, Metrics, PlayerPanels
+    from zeusbot.utils.player import PlayerEvent
+
+    async def render(guild_id: int):
+        return HikariUtility.build_embed(title=f"Now playing in {guild_id}")
+
+    rest = REST()
+    metrics = Metrics()
+    panels = PlayerPanels(metrics, interval=INTERVAL)
+    panels.rest = rest
+    panels.render = render
+    rng = random.Random(0)
+
+    for guild_id in range(GUILDS):
+        panels.attach(guild_id, guild_id)
+
+    started_at = monotonic()
+
+    for at in sorted(rng.uniform(0, DURATION) for _ in range(CHANGES)):
+        if (delay := started_at + at - monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+        panels.player_event(
+            PlayerEvent(rng.choice(KINDS), rng.randrange(GUILDS)),
+        )
+
+    await asyncio.sleep(INTERVAL * 2)
+
+    calls = sum(map(len, rest.calls.values()))
+    closest = min(
+        (
+            b - a
+            for times in rest.calls.values()
+            for a, b in zip(times, times[1:])
+        ),
+        default=INTERVAL,
+    )
+    print(
+        f"{CHANGES} changes in {GUILDS} guilds over {DURATION:.0f}s: "
+        f"{calls} REST calls, against {CHANGES} with a message per change"
+    )
+    print(
+        f"{metrics.counter('panels.created')} panels created, "
+        f"{metrics.counter('panels.edited')} edits, "
+        f"{metrics.counter('panels.coalesced')} changes coalesced, "
+        f"at least {closest:.2f}s between a panel's calls "
+        f"(the interval is {INTERVAL}s)"
+    )
+
+    if closest < INTERVAL:
+        sys.exit("A panel was updated more than once in an interval")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
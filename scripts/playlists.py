@@ -0,0 +1,101 @@
+import json
+import os
+import random
+import string
+import struct
+import sys
+from base64 import b64decode, b64encode
+from dataclasses import asdict
+from time import perf_counter
+
+TRACKS = int(os.environ.get("PLAYLISTS_TRACKS", "500"))
+TARGET = float(os.environ.get("PLAYLISTS_TARGET", "0.05"))
+
+
+def java_utf(text: str) -> bytes:
+    """Encode text as Java's ``DataOutput.writeUTF`` does."""
+
+    raw = (
+        text.encode("utf-16", "surrogatepass")
+        .decode("utf-16", "surrogatepass")
+        .encode("utf-8", "surrogatepass")
+        .replace(b"\x00", b"\xc0\x80")
+    )
+
+    return struct.pack(">H", len(raw)) + raw
+
+
+def encode_track(rng: random.Random, index: int) -> str:
+    """Encode a YouTube track as Lavaplayer does, in its version 2 format."""
+
+    identifier = "".join(rng.choices(string.ascii_letters, k=11))
+    body = (
+        bytes((2,))
+        + java_utf(f"Track {index} \N{MUSICAL NOTE}\N{GUITAR}")
+        + java_utf(f"Artist {rng.randint(1, 100)}")
+        + struct.pack(">q", rng.randint(60_000, 600_000))
+        + java_utf(identifier)
+        + b"\x00"
+        + b"\x01"
+        + java_utf(f"https://www.youtube.com/watch?v={identifier}")
+        + java_utf("youtube")
+        + struct.pack(">q", 0)
+    )
+
+    return b64encode(struct.pack(">I", 1 << 30 | len(body)) + body).decode()
+
+
+def main() -> None:
+    """
+    Measure how long a saved playlist of ``TRACKS`` tracks takes to decode
+    and queue, and how much space its blob takes.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from lavaplayer import Node
+
+    from zeusbot.utils.playlists import (
+        decode_track,
+        decode_tracks,
+        encode_tracks,
+    )
+
+    rng = random.Random(0)
+    encoded = [encode_track(rng, index) for index in range(TRACKS)]
+    tracks = [decode_track(b64decode(track)) for track in encoded]
+    blob = encode_tracks(tracks)
+    as_json = json.dumps([asdict(track) for track in tracks]).encode()
+    print(
+        f"{TRACKS} tracks: {len(blob) / 1024:.0f}KiB as a blob, "
+        f"{len(as_json) / 1024:.0f}KiB as JSON"
+    )
+
+    timings = []
+
+    for _ in range(20):
+        started_at = perf_counter()
+        loaded = decode_tracks(blob)
+        node = Node(0, [], 100)
+        node.queue.extend(loaded)
+        timings.append(perf_counter() - started_at)
+
+    if [track.track for track in loaded] != encoded:
+        sys.exit("The tracks changed through the blob")
+
+    if loaded[0].title != "Track 0 \N{MUSICAL NOTE}\N{GUITAR}":
+        sys.exit(f"Decoded the title as {loaded[0].title!r}")
+
+    timings.sort()
+    median = timings[len(timings) // 2]
+    print(f"decoded and queued in {median * 1000:.2f}ms (median of 20)")
+
+    if median > TARGET:
+        sys.exit(
+            f"Took {median * 1000:.0f}ms, target is {TARGET * 1000:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from functools import partial
+
+from gateway import GUILD_ID, MIX, member, payload
+
+FRAMES = int(os.environ.get("REPLAY_FRAMES", "5000"))
+# How many times faster than recorded to replay; 0 is as fast as possible.
+SPEED = float(os.environ.get("REPLAY_SPEED", "0"))
+# The share of the traffic from Lavalink, and of slash commands, and the
+# gateway's frame rate.
+LAVALINK_SHARE = 0.1
+INTERACTION_SHARE = 0.02
+RATE = 500
+
+
+def interaction(rng: random.Random, index: int):
+    user_id = rng.randint(1, 5000)
+
+    return {
+        "id": str(10**17 + index),
+        "application_id": "1",
+        "type": 2,
+        "guild_id": GUILD_ID,
+        "channel_id": "2000",
+        "member": {**member(user_id), "permissions": "0"},
+        "token": "secret",
+        "version": 1,
+        "locale": "en-US",
+        "data": {
+            "id": "3000",
+            "name": "play",
+            "type": 1,
+            "options": [{"name": "query", "type": 3, "value": "a song"}],
+        },
+    }
+
+
+def lavalink_frame(rng: random.Random, index: int):
+    if index % 50 == 0:
+        return {
+            "op": "stats",
+            "players": 1,
+            "playingPlayers": 1,
+            "uptime": index * 1000,
+            "memory": {"used": 1, "free": 1, "allocated": 2, "reservable": 2},
+        }
+
+    if index % 10 == 0:
+        return {
+            "op": "event",
+            "type": rng.choice(("TrackStartEvent", "TrackEndEvent")),
+            "guildId": GUILD_ID,
+            "track": "QAAAjQIAJVJpY2sgQXN0bGV5IC0gTmV2ZXIgR29ubmEgR2l2ZS",
+            "reason": "FINISHED",
+        }
+
+    return {
+        "op": "playerUpdate",
+        "guildId": GUILD_ID,
+        "state": {"time": index, "position": index * 100, "connected": True},
+    }
+
+
+async def record(path: str) -> None:
+    """Record synthetic traffic, as the bot would in production."""
+
+    from zeusbot.utils import GATEWAY, LAVALINK, TrafficRecorder
+
+    recorder = TrafficRecorder(path, interval=0.05)
+    recorder.start()
+    rng = random.Random(0)
+
+    for index in range(FRAMES):
+        if (share := rng.random()) < LAVALINK_SHARE:
+            frame = lavalink_frame(rng, index)
+            recorder.record(LAVALINK, frame["op"], frame)
+
+        elif share < LAVALINK_SHARE + INTERACTION_SHARE:
+            frame = interaction(rng, index)
+            recorder.record(GATEWAY, "INTERACTION_CREATE", frame)
+
+        else:
+            name = rng.choices(list(MIX), weights=list(MIX.values()))[0]
+            recorder.record(GATEWAY, name, payload(name, rng))
+
+        if not index % (RATE // 100):
+            await asyncio.sleep(0.01)
+
+    await recorder.stop()
+
+
+def make_bot():
+    """A bot with its modules loaded, and their listeners subscribed."""
+
+    from zeusbot.bot import ZeusBot
+
+    bot = ZeusBot("x", banner=None, logs=None)
+    client = bot.client.load_modules()
+
+    # The client subscribes its components' listeners as it opens, which
+    # would declare commands over REST; subscribe them directly instead.
+    for event_type, callbacks in client.listeners.items():
+        for callback in callbacks:
+            bot.event_manager.subscribe(
+                event_type,
+                partial(client.injector.call_with_async_di, callback),
+            )
+
+    return bot
+
+
+async def replay(path: str) -> None:
+    from zeusbot.utils import TrafficReplayer
+
+    bot = make_bot()
+    client = bot.client
+    replayer = TrafficReplayer(bot, client.music, speed=SPEED)
+    report = await replayer.replay(path)
+    dropped = client.metrics.counter("gateway.dropped")
+    print(
+        f"replayed {report.frames} frames, skipped {report.skipped}, "
+        f"{dropped} dropped by the event filter, {report.errors} errors"
+    )
+    print(
+        f"{report.duration * 1000:.0f}ms, {report.cpu_time * 1000:.0f}ms of "
+        f"CPU time, at most {report.max_lateness * 1000:.1f}ms late"
+    )
+
+    if report.errors:
+        sys.exit("Replaying failed")
+
+
+async def main() -> None:
+    """
+    Record ``FRAMES`` synthetic gateway dispatches and Lavalink frames, and
+    replay them into a bot with its modules loaded, at ``SPEED``.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "traffic.jsonl.gz")
+        await record(path)
+        print(f"recorded {FRAMES} frames in {os.path.getsize(path)} bytes")
+        await replay(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
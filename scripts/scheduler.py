@@ -0,0 +1,65 @@
+import bisect
+import os
+import random
+import sys
+import tracemalloc
+from time import perf_counter
+
+JOBS = int(os.environ.get("SCHEDULER_JOBS", "1000000"))
+DAYS = float(os.environ.get("SCHEDULER_DAYS", "7"))
+HORIZON = float(os.environ.get("SCHEDULER_HORIZON", "300"))
+SIMULATED = float(os.environ.get("SCHEDULER_SIMULATED", "86400"))
+
+
+def main() -> None:
+    """
+    Simulate the scheduler's windowed loading over ``JOBS`` pending jobs,
+    with a sorted list standing in for the PostgreSQL store.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from zeusbot.utils.scheduler import TimerWheel
+
+    rng = random.Random(0)
+    store = sorted(rng.uniform(0, DAYS * 86400) for _ in range(JOBS))
+
+    tracemalloc.start()
+    wheel = TimerWheel(now=0.0)
+    loaded_until = 0.0
+    loaded = fired = largest = 0
+    started_at = perf_counter()
+
+    for now in range(1, int(SIMULATED) + 1):
+        if now + HORIZON / 2 >= loaded_until:
+            until = now + HORIZON
+            low = bisect.bisect_left(store, loaded_until)
+            high = bisect.bisect_left(store, until)
+
+            for index in range(low, high):
+                wheel.add(index, store[index])
+
+            loaded += high - low
+            loaded_until = until
+
+        fired += len(wheel.advance(now))
+        largest = max(largest, len(wheel))
+
+    duration = perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{JOBS} pending jobs over {DAYS:.0f} days, {SIMULATED:.0f}s "
+        f"simulated in {duration:.2f}s"
+    )
+    print(f"loaded {loaded}, fired {fired}, at most {largest} held")
+    print(f"peak memory {peak / 1024:.0f}KiB")
+
+    if fired != bisect.bisect_right(store, SIMULATED):
+        sys.exit("Some jobs were missed, or fired twice")
+
+
+if __name__ == "__main__":
+    main()
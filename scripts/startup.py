@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess  # nosec
+import sys
+from statistics import median
+from time import perf_counter
+
+RUNS = int(os.environ.get("STARTUP_RUNS", "5"))
+TARGET = float(os.environ.get("STARTUP_TARGET", "1.5"))
+
+
+def measure() -> None:
+    """Measure a single cold start, in a fresh interpreter."""
+
+    started_at = perf_counter()
+
+    from zeusbot import ZeusBot
+
+    imported_at = perf_counter()
+    bot = ZeusBot()
+    with bot.startup.phase("modules"):
+        bot.client.load_modules()
+
+    phases = {"imports": imported_at - started_at, **bot.startup.phases}
+    phases["total"] = perf_counter() - started_at
+    print(
+        json.dumps(
+            {
+                "phases": phases,
+                "lavaplayer_imported": "lavaplayer" in sys.modules,
+            }
+        )
+    )
+
+
+def main() -> None:
+    root = os.path.join(
+        os.path.dirname(__file__),
+        os.pardir,
+    )
+    runs = []
+
+    for _ in range(RUNS):
+        output = subprocess.run(  # nosec
+            [sys.executable, __file__, "--measure"],
+            cwd=root,
+            env={**os.environ, "PYTHONPATH": root},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+
+    for name in runs[0]["phases"]:
+        timing = median(run["phases"][name] for run in runs)
+        print(f"{name:>10}: {timing * 1000:8.1f}ms")
+
+    if any(run["lavaplayer_imported"] for run in runs):
+        print("lavaplayer was imported during startup")
+
+    total = median(run["phases"]["total"] for run in runs)
+
+    if total > TARGET:
+        sys.exit(f"Cold start took {total:.3f}s, target is {TARGET:.3f}s")
+
+
+if __name__ == "__main__":
+    if "--measure" in sys.argv:
+        measure()
+
+    else:
+        main()
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+import zlib
+from time import monotonic, perf_counter
+
+JOBS = int(os.environ.get("WORKERS_JOBS", "40"))
+PROCESSES = int(os.environ.get("WORKERS_PROCESSES", "2"))
+# The size of every job's input, as for a cover image to draw a card from.
+INPUT = int(os.environ.get("WORKERS_INPUT", str(512 * 1024)))
+SIZE = 160
+
+
+def render(data, seed: int) -> bytes:
+    """Draw, and compress, an RGB image from the input, in pure Python."""
+
+    pixels = bytearray()
+
+    for y in range(SIZE):
+        for x in range(SIZE):
+            value = data[(x * y + seed) % len(data)]
+            pixels += bytes(((value + x) % 256, (value + y) % 256, value))
+
+    return zlib.compress(bytes(pixels) * 4, 1)
+
+
+async def burst(run) -> tuple:
+    """Run ``JOBS`` renders through ``run``, sampling the loop's lag."""
+
+    lags = []
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        while not done.is_set():
+            scheduled_at = monotonic()
+            await asyncio.sleep(0.005)
+            lags.append(monotonic() - scheduled_at - 0.005)
+
+    sampler = asyncio.ensure_future(sample())
+    await asyncio.sleep(0.05)
+    data = os.urandom(INPUT)
+    started_at = perf_counter()
+    sizes = await asyncio.gather(*(run(data, i) for i in range(JOBS)))
+    duration = perf_counter() - started_at
+    done.set()
+    await sampler
+
+    assert all(sizes)
+    lags.sort()
+
+    return duration, lags[len(lags) // 2], lags[int(len(lags) * 0.99)]
+
+
+def report(name: str, duration, median, p99) -> None:
+    print(
+        f"{name}: {JOBS} renders in {duration:.2f}s, loop lag "
+        f"p50={median * 1000:.1f}ms p99={p99 * 1000:.1f}ms"
+    )
+
+
+async def main() -> None:
+    """
+    Compare the event loop's lag during a burst of CPU-bound renders run on
+    the loop, on threads, and in the worker pool.
+    """
+
+    root = os.path.join(os.path.dirname(__file__), os.pardir)
+    sys.path.insert(0, os.path.abspath(root))
+
+    from zeusbot.utils import Metrics, WorkerPool
+
+    async def inline(data, seed):
+        await asyncio.sleep(0)
+        return len(render(data, seed))
+
+    async def threaded(data, seed):
+        return len(await asyncio.to_thread(render, data, seed))
+
+    metrics = Metrics()
+    pool = WorkerPool(metrics, processes=PROCESSES, capacity=JOBS)
+    await pool.start()
+
+    async def pooled(data, seed):
+        return len(await pool.run(render, data, seed))
+
+    try:
+        report("idle", *await burst(lambda *_: asyncio.sleep(0.01, 1)))
+        report("on the loop", *await burst(inline))
+        report("on threads", *await burst(threaded))
+        report(f"in {PROCESSES} processes", *await burst(pooled))
+
+    finally:
+        pool.close()
+
+    print(
+        f"{metrics.counter('workers.rejected')} rejected, "
+        f"{metrics.counter('workers.timeouts')} timed out"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
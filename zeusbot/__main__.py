@@ -1,4 +1,5 @@
 import os
+import sys
 
 from zeusbot import ZeusBot
 
@@ -9,6 +10,12 @@ if os.name != "nt":
 
 
 def main() -> None:
+    if sys.argv[1:] == ["http"]:
+        from zeusbot.bot.http import InteractionApp
+
+        InteractionApp().run()
+        return
+
     zeusbot = ZeusBot()
 
     zeusbot.run()
@@ -8,20 +8,28 @@ from hikari import (
     ActivityType,
     GatewayBot,
     Intents,
+    StartedEvent,
     StartingEvent,
     Status,
     StoppingEvent,
 )
+from hikari.impl import CacheSettings
 
 from zeusbot.bot.client import ZeusClient
-from zeusbot.utils import Config
+from zeusbot.utils import (
+    CACHE_COMPONENTS,
+    Config,
+    EventFilter,
+    LogPipeline,
+    StartupTimer,
+)
 
 if TYPE_CHECKING:
     from concurrent.futures import Executor
     from datetime import datetime
     from typing import Any, Callable, Coroutine, Dict, Final, Sequence, Type
 
-    from hikari.impl import CacheSettings, HTTPSettings, ProxySettings
+    from hikari.impl import HTTPSettings, ProxySettings
 
 
 class ZeusBot(GatewayBot):
@@ -30,6 +38,8 @@ class ZeusBot(GatewayBot):
     __slots__ = (
         *GatewayBot.__slots__,
         "client",
+        "logs",
+        "startup",
     )
     logger = getLogger(__name__)
 
@@ -45,34 +55,61 @@ class ZeusBot(GatewayBot):
         http_settings: HTTPSettings | None = None,
         intents: Intents = Intents.ALL,
         auto_chunk_members: bool = True,
-        logs: int | str | Dict[str, Any] | None = "INFO",
+        logs: int | str | Dict[str, Any] | None = Config.LOG_LEVEL,
         max_rate_limit: float = 300,
         max_retries: int = 3,
         proxy_settings: ProxySettings | None = None,
         rest_url: str | None = None,
     ) -> None:
+        self.startup = StartupTimer()
+        # A level routes the logs through the pipeline; hikari only sets up
+        # its own logging for a ``logging.config`` dict.
+        self.logs = (
+            LogPipeline(logs, metrics=ZeusClient.metrics)
+            if isinstance(logs, (int, str))
+            else None
+        )
+
+        if self.logs is not None:
+            self.logs.start()
+
         super().__init__(
             token,
             allow_color=allow_color,
             banner=banner,
             executor=executor,
             force_color=force_color,
-            cache_settings=cache_settings,
+            cache_settings=cache_settings
+            or CacheSettings(components=CACHE_COMPONENTS),
             http_settings=http_settings,
             intents=intents,
             auto_chunk_members=auto_chunk_members,
-            logs=logs,
+            logs=logs if self.logs is None else None,
             max_rate_limit=max_rate_limit,
             max_retries=max_retries,
             proxy_settings=proxy_settings,
             rest_url=rest_url,
         )
+        # Drop the dispatches nothing uses before hikari deserializes them.
+        if hasattr(self, "_event_manager"):
+            self._event_manager = EventFilter(  # type: ignore
+                self._event_manager,
+                ZeusClient.metrics,
+                ZeusClient.recorder,
+            )
+
+        else:
+            self.logger.warning(
+                "The gateway bot has no event manager to filter dispatches of."
+            )
         self.client = ZeusClient.from_gateway_bot(self)
         self._subscribe_to_listeners()
+        self.startup.mark("init")
 
     def _subscribe_to_listeners(self) -> None:
         events: Dict[Type[Any], Callable[[Any], Coroutine[Any, Any, None]]] = {
             StartingEvent: self.starting_event,
+            StartedEvent: self.started_event,
             StoppingEvent: self.stopping_event,
         }
 
@@ -102,29 +139,41 @@ class ZeusBot(GatewayBot):
         shard_ids: Sequence[int] | None = None,
         shard_count: int | None = None,
     ) -> None:
-        self.client.load_modules()  # type: ignore
-
-        super().run(
-            activity=activity,
-            afk=afk,
-            asyncio_debug=asyncio_debug,
-            check_for_updates=check_for_updates,
-            close_passed_executor=close_passed_executor,
-            close_loop=close_loop,
-            coroutine_tracking_depth=coroutine_tracking_depth,
-            enable_signal_handlers=enable_signal_handlers,
-            idle_since=idle_since,
-            ignore_session_start_limit=ignore_session_start_limit,
-            large_threshold=large_threshold,
-            propagate_interrupts=propagate_interrupts,
-            status=status,
-            shard_ids=shard_ids,
-            shard_count=shard_count,
-        )
+        with self.startup.phase("modules"):
+            self.client.load_modules()  # type: ignore
+
+        try:
+            super().run(
+                activity=activity,
+                afk=afk,
+                asyncio_debug=asyncio_debug,
+                check_for_updates=check_for_updates,
+                close_passed_executor=close_passed_executor,
+                close_loop=close_loop,
+                coroutine_tracking_depth=coroutine_tracking_depth,
+                enable_signal_handlers=enable_signal_handlers,
+                idle_since=idle_since,
+                ignore_session_start_limit=ignore_session_start_limit,
+                large_threshold=large_threshold,
+                propagate_interrupts=propagate_interrupts,
+                status=status,
+                shard_ids=shard_ids,
+                shard_count=shard_count,
+            )
+
+        finally:
+            self.client.workers.close()
+
+            if self.logs is not None:
+                self.logs.stop()
 
     async def starting_event(self, _: StartingEvent) -> None:
         self.logger.info("Starting bot.")
 
+    async def started_event(self, _: StartedEvent) -> None:
+        self.startup.mark("gateway")
+        self.logger.info("Started bot in %s.", self.startup.report())
+
     async def stopping_event(self, _: StoppingEvent) -> None:
         self.logger.info("Stopping bot.")
 
@@ -1,31 +1,73 @@
 from __future__ import annotations
 
 # from asyncio import sleep
+import sys
+from asyncio import ensure_future, shield
+from collections.abc import Sequence
+from importlib import reload
 from logging import getLogger
 from pathlib import Path
-from typing import TYPE_CHECKING
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
 
 from hikari import (
+    UNDEFINED,
+    StartedEvent,
     StartingEvent,
     StoppingEvent,
     VoiceServerUpdateEvent,
     VoiceStateUpdateEvent,
 )
-from tanjun import Client
+from tanjun import Client, ClientCallbackNames, CommandError
 
-from zeusbot.utils import Config, HikariUtility, MusicUtility
+from zeusbot.utils import (
+    Autoplay,
+    CommandDeclarer,
+    CommandTracker,
+    Config,
+    Database,
+    ErrorReporter,
+    HikariUtility,
+    LocalStorage,
+    LoopMonitor,
+    MemoryProfiler,
+    MessageFilter,
+    Metrics,
+    MusicUtility,
+    PlayerFeeds,
+    PlayerPanels,
+    SavedPlaylists,
+    Scheduler,
+    SettingsCache,
+    Statistics,
+    TrafficRecorder,
+    WorkerPool,
+)
 
 if TYPE_CHECKING:
-    from typing import Any, Callable, Coroutine, Dict, Mapping, Self, Type
+    from asyncio import Future, Task
+    from typing import (
+        Any,
+        Callable,
+        Coroutine,
+        Dict,
+        Final,
+        List,
+        Mapping,
+        Self,
+        Type,
+    )
 
     from alluka.abc import Client as AllukaClient
     from hikari import (
         GatewayBotAware,
         PartialCommand,
         PartialGuild,
+        RESTBotAware,
         ShardAware,
         SnowflakeishOr,
         SnowflakeishSequence,
+        UndefinedOr,
     )
     from hikari.api import (
         Cache,
@@ -34,6 +76,18 @@ if TYPE_CHECKING:
         RESTClient,
         VoiceComponent,
     )
+    from tanjun.abc import Context
+
+    from zeusbot.bot.dashboard import DashboardApp
+
+
+class ReloadReport(NamedTuple):
+    """The outcome of a hot reload."""
+
+    modules: List[str]
+    duration: float
+    in_flight: int
+    latencies: List[float]
 
 
 class ZeusClient(Client):
@@ -42,9 +96,44 @@ class ZeusClient(Client):
     __slots__ = (
         *Client.__slots__,
         "session",
+        "_declare_in",
+        "_command_ids",
+        "_message_ids",
+        "_user_ids",
+        "tracker",
+        "_draining",
+        "_drained",
+        "_restoring",
+        "_starting_services",
+        "_dashboard",
     )
     music = MusicUtility()
     hikari = HikariUtility
+    storage = LocalStorage()
+    declarer = CommandDeclarer(storage)
+    metrics = Metrics()
+    loop_monitor = LoopMonitor(metrics)
+    database = Database()
+    statistics = Statistics(database, metrics)
+    moderation = MessageFilter(database, metrics)
+    scheduler = Scheduler(database, metrics)
+    settings = SettingsCache(database, metrics)
+    playlists = SavedPlaylists(database, metrics)
+    panels = PlayerPanels(metrics)
+    feeds = PlayerFeeds(metrics)
+    autoplay = Autoplay(metrics)
+    recorder = (
+        TrafficRecorder(Config.TRAFFIC_RECORD_PATH, metrics)
+        if Config.TRAFFIC_RECORD_PATH
+        else None
+    )
+    errors = (
+        ErrorReporter(Config.SENTRY_DSN, metrics, release=Config.VERSION)
+        if Config.SENTRY_DSN
+        else None
+    )
+    memory = MemoryProfiler()
+    workers = WorkerPool(metrics)
     logger = getLogger(__name__)
 
     def __init__(
@@ -80,15 +169,116 @@ class ZeusClient(Client):
             event_managed=event_managed,
             injector=injector,
             mention_prefix=mention_prefix,
-            set_global_commands=set_global_commands,
-            declare_global_commands=declare_global_commands,
-            command_ids=command_ids,
-            message_ids=message_ids,
-            user_ids=user_ids,
             _stack_level=_stack_level,
         )
+        self._declare_in = self._resolve_declare_targets(
+            declare_global_commands or set_global_commands,
+        )
+
+        if command_ids and len(self._declare_in) > 1:
+            raise ValueError(
+                "Cannot provide specific command_ids while declaring "
+                "commands in multiple guilds",
+            )
+
+        self._command_ids = command_ids
+        self._message_ids = message_ids
+        self._user_ids = user_ids
+        self.tracker = CommandTracker(self.metrics)
+        self._draining = False
+        self._drained: Future[None] | None = None
+        self._restoring: Task[int] | None = None
+        self._starting_services: Task[None] | None = None
+        self._dashboard: DashboardApp | None = None
+        self.set_hooks(
+            self.tracker.hooks.add_pre_execution(
+                self._record_command,
+            ).add_on_error(self._report_error),
+        )
+        self.music.settings = self.settings
+        self.music.playlists = self.playlists
+        self.music.recorder = self.recorder
+        self.music.panels = self.panels
+        self.panels.rest = self.rest
+        # Looked up on every render, as a hot reload replaces the utility.
+        self.panels.render = lambda guild_id: self.music.player_embed(guild_id)
+        self.music.add_listener(self.statistics.player_event)
+        self.music.autoplay = self.autoplay
+        self.music.add_listener(self.panels.player_event)
+        self.feeds.render = lambda guild_id: self.music.player_state(guild_id)
+        self.music.add_listener(self.feeds.player_event)
+        self.music.add_listener(self.autoplay.player_event)
+        self._add_memory_counts()
+        self.add_check(self._check_accepting_commands)
+        self.add_client_callback(
+            ClientCallbackNames.STARTING,
+            self._declare_commands,
+        )
+        self.add_client_callback(ClientCallbackNames.CLOSING, self.drain)
         self._subscribe_to_events()
 
+    @staticmethod
+    def _resolve_declare_targets(
+        declare_global_commands: SnowflakeishSequence[PartialGuild]
+        | SnowflakeishOr[PartialGuild]
+        | bool,
+    ) -> Sequence[UndefinedOr[SnowflakeishOr[PartialGuild]]]:
+        if declare_global_commands is True:
+            return (UNDEFINED,)
+
+        if declare_global_commands is False:
+            return ()
+
+        if isinstance(declare_global_commands, Sequence):
+            return tuple(declare_global_commands)
+
+        return (declare_global_commands,)
+
+    def _add_memory_counts(self) -> None:
+        """Count what the bot queues and caches, in memory profiles."""
+
+        counts: Dict[str, Callable[[], int]] = {
+            # Looked up on every count, as a hot reload replaces the utility.
+            "queued tracks": lambda: self.music.queued(),
+            "pending statistics": lambda: self.statistics.pending,
+            "components": lambda: len(self.components),
+            "autoplay tracks": lambda: len(self.autoplay.index),
+            "dashboard viewers": lambda: self.feeds.viewers,
+        }
+
+        if (cache := self.cache) is not None:
+            counts.update(
+                {
+                    "cached guilds": lambda: len(cache.get_guilds_view()),
+                    "cached channels": lambda: len(
+                        cache.get_guild_channels_view(),
+                    ),
+                    "cached roles": lambda: len(cache.get_roles_view()),
+                    "cached members": lambda: sum(
+                        map(len, cache.get_members_view().values()),
+                    ),
+                    "cached voice states": lambda: sum(
+                        map(len, cache.get_voice_states_view().values()),
+                    ),
+                }
+            )
+
+        for name, count in counts.items():
+            self.memory.add_count(name, count)
+
+    async def _declare_commands(self) -> None:
+        """Declare the commands, skipping those that are up to date."""
+
+        for guild in self._declare_in:
+            await self.declarer.declare(
+                self,
+                application=Config.BOT_ID,
+                guild=guild,
+                command_ids=self._command_ids,
+                message_ids=self._message_ids,
+                user_ids=self._user_ids,
+            )
+
     def _subscribe_to_events(self) -> None:
         events: Dict[Type[Any], Callable[[Any], Coroutine[Any, Any, None]]] = {
             StartingEvent: self.starting_event,
@@ -143,6 +333,135 @@ class ZeusClient(Client):
             .set_hikari_trait_injectors(bot)
         )
 
+    @classmethod
+    def from_rest_bot(
+        cls,
+        bot: RESTBotAware,
+        /,
+        *,
+        injector: AllukaClient | None = None,
+        declare_global_commands: SnowflakeishSequence[PartialGuild]
+        | SnowflakeishOr[PartialGuild]
+        | bool = False,
+        set_global_commands: SnowflakeishOr[PartialGuild] | bool = False,
+        command_ids: Mapping[str, SnowflakeishOr[PartialCommand]]
+        | None = None,
+        message_ids: Mapping[str, SnowflakeishOr[PartialCommand]]
+        | None = None,
+        user_ids: Mapping[str, SnowflakeishOr[PartialCommand]] | None = None,
+    ) -> Self:  # type: ignore
+        """
+        Build a client that receives interactions over HTTP.
+        Commands are not declared by default, as every worker would race to
+        do it; the gateway process declares them.
+        """
+
+        return cls(  # type: ignore
+            rest=bot.rest,
+            server=bot.interaction_server,
+            injector=injector,
+            declare_global_commands=declare_global_commands,
+            set_global_commands=set_global_commands,
+            command_ids=command_ids,
+            message_ids=message_ids,
+            user_ids=user_ids,
+            _stack_level=1,
+        ).set_hikari_trait_injectors(bot)
+
+    async def _record_command(self, ctx: Context) -> None:
+        self.statistics.record(
+            "command",
+            ctx.guild_id,
+            ctx.author.id,
+            ctx.triggering_name,
+        )
+
+    async def _report_error(self, ctx: Context, exc: Exception) -> None:
+        if self.errors is not None:
+            self.errors.capture(
+                exc,
+                command=ctx.triggering_name,
+                guild_id=ctx.guild_id,
+                user_id=ctx.author.id,
+            )
+
+    def _check_accepting_commands(self, _: Context) -> bool:
+        if self._draining:
+            raise CommandError("I'm restarting, try again in a moment.")
+
+        return True
+
+    async def drain(self) -> None:
+        """
+        Stop accepting new commands, wait for the ones in flight for up to
+        ``Config.DRAIN_TIMEOUT`` seconds, then checkpoint every player.
+        Safe to call more than once; later calls wait for the first.
+        """
+
+        if self._drained is None:
+            self._drained = ensure_future(self._drain())
+
+        await shield(self._drained)
+
+    async def _drain(self) -> None:
+        self._draining = True
+        started_at = perf_counter()
+
+        if not await self.tracker.wait_idle(Config.DRAIN_TIMEOUT):
+            self.logger.warning(
+                "Gave up on %s commands still in flight.",
+                self.tracker.in_flight,
+            )
+
+        players = 0
+
+        if self.shards is not None:
+            # Only the gateway process owns voice connections.
+            players = await self.music.checkpoint(self.storage)
+
+        self.logger.info(
+            "Drained in %.1fms, checkpointed %s players.",
+            (perf_counter() - started_at) * 1000,
+            players,
+        )
+
+    async def _restore_players(self) -> int:
+        if self.events is None or self.shards is None:
+            return 0
+
+        # Voice state updates need the shards to be connected.
+        await self.events.wait_for(StartedEvent, timeout=None)
+        players = await self.music.restore(self.shards, self.storage)
+        self.logger.info("Restored %s players.", players)
+
+        return players
+
+    async def _start_services(self) -> None:
+        """Start the services the bot can run without, in the background."""
+
+        services: Dict[str, Callable[[], Coroutine[Any, Any, None]]] = {
+            "moderation filters": self.moderation.load,
+            "scheduler": self.scheduler.start,
+            "settings cache": self.settings.start,
+            "dashboard": self._serve_dashboard,
+        }
+
+        for name, start in services.items():
+            try:
+                await start()
+
+            except Exception:
+                self.logger.exception("Could not start the %s.", name)
+
+    async def _serve_dashboard(self) -> None:
+        if not Config.DASHBOARD_PORT:
+            return
+
+        from zeusbot.bot.dashboard import DashboardApp
+
+        self._dashboard = DashboardApp(self.feeds)
+        await self._dashboard.start()
+
     async def starting_event(self, _: StartingEvent) -> None:
         if self.shards is None or self.loop is None:
             return
@@ -150,16 +469,64 @@ class ZeusClient(Client):
         # if (me := self.shards.get_me()) is None:
         #     return
 
+        self._draining = False
+        self._drained = None
+        self.loop_monitor.start()
+        self.memory.start()
+        self.statistics.start()
+
+        if self.errors is not None:
+            self.errors.start()
+
+        if self.recorder is not None:
+            self.recorder.start()
+
         await self.music.connect()
+        self._restoring = ensure_future(self._restore_players())
+        self._starting_services = ensure_future(self._start_services())
 
     async def stopping_event(self, _: StoppingEvent) -> None:
         if self.shards is None or self.loop is None:
             return
 
+        await self.drain()
+
+        if self._starting_services is not None:
+            self._starting_services.cancel()
+
+        if self._dashboard is not None:
+            await self._dashboard.stop()
+            self._dashboard = None
+
+        await self.scheduler.stop()
+        await self.statistics.stop()
+        self.settings.stop()
+
+        if self.recorder is not None:
+            await self.recorder.stop()
+
+        if self.errors is not None:
+            await self.errors.stop()
+
+        await self.database.close()
+        await self.loop_monitor.stop()
+
     async def voice_state_update_event(
         self,
         event: VoiceStateUpdateEvent,
     ) -> None:
+        channel_id = event.state.channel_id
+
+        if channel_id is not None and (
+            event.old_state is None or event.old_state.channel_id != channel_id
+        ):
+            self.statistics.record(
+                "voice_join",
+                event.guild_id,
+                event.state.user_id,
+                str(channel_id),
+            )
+
         await self.music.raw_voice_state_update(
             event.guild_id,
             event.state.user_id,
@@ -177,26 +544,100 @@ class ZeusClient(Client):
             event.token,
         )
 
+    @staticmethod
+    def _module_paths() -> List[Path]:
+        """
+        The paths of the bot's modules.
+        Only the modules named in ``Config.MODULES`` are returned, unless it
+        is empty, so that a process only imports the components it serves.
+        """
+
+        paths = sorted((Path(__file__).parent / "modules").glob("*.py"))
+
+        if not Config.MODULES:
+            return paths
+
+        return [path for path in paths if path.stem in Config.MODULES]
+
     def load_modules(self, *modules: str | Path) -> Self:  # type: ignore
         if modules:
             return super().load_modules(*modules)
 
-        return super().load_modules(
-            *(Path(__file__).parent / "modules").glob("*.py"),
-        )
+        return super().load_modules(*self._module_paths())
 
     def unload_modules(self, *modules: str | Path) -> Self:  # type: ignore
         if modules:
             return super().unload_modules(*modules)
 
-        return super().unload_modules(
-            *(Path(__file__).parent / "modules").glob("*.py"),
-        )
+        return super().unload_modules(*self._module_paths())
 
     def reload_modules(self, *modules: str | Path) -> Self:  # type: ignore
         if modules:
             return super().reload_modules(*modules)
 
-        return super().reload_modules(
-            *(Path(__file__).parent / "modules").glob("/*.py"),
+        return super().reload_modules(*self._module_paths())
+
+    async def reload_modules_async(self, *modules: str | Path) -> None:
+        if modules:
+            return await super().reload_modules_async(*modules)
+
+        return await super().reload_modules_async(*self._module_paths())
+
+    def _reload_utilities(self) -> None:
+        """
+        Reload :mod:`zeusbot.utils.music`, handing the current
+        :class:`MusicUtility`'s state over to the reloaded class.
+        """
+
+        module = reload(sys.modules[MusicUtility.__module__])
+        type(self).music = module.MusicUtility.adopt(self.music)
+
+    async def hot_reload(
+        self,
+        *names: str,
+        utilities: bool = False,
+        timeout: float = 30,
+        ctx: Context | None = None,
+    ) -> ReloadReport:
+        """
+        Reload components in place, without dropping voice connections.
+        The new code is imported off the event loop and swapped in
+        atomically, so commands in flight finish on the old code and new
+        ones run on the new code. The latency of the commands that were in
+        flight during the reload is reported, waiting up to ``timeout``;
+        ``ctx``, the command that asked for the reload, is not waited for.
+        """
+
+        paths = [
+            path
+            for path in self._module_paths()
+            if not names or path.stem in names
+        ]
+
+        if names and len(paths) != len(names):
+            raise ValueError(f"Unknown modules in {', '.join(names)}")
+
+        watched = self.tracker.watch(*(ctx,) if ctx is not None else ())
+        started_at = perf_counter()
+
+        if utilities:
+            self._reload_utilities()
+
+        await self.reload_modules_async(*paths)
+        duration = perf_counter() - started_at
+        latencies = await self.tracker.collect(watched, timeout)
+        self.logger.info(
+            "Hot reloaded %s in %.1fms.",
+            ", ".join(path.stem for path in paths),
+            duration * 1000,
         )
+
+        return ReloadReport(
+            [path.stem for path in paths],
+            duration,
+            len(watched),
+            latencies,
+        )
+
+
+__all__: Final = ("ReloadReport", "ZeusClient")
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from asyncio import FIRST_COMPLETED, ensure_future, sleep, wait
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI, Response, WebSocket
+from starlette.websockets import WebSocketDisconnect
+from uvicorn import Config as ServerConfig
+from uvicorn import Server
+
+from zeusbot.utils import Config
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from typing import Any, Final
+
+    from zeusbot.utils import PlayerFeeds, Subscription
+
+_JSON_CONTENT_TYPE: Final = "application/json"
+# The close code asking a client to try again later.
+_TRY_AGAIN_LATER: Final = 1013
+
+
+class _EmbeddedServer(Server):
+    """A server running in the bot's event loop, which owns the signals."""
+
+    def install_signal_handlers(self) -> None:
+        pass
+
+
+class DashboardApp(FastAPI):
+    """
+    Serves the website dashboard's view of the players, from the gateway
+    process, which owns them.
+
+    ``GET /guilds/{guild_id}/player`` returns a player's state, and the
+    ``/guilds/{guild_id}/player/live`` websocket streams it, as a snapshot
+    followed by its changes, as described by :class:`PlayerFeeds`. At most
+    ``max_viewers`` websockets are served at once; more are closed, asking
+    them to try again later.
+    """
+
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        feeds: PlayerFeeds,
+        *,
+        max_viewers: int = 10_000,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            docs_url=None,
+            redoc_url=None,
+            openapi_url=None,
+            **kwargs,
+        )
+        self.feeds = feeds
+        self.max_viewers = max_viewers
+        self._server: Server | None = None
+        self._serving: Task[None] | None = None
+        self.add_api_route(
+            "/guilds/{guild_id}/player",
+            self.player,
+            methods=["GET"],
+            include_in_schema=False,
+        )
+        self.add_api_websocket_route(
+            "/guilds/{guild_id}/player/live",
+            self.live_player,
+        )
+
+    async def player(self, guild_id: int) -> Response:
+        """The state of a guild's player."""
+
+        return Response(
+            await self.feeds.snapshot(guild_id),
+            media_type=_JSON_CONTENT_TYPE,
+        )
+
+    async def live_player(self, websocket: WebSocket, guild_id: int) -> None:
+        """Stream the state of a guild's player."""
+
+        if self.feeds.viewers >= self.max_viewers:
+            await websocket.close(_TRY_AGAIN_LATER)
+            return
+
+        await websocket.accept()
+        subscription = await self.feeds.subscribe(guild_id)
+        # Reading notices the viewer leaving, even if nothing is sent.
+        sending = ensure_future(self._send(websocket, subscription))
+        receiving = ensure_future(self._receive(websocket))
+
+        try:
+            await wait((sending, receiving), return_when=FIRST_COMPLETED)
+
+        finally:
+            subscription.close()
+            sending.cancel()
+            receiving.cancel()
+
+    @staticmethod
+    async def _send(websocket: WebSocket, subscription: Subscription) -> None:
+        try:
+            while True:
+                await websocket.send_text(await subscription.get())
+
+        except (WebSocketDisconnect, RuntimeError, OSError):
+            pass
+
+    @staticmethod
+    async def _receive(websocket: WebSocket) -> None:
+        try:
+            while True:
+                await websocket.receive_text()
+
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+
+    async def start(
+        self,
+        host: str = Config.DASHBOARD_HOST,
+        port: int = Config.DASHBOARD_PORT,
+    ) -> None:
+        """Start serving in the running event loop."""
+
+        if self._serving is not None:
+            return
+
+        self._server = _EmbeddedServer(
+            ServerConfig(
+                self,
+                host=host,
+                port=port,
+                log_config=None,
+                lifespan="off",
+            )
+        )
+        self._serving = ensure_future(self._serve(self._server))
+
+        while not self._server.started:
+            if self._serving.done():
+                self._serving.result()
+
+            await sleep(0.05)
+
+        self.logger.info("Serving the dashboard on %s:%s.", host, port)
+
+    @staticmethod
+    async def _serve(server: Server) -> None:
+        try:
+            await server.serve()
+
+        except SystemExit:
+            # Uvicorn exits the process when it cannot bind.
+            raise OSError("Could not start serving the dashboard") from None
+
+    async def stop(self) -> None:
+        """Close every websocket, and stop serving."""
+
+        if self._server is None or self._serving is None:
+            return
+
+        self._server.should_exit = True
+        await self._serving
+        self._server = self._serving = None
+
+
+__all__: Final = ("DashboardApp",)
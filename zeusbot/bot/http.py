@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from logging import getLogger
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+from fastapi import FastAPI, Request, Response
+from hikari import RESTBot
+
+from zeusbot.bot.client import ZeusClient
+from zeusbot.utils import Config, LogPipeline
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Final, List, Tuple
+
+    from hikari.api.interaction_server import Response as InteractionResponse
+
+_JSON_CONTENT_TYPE: Final = "application/json"
+_SIGNATURE_HEADER: Final = "X-Signature-Ed25519"
+_TIMESTAMP_HEADER: Final = "X-Signature-Timestamp"
+# Ed25519 signatures are 64 bytes, sent hex encoded.
+_SIGNATURE_LENGTH: Final = 128
+
+
+class InteractionApp(FastAPI):
+    """
+    Serves interactions over HTTP instead of the gateway.
+    Workers keep no state of their own, so any number of them can run
+    behind a load balancer, while the gateway process only handles voice
+    and events. Commands that need the gateway, like music, should be left
+    out of ``Config.MODULES`` for these workers.
+    """
+
+    logger = getLogger(__name__)
+
+    def __init__(self, bot: RESTBot | None = None, **kwargs: Any) -> None:
+        self.logs = LogPipeline(Config.LOG_LEVEL, metrics=ZeusClient.metrics)
+        super().__init__(
+            docs_url=None,
+            redoc_url=None,
+            openapi_url=None,
+            **kwargs,
+        )
+        self.bot = bot or RESTBot(
+            Config.TOKEN,
+            "Bot",
+            Config.INTERACTIONS_PUBLIC_KEY or None,
+            banner=None,
+            logs=None,
+        )
+        self.client = ZeusClient.from_rest_bot(self.bot)
+        self.client.load_modules()  # type: ignore
+        self.add_event_handler("startup", self.startup_event)
+        self.add_event_handler("shutdown", self.shutdown_event)
+        self.add_api_route(
+            "/interactions",
+            self.interaction,
+            methods=["POST"],
+            include_in_schema=False,
+        )
+
+    async def startup_event(self) -> None:
+        self.logs.start()
+        self.bot.rest.start()  # type: ignore
+        self.client.loop_monitor.start()
+        self.client.statistics.start()
+
+        try:
+            await self.client.settings.start()
+
+        except Exception:
+            self.logger.exception("Could not start the settings cache.")
+
+        await self.client.open()
+        self.logger.info("Serving interactions.")
+
+    async def shutdown_event(self) -> None:
+        await self.client.close()
+        await self.client.statistics.stop()
+        self.client.settings.stop()
+        await self.client.database.close()
+        await self.client.loop_monitor.stop()
+        await self.bot.rest.close()  # type: ignore
+        self.logger.info("Stopped serving interactions.")
+        self.logs.stop()
+
+    async def interaction(self, request: Request) -> Response:
+        """Verify and dispatch an interaction sent by Discord."""
+
+        headers = request.headers
+
+        if headers.get("Content-Type", "").lower() != _JSON_CONTENT_TYPE:
+            return Response(b"Unsupported Media Type", 415)
+
+        # Reject malformed requests before paying for the verification.
+        signature = headers.get(_SIGNATURE_HEADER, "")
+        timestamp = headers.get(_TIMESTAMP_HEADER, "")
+
+        if len(signature) != _SIGNATURE_LENGTH or not timestamp:
+            return Response(b"Missing or invalid signature headers", 400)
+
+        try:
+            signature_bytes = bytes.fromhex(signature)
+
+        except ValueError:
+            return Response(b"Missing or invalid signature headers", 400)
+
+        if not (body := await request.body()):
+            return Response(b"POST request must have a body", 400)
+
+        response = await self.bot.interaction_server.on_interaction(
+            body,
+            signature_bytes,
+            timestamp.encode(),
+        )
+        headers_ = dict(response.headers or {})
+
+        if response.files:
+            content, content_type = await self._multipart(response)
+
+            return Response(
+                content,
+                response.status_code,
+                headers_,
+                content_type,
+            )
+
+        content_type = response.content_type or "text/plain"
+
+        if response.charset:
+            content_type = f"{content_type}; charset={response.charset}"
+
+        return Response(
+            response.payload,
+            response.status_code,
+            headers_,
+            content_type,
+        )
+
+    async def _multipart(
+        self,
+        response: InteractionResponse,
+    ) -> Tuple[bytes, str]:
+        boundary = uuid4().hex
+        parts: List[bytes] = []
+
+        def part(headers: Dict[str, str], data: bytes) -> None:
+            parts.append(f"--{boundary}\r\n".encode())
+            parts.extend(
+                f"{name}: {value}\r\n".encode()
+                for name, value in headers.items()
+            )
+            parts.extend((b"\r\n", data, b"\r\n"))
+
+        if response.payload:
+            part(
+                {
+                    "Content-Disposition": 'form-data; name="payload_json"',
+                    "Content-Type": response.content_type
+                    or _JSON_CONTENT_TYPE,
+                },
+                response.payload,
+            )
+
+        for index, file in enumerate(response.files):
+            async with file.stream() as stream:
+                mimetype = stream.mimetype or "application/octet-stream"
+                data = await stream.read()
+
+            part(
+                {
+                    "Content-Disposition": (
+                        f'form-data; name="files[{index}]"; '
+                        f'filename="{file.filename}"'
+                    ),
+                    "Content-Type": mimetype,
+                },
+                data,
+            )
+
+        parts.append(f"--{boundary}--\r\n".encode())
+
+        return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+    def run(
+        self,
+        *,
+        host: str = Config.INTERACTIONS_HOST,
+        port: int = Config.INTERACTIONS_PORT,
+    ) -> None:
+        from uvicorn import run
+
+        run(self, host=host, port=port, log_config=None)
+
+
+__all__: Final = ("InteractionApp",)
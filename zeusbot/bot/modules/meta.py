@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import TYPE_CHECKING
+
+from tanjun import (
+    Component,
+    as_loader,
+    as_slash_command,
+    as_unloader,
+    injected,
+    with_str_slash_option,
+)
+from tanjun.abc import SlashContext
+
+from zeusbot.bot.client import ZeusClient
+
+if TYPE_CHECKING:
+    from tanjun import Client
+
+    from zeusbot.utils import ScheduledJob
+
+_DURATION = re.compile(r"(\d+)\s*([dhms])")
+_UNITS = {"d": "days", "h": "hours", "m": "minutes", "s": "seconds"}
+
+meta_component = Component(name="meta")
+
+
+def parse_duration(text: str) -> timedelta | None:
+    """Parse a duration such as ``1h30m``, or ``None`` if it is invalid."""
+
+    text = text.replace(" ", "").lower()
+    parts = _DURATION.findall(text)
+
+    if not parts or "".join(f"{n}{u}" for n, u in parts) != text:
+        return None
+
+    return timedelta(**{_UNITS[unit]: int(n) for n, unit in parts})
+
+
+async def send_reminder(client: ZeusClient, job: ScheduledJob) -> None:
+    user_id = int(job.payload["user_id"])
+
+    await client.rest.create_message(
+        int(job.payload["channel_id"]),
+        f"<@{user_id}>, you asked me to remind you: {job.payload['text']}",
+        user_mentions=[user_id],
+    )
+
+
+@meta_component.with_slash_command
+@with_str_slash_option("text", "What to remind you of")
+@with_str_slash_option("duration", "When to remind you, e.g. 1h30m")
+@as_slash_command("remind", "Set a reminder")
+async def remind_slash(
+    ctx: SlashContext,
+    duration: str,
+    text: str,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    if (delay := parse_duration(duration)) is None or not delay:
+        await ctx.respond("That is not a valid duration.", ephemeral=True)
+        return
+
+    due_at = datetime.now(timezone.utc) + delay
+    await client.scheduler.schedule(
+        "reminder",
+        due_at,
+        {
+            "channel_id": str(ctx.channel_id),
+            "user_id": str(ctx.author.id),
+            "text": text,
+        },
+    )
+    await ctx.respond(
+        f"I'll remind you <t:{int(due_at.timestamp())}:R>.",
+        ephemeral=True,
+    )
+
+
+@as_loader
+def load(client: Client) -> None:
+    assert isinstance(client, ZeusClient)
+    client.add_component(meta_component)
+    client.scheduler.set_handler("reminder", partial(send_reminder, client))
+
+
+@as_unloader
+def unload(client: Client) -> None:
+    assert isinstance(client, ZeusClient)
+    client.remove_component(meta_component)
+    client.scheduler.set_handler("reminder", None)
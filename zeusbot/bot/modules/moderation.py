@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from hikari import (
+    ForbiddenError,
+    GuildMessageCreateEvent,
+    NotFoundError,
+    Permissions,
+)
+from tanjun import (
+    Component,
+    injected,
+    slash_command_group,
+    with_author_permission_check,
+    with_bool_slash_option,
+    with_guild_check,
+    with_str_slash_option,
+)
+from tanjun.abc import SlashContext
+
+from zeusbot.bot.client import ZeusClient
+
+moderation_component = Component(name="moderation")
+loader = moderation_component.make_loader()
+filter_group = moderation_component.with_slash_command(
+    with_author_permission_check(Permissions.MANAGE_MESSAGES)(
+        with_guild_check(
+            slash_command_group(
+                "filter",
+                "Manage the words and regexes filtered in this server",
+                default_member_permissions=Permissions.MANAGE_MESSAGES,
+            ),
+        ),
+    ),
+)
+
+
+@moderation_component.with_listener(GuildMessageCreateEvent)
+async def on_guild_message_create(
+    event: GuildMessageCreateEvent,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    if not event.content or not event.is_human:
+        return
+
+    if client.moderation.match(event.guild_id, event.content) is None:
+        return
+
+    try:
+        await event.message.delete()
+
+    except (ForbiddenError, NotFoundError):
+        return
+
+    client.metrics.increment("moderation.deleted")
+
+
+@with_bool_slash_option("regex", "Whether it is a regex", default=False)
+@with_str_slash_option("pattern", "The word, or regex, to filter")
+@filter_group.as_sub_command("add", "Filter a word or a regex")
+async def filter_add_slash(
+    ctx: SlashContext,
+    pattern: str,
+    regex: bool = False,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+
+    try:
+        added = await client.moderation.add(ctx.guild_id, pattern, regex)
+
+    except ValueError as exc:
+        await ctx.respond(str(exc), ephemeral=True)
+        return
+
+    await ctx.respond(
+        f"Now filtering `{pattern}`." if added else "Already filtered.",
+        ephemeral=True,
+    )
+
+
+@with_bool_slash_option("regex", "Whether it is a regex", default=False)
+@with_str_slash_option("pattern", "The word, or regex, to stop filtering")
+@filter_group.as_sub_command("remove", "Stop filtering a word or a regex")
+async def filter_remove_slash(
+    ctx: SlashContext,
+    pattern: str,
+    regex: bool = False,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+    removed = await client.moderation.remove(ctx.guild_id, pattern, regex)
+
+    await ctx.respond(
+        f"Stopped filtering `{pattern}`." if removed else "Not filtered.",
+        ephemeral=True,
+    )
+
+
+@filter_group.as_sub_command("list", "List the filtered words and regexes")
+async def filter_list_slash(
+    ctx: SlashContext,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+    words, regexes = await client.moderation.patterns(ctx.guild_id)
+
+    if not words and not regexes:
+        await ctx.respond("Nothing is filtered here.", ephemeral=True)
+        return
+
+    fields = [
+        (name, "\n".join(f"`{pattern}`" for pattern in patterns)[:1024], False)
+        for name, patterns in (("Words", words), ("Regexes", regexes))
+        if patterns
+    ]
+
+    await ctx.respond(
+        embed=client.hikari.build_embed(title="Filters", fields=fields),
+        ephemeral=True,
+    )
@@ -109,6 +109,18 @@ async def repeat_slash(
     await client.music.repeat(ctx, status)
 
 
+@music_component.with_slash_command
+@with_bool_slash_option("status", "Whether to pick tracks when the queue ends")
+@as_slash_command("autoplay", "Set autoplay mode")
+async def autoplay_slash(
+    ctx: SlashContext,
+    status: bool,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    await client.music.set_autoplay(ctx, status)
+
+
 @music_component.with_slash_command
 @with_int_slash_option("level", "Level of volume to set")
 @as_slash_command("volume", "Set the volume")
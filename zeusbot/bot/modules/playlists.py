@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from tanjun import (
+    Component,
+    injected,
+    slash_command_group,
+    with_str_slash_option,
+)
+from tanjun.abc import SlashContext
+
+from zeusbot.bot.client import ZeusClient
+
+playlists_component = Component(name="playlists")
+loader = playlists_component.make_loader()
+playlist_group = playlists_component.with_slash_command(
+    slash_command_group("playlist", "Manage your saved playlists"),
+)
+
+
+@with_str_slash_option(
+    "link",
+    "A playlist link to save, instead of the queue",
+    default=None,
+)
+@with_str_slash_option("name", "The playlist's name", max_length=100)
+@playlist_group.as_sub_command("save", "Save the queue, or a link")
+async def playlist_save_slash(
+    ctx: SlashContext,
+    name: str,
+    link: str | None = None,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    await client.music.save_playlist(ctx, name, link)
+
+
+@with_str_slash_option("name", "The playlist's name")
+@playlist_group.as_sub_command("load", "Queue one of your playlists")
+async def playlist_load_slash(
+    ctx: SlashContext,
+    name: str,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    await client.music.load_playlist(ctx, name)
+
+
+@playlist_group.as_sub_command("list", "List your playlists")
+async def playlist_list_slash(
+    ctx: SlashContext,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    rows = await client.playlists.names(ctx.author.id)
+
+    if not rows:
+        await ctx.respond("You have no saved playlists.", ephemeral=True)
+        return
+
+    await ctx.respond(
+        embed=client.hikari.build_embed(
+            title="Your playlists",
+            description="\n".join(
+                f"`{row['name']}`: {row['track_count']} tracks" for row in rows
+            )[:4096],
+        ),
+        ephemeral=True,
+    )
+
+
+@with_str_slash_option("name", "The playlist's name")
+@playlist_group.as_sub_command("delete", "Delete one of your playlists")
+async def playlist_delete_slash(
+    ctx: SlashContext,
+    name: str,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    deleted = await client.playlists.delete(ctx.author.id, name)
+
+    await ctx.respond(
+        f"Deleted `{name}`." if deleted else f"You have no `{name}`.",
+        ephemeral=True,
+    )
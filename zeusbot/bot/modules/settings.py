@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from hikari import Permissions
+from tanjun import (
+    Component,
+    injected,
+    slash_command_group,
+    with_author_permission_check,
+    with_guild_check,
+    with_int_slash_option,
+    with_role_slash_option,
+)
+from tanjun.abc import SlashContext
+
+from zeusbot.bot.client import ZeusClient
+
+if TYPE_CHECKING:
+    from hikari import Role
+
+    from zeusbot.utils import GuildSettings
+
+settings_component = Component(name="settings")
+loader = settings_component.make_loader()
+settings_group = settings_component.with_slash_command(
+    with_author_permission_check(Permissions.MANAGE_GUILD)(
+        with_guild_check(
+            slash_command_group(
+                "settings",
+                "Manage the bot's settings in this server",
+                default_member_permissions=Permissions.MANAGE_GUILD,
+            ),
+        ),
+    ),
+)
+
+
+def describe(settings: GuildSettings) -> str:
+    dj_role = (
+        "anyone"
+        if settings.dj_role_id is None
+        else f"<@&{settings.dj_role_id}>"
+    )
+
+    return (
+        f"Default volume: {settings.default_volume}%\n"
+        f"Queue limit: {settings.max_queue_length} tracks\n"
+        f"Player controlled by: {dj_role}"
+    )
+
+
+@settings_group.as_sub_command("show", "Show this server's settings")
+async def settings_show_slash(
+    ctx: SlashContext,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+    settings = await client.settings.get(ctx.guild_id)
+
+    await ctx.respond(describe(settings), ephemeral=True)
+
+
+@with_int_slash_option(
+    "volume",
+    "The volume, in percent",
+    min_value=0,
+    max_value=1000,
+)
+@settings_group.as_sub_command("volume", "Set the volume the player starts at")
+async def settings_volume_slash(
+    ctx: SlashContext,
+    volume: int,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+    settings = await client.settings.update(
+        ctx.guild_id,
+        default_volume=volume,
+    )
+
+    await ctx.respond(describe(settings), ephemeral=True)
+
+
+@with_int_slash_option(
+    "length",
+    "The number of tracks",
+    min_value=1,
+    max_value=10_000,
+)
+@settings_group.as_sub_command("queue-limit", "Limit the queue's length")
+async def settings_queue_limit_slash(
+    ctx: SlashContext,
+    length: int,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+    settings = await client.settings.update(
+        ctx.guild_id,
+        max_queue_length=length,
+    )
+
+    await ctx.respond(describe(settings), ephemeral=True)
+
+
+@with_role_slash_option(
+    "role",
+    "The role, or none to let anyone control it",
+    default=None,
+)
+@settings_group.as_sub_command(
+    "dj-role",
+    "Set the role that controls the player; anyone may still /play",
+)
+async def settings_dj_role_slash(
+    ctx: SlashContext,
+    role: Role | None = None,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+    settings = await client.settings.update(
+        ctx.guild_id,
+        dj_role_id=None if role is None else int(role.id),
+    )
+
+    await ctx.respond(describe(settings), ephemeral=True)
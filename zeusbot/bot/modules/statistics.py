@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from tanjun import (
+    Component,
+    injected,
+    slash_command_group,
+    with_guild_check,
+    with_int_slash_option,
+)
+from tanjun.abc import SlashContext
+
+from zeusbot.bot.client import ZeusClient
+
+statistics_component = Component(name="statistics")
+loader = statistics_component.make_loader()
+stats_group = statistics_component.with_slash_command(
+    with_guild_check(
+        slash_command_group("stats", "Show this server's statistics"),
+    ),
+)
+
+
+@with_int_slash_option(
+    "limit",
+    "How many tracks to show",
+    default=10,
+    min_value=1,
+    max_value=25,
+)
+@stats_group.as_sub_command("tracks", "The most played tracks")
+async def tracks_slash(
+    ctx: SlashContext,
+    limit: int = 10,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+    tracks = await client.statistics.top_tracks(ctx.guild_id, limit)
+
+    if not tracks:
+        await ctx.respond("No tracks have been played here yet.")
+        return
+
+    await ctx.respond(
+        embed=client.hikari.build_embed(
+            title="Top tracks",
+            description="\n".join(
+                f"{index}. {track['title']} ({track['plays']} plays)"
+                for index, track in enumerate(tracks, 1)
+            ),
+        ),
+    )
+
+
+@with_int_slash_option(
+    "limit",
+    "How many commands to show",
+    default=10,
+    min_value=1,
+    max_value=25,
+)
+@stats_group.as_sub_command("commands", "The most used commands")
+async def commands_slash(
+    ctx: SlashContext,
+    limit: int = 10,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    assert ctx.guild_id is not None
+    commands = await client.statistics.top_commands(ctx.guild_id, limit)
+
+    if not commands:
+        await ctx.respond("No commands have been used here yet.")
+        return
+
+    await ctx.respond(
+        embed=client.hikari.build_embed(
+            title="Top commands",
+            description="\n".join(
+                f"{index}. /{command['command']} ({command['uses']} uses)"
+                for index, command in enumerate(commands, 1)
+            ),
+        ),
+    )
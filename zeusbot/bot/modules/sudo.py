@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from tanjun import (
+    Component,
+    as_slash_command,
+    injected,
+    with_bool_slash_option,
+    with_int_slash_option,
+    with_str_slash_option,
+)
+from tanjun.abc import Context, SlashContext
+
+from zeusbot.bot.client import ZeusClient
+from zeusbot.utils import Config
+
+
+def is_author(ctx: Context) -> bool:
+    return ctx.author.id == Config.AUTHOR_ID
+
+
+sudo_component = Component(name="sudo").add_check(is_author)
+loader = sudo_component.make_loader()
+# Discord's limits on an embed, leaving room for a code block's fences.
+_MAX_FIELDS = 25
+_MAX_DESCRIPTION = 4000
+
+
+@sudo_component.with_slash_command
+@with_bool_slash_option(
+    "utilities",
+    "Whether to reload the music utility too",
+    default=False,
+)
+@with_str_slash_option("module", "The module to reload", default=None)
+@as_slash_command("reload", "Hot reload the bot's modules")
+async def reload_slash(
+    ctx: SlashContext,
+    module: str | None = None,
+    utilities: bool = False,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    try:
+        report = await client.hot_reload(
+            *(module,) if module else (),
+            utilities=utilities,
+            ctx=ctx,
+        )
+
+    except ValueError as exc:
+        await ctx.respond(str(exc))
+        return
+
+    latency = max(report.latencies, default=0)
+    await ctx.respond(
+        f"Reloaded {', '.join(report.modules)} in "
+        f"{report.duration * 1000:.1f}ms. "
+        f"{len(report.latencies)}/{report.in_flight} commands in flight "
+        f"finished, the slowest in {latency * 1000:.1f}ms.",
+    )
+
+
+@sudo_component.with_slash_command
+@as_slash_command("metrics", "Show the bot's runtime metrics")
+async def metrics_slash(
+    ctx: SlashContext,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    snapshot = client.metrics.snapshot()
+    fields = [
+        (
+            name,
+            f"p50 {histogram['p50'] * 1000:.1f}ms, "
+            f"p99 {histogram['p99'] * 1000:.1f}ms, "
+            f"max {histogram['max'] * 1000:.1f}ms "
+            f"({histogram['count']} samples)",
+            False,
+        )
+        for name, histogram in snapshot["histograms"].items()
+    ]
+    # The counters outnumber the fields an embed may have.
+    counters = "\n".join(
+        f"{name} {value}" for name, value in snapshot["counters"].items()
+    )
+
+    await ctx.respond(
+        embed=client.hikari.build_embed(
+            title="Metrics",
+            description=f"```\n{counters[:_MAX_DESCRIPTION]}\n```",
+            fields=fields[:_MAX_FIELDS],
+        ),
+    )
+
+
+def _size(size: int) -> str:
+    sign = "-" if size < 0 else "+"
+
+    return f"{sign}{abs(size) / 1024:.0f}KiB"
+
+
+@sudo_component.with_slash_command
+@with_int_slash_option(
+    "top",
+    "How many subsystems to show",
+    default=10,
+    min_value=1,
+    max_value=15,
+)
+@with_int_slash_option(
+    "frames",
+    "How many frames to trace, if tracing is not armed",
+    default=1,
+    min_value=1,
+    max_value=25,
+)
+@with_int_slash_option(
+    "interval",
+    "How many seconds to watch, or 0 for everything traced so far",
+    default=30,
+    min_value=0,
+    max_value=600,
+)
+@as_slash_command("memory", "Profile the bot's memory by subsystem")
+async def memory_slash(
+    ctx: SlashContext,
+    interval: int = 30,
+    frames: int = 1,
+    top: int = 10,
+    *,
+    client: ZeusClient = injected(type=ZeusClient),
+) -> None:
+    await ctx.defer()
+    report = await client.memory.profile(interval, frames)
+    fields = [
+        (
+            usage.name,
+            f"{usage.size / 1024:.0f}KiB ({_size(usage.size_diff)}), "
+            f"{usage.count} blocks ({usage.count_diff:+})",
+            False,
+        )
+        for usage in report.subsystems[:top]
+    ]
+    fields.extend(
+        (name, str(count), True) for name, count in report.counts.items()
+    )
+
+    await ctx.respond(
+        embed=client.hikari.build_embed(
+            title="Memory",
+            description=(
+                f"{report.traced / 2**20:.1f}MiB traced, "
+                f"{report.peak / 2**20:.1f}MiB at peak, "
+                f"{report.overhead / 2**20:.1f}MiB spent tracing"
+                + (f", over {report.interval:.0f}s" if report.interval else "")
+            ),
+            fields=fields[:_MAX_FIELDS],
+        ),
+    )
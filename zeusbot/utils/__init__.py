@@ -1,3 +1,24 @@
+from .autoplay import *
+from .commands import *
 from .config import *
+from .dashboard import *
+from .database import *
+from .errors import *
+from .gateway import *
 from .hikari import *
+from .logs import *
+from .loop import *
+from .memory import *
+from .metrics import *
+from .moderation import *
 from .music import *
+from .panels import *
+from .player import *
+from .playlists import *
+from .scheduler import *
+from .settings import *
+from .startup import *
+from .statistics import *
+from .storage import *
+from .traffic import *
+from .workers import *
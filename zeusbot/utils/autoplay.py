@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+from array import array
+from base64 import b64decode
+from collections import OrderedDict, deque
+from heapq import nlargest
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from .playlists import decode_track
+
+if TYPE_CHECKING:
+    from typing import Container, Deque, Dict, Final, List, Set, Tuple
+
+    from lavaplayer import Track  # type: ignore
+
+    from .metrics import Metrics
+    from .player import PlayerEvent
+
+# Weights are stored scaled up, and rescaled before float32 overflows.
+_RESCALE_AT: Final = 1e30
+
+
+class CoOccurrenceIndex:
+    """
+    Counts how often tracks are played or queued together, to recommend a
+    track given another one.
+
+    Tracks are numbered, and every track keeps its neighbours' numbers and
+    weights in two flat arrays, of at most ``degree`` entries; a stronger
+    pairing replaces the weakest one when they are full. Edges are kept
+    symmetric, so that a track can be removed along with every edge to it.
+    At most ``capacity`` tracks are kept, removing the least recently
+    paired first.
+
+    Every pairing weighs ``2 ** (1 / half_life)`` times more than the one
+    before it, rather than every weight decaying as pairings come in, so
+    that older pairings count for half as much ``half_life`` pairings on.
+    Edges that decayed to nothing are dropped whenever the weights are
+    rescaled, to keep them from overflowing.
+    """
+
+    __slots__ = (
+        "_capacity",
+        "_degree",
+        "_growth",
+        "_scale",
+        "_minimum",
+        "_ids",
+        "_identifiers",
+        "_encoded",
+        "_neighbors",
+        "_weights",
+        "_touched",
+        "_free",
+    )
+
+    def __init__(
+        self,
+        *,
+        capacity: int = 50_000,
+        degree: int = 32,
+        half_life: int = 100_000,
+        minimum: float = 0.01,
+    ) -> None:
+        self._capacity = capacity
+        self._degree = degree
+        self._growth = 2 ** (1 / half_life)
+        self._scale = 1.0
+        self._minimum = minimum
+        self._ids: Dict[str, int] = {}
+        self._identifiers: List[str] = []
+        self._encoded: List[str] = []
+        self._neighbors: List[array[int]] = []
+        self._weights: List[array[float]] = []
+        self._touched: OrderedDict[int, None] = OrderedDict()
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, identifier: object) -> bool:
+        return identifier in self._ids
+
+    @property
+    def edges(self) -> int:
+        """The number of pairings kept, counting each once."""
+
+        return sum(map(len, self._neighbors)) // 2
+
+    def encoded(self, identifier: str) -> str | None:
+        """The Lavalink encoded track of a track in the index."""
+
+        if (track_id := self._ids.get(identifier)) is None:
+            return None
+
+        return self._encoded[track_id]
+
+    def observe(
+        self, first: Track, second: Track, weight: float = 1.0
+    ) -> None:
+        """Pair two tracks, played or queued together."""
+
+        if first.identifier == second.identifier:
+            return
+
+        a, b = self._id(first), self._id(second)
+
+        if a is None or b is None:
+            return
+
+        self._scale *= self._growth
+
+        if self._scale > _RESCALE_AT:
+            self._rescale()
+
+        weight *= self._scale
+        at_a = self._slot(a, b, weight)
+        at_b = self._slot(b, a, weight)
+
+        # Either both tracks keep the edge, or neither does.
+        if at_a is None or at_b is None:
+            return
+
+        self._link(a, b, at_a, weight)
+        self._link(b, a, at_b, weight)
+
+    def top(self, identifier: str, k: int = 5) -> List[Tuple[str, float]]:
+        """The ``k`` tracks paired the most with a track, and their weights."""
+
+        if (track_id := self._ids.get(identifier)) is None:
+            return []
+
+        neighbors = self._neighbors[track_id]
+        weights = self._weights[track_id]
+        best = nlargest(k, range(len(weights)), key=weights.__getitem__)
+
+        return [
+            (self._identifiers[neighbors[i]], weights[i] / self._scale)
+            for i in best
+        ]
+
+    def recommend(
+        self,
+        identifier: str,
+        exclude: Container[str] = (),
+        k: int = 8,
+    ) -> str | None:
+        """
+        The encoded track paired the most with a track, of the ``k`` paired
+        the most with it that are not excluded.
+        """
+
+        for neighbor, _ in self.top(identifier, k):
+            if neighbor not in exclude:
+                return self.encoded(neighbor)
+
+        return None
+
+    def _id(self, track: Track) -> int | None:
+        if (track_id := self._ids.get(track.identifier)) is not None:
+            self._touched.move_to_end(track_id)
+            return track_id
+
+        if not track.track:
+            return None
+
+        if len(self._ids) >= self._capacity:
+            self._remove(next(iter(self._touched)))
+
+        if self._free:
+            track_id = self._free.pop()
+            self._identifiers[track_id] = track.identifier
+            self._encoded[track_id] = track.track
+
+        else:
+            track_id = len(self._identifiers)
+            self._identifiers.append(track.identifier)
+            self._encoded.append(track.track)
+            self._neighbors.append(array("I"))
+            self._weights.append(array("f"))
+
+        self._ids[track.identifier] = track_id
+        self._touched[track_id] = None
+
+        return track_id
+
+    def _slot(self, track_id: int, other: int, weight: float) -> int | None:
+        """
+        Where ``other`` goes in the track's arrays: its index if it is there,
+        ``-1`` to append it, the index of the weakest edge to replace, or
+        ``None`` if every edge is stronger.
+        """
+
+        neighbors, weights = self._neighbors[track_id], self._weights[track_id]
+
+        try:
+            return neighbors.index(other)
+
+        except ValueError:
+            pass
+
+        if len(neighbors) < self._degree:
+            return -1
+
+        weakest = min(range(len(weights)), key=weights.__getitem__)
+
+        return weakest if weights[weakest] < weight else None
+
+    def _link(self, track_id: int, other: int, at: int, weight: float) -> None:
+        neighbors, weights = self._neighbors[track_id], self._weights[track_id]
+
+        if at == -1:
+            neighbors.append(other)
+            weights.append(weight)
+
+        elif neighbors[at] == other:
+            weights[at] += weight
+
+        else:
+            self._unlink(neighbors[at], track_id)
+            neighbors[at] = other
+            weights[at] = weight
+
+    def _unlink(self, track_id: int, other: int) -> None:
+        neighbors = self._neighbors[track_id]
+
+        try:
+            at = neighbors.index(other)
+
+        except ValueError:
+            return
+
+        del neighbors[at]
+        del self._weights[track_id][at]
+
+    def _remove(self, track_id: int) -> None:
+        for neighbor in self._neighbors[track_id]:
+            self._unlink(neighbor, track_id)
+
+        del self._ids[self._identifiers[track_id]]
+        del self._touched[track_id]
+        self._identifiers[track_id] = self._encoded[track_id] = ""
+        self._neighbors[track_id] = array("I")
+        self._weights[track_id] = array("f")
+        self._free.append(track_id)
+
+    def _rescale(self) -> None:
+        for track_id in self._ids.values():
+            neighbors, weights = (
+                self._neighbors[track_id],
+                self._weights[track_id],
+            )
+            kept = [
+                (neighbor, weight / self._scale)
+                for neighbor, weight in zip(neighbors, weights)
+                if weight / self._scale >= self._minimum
+            ]
+            self._neighbors[track_id] = array("I", (n for n, _ in kept))
+            self._weights[track_id] = array("f", (w for _, w in kept))
+
+        self._scale = 1.0
+
+
+class Autoplay:
+    """
+    Feeds the tracks guilds play back to back, and queue together, into a
+    :class:`CoOccurrenceIndex`, and picks the next track from it when the
+    queue of a guild with autoplay on runs dry.
+
+    The index holds Lavalink encoded tracks, so the chosen track is decoded
+    locally, with no search. The tracks it picks are not paired, so that
+    its picks do not reinforce themselves.
+    """
+
+    __slots__ = (
+        "_metrics",
+        "_index",
+        "_history_size",
+        "_enabled",
+        "_current",
+        "_picked",
+        "_history",
+    )
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        *,
+        index: CoOccurrenceIndex | None = None,
+        history: int = 20,
+    ) -> None:
+        self._metrics = metrics
+        self._index = index or CoOccurrenceIndex()
+        self._history_size = history
+        self._enabled: Set[int] = set()
+        # The track playing in every guild, and whether it was picked.
+        self._current: Dict[int, Tuple[Track, bool]] = {}
+        self._picked: Dict[int, str] = {}
+        self._history: Dict[int, Deque[str]] = {}
+
+    @property
+    def index(self) -> CoOccurrenceIndex:
+        return self._index
+
+    def enabled(self, guild_id: int) -> bool:
+        """Whether autoplay is on in a guild."""
+
+        return int(guild_id) in self._enabled
+
+    def enable(self, guild_id: int, enabled: bool = True) -> None:
+        """Turn autoplay on, or off, in a guild."""
+
+        if enabled:
+            self._enabled.add(int(guild_id))
+
+        else:
+            self._enabled.discard(int(guild_id))
+
+    def player_event(self, event: PlayerEvent) -> None:
+        """Pair the tracks a guild plays back to back, or queues."""
+
+        if event.track is None or event.kind not in ("start", "queue"):
+            return
+
+        guild_id = int(event.guild_id)
+        current = self._current.get(guild_id)
+        paired = current is not None and not current[1]
+
+        if event.kind == "queue":
+            if paired:
+                self._index.observe(current[0], event.track, 0.5)
+
+            return
+
+        picked = self._picked.pop(guild_id, None) == event.track.identifier
+
+        if paired and not picked:
+            self._index.observe(current[0], event.track)
+
+        self._current[guild_id] = (event.track, picked)
+        self._history.setdefault(
+            guild_id,
+            deque(maxlen=self._history_size),
+        ).append(event.track.identifier)
+
+    def queued(self, tracks: List[Track]) -> None:
+        """Pair the tracks queued together, like a playlist's, in order."""
+
+        for first, second in zip(tracks, tracks[1:]):
+            self._index.observe(first, second, 0.5)
+
+    def pick(self, guild_id: int, track: Track) -> Track | None:
+        """
+        The track to play after ``track`` in a guild, out of those it did not
+        play lately, if any was paired with it.
+        """
+
+        history = self._history.get(int(guild_id), ())
+        encoded = self._index.recommend(track.identifier, history)
+
+        if encoded is None:
+            self._metrics.increment("autoplay.missed")
+            return None
+
+        picked = decode_track(b64decode(encoded))
+        self._picked[int(guild_id)] = picked.identifier
+        self._metrics.increment("autoplay.picked")
+
+        return picked
+
+
+__all__: Final = ("Autoplay", "CoOccurrenceIndex")
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import json
+from asyncio import Condition, TimeoutError, wait_for
+from hashlib import sha256
+from itertools import chain
+from logging import getLogger
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from hikari import UNDEFINED, CommandType, NotFoundError, Snowflake
+from tanjun import AnyHooks
+
+if TYPE_CHECKING:
+    from typing import Any, Collection, Dict, Final, List, Mapping, Set, Tuple
+
+    from hikari import (
+        PartialApplication,
+        PartialCommand,
+        PartialGuild,
+        SnowflakeishOr,
+        UndefinedOr,
+    )
+    from hikari.api import CommandBuilder
+    from tanjun.abc import AppCommand, Client, Context
+
+    from .metrics import Metrics
+    from .storage import LocalStorage
+
+    Declared = Dict[str, Dict[str, str]]
+
+
+class CommandDeclarer:
+    """
+    Declares a client's application commands, but only uploads the commands
+    whose schema changed since they were last declared.
+    The hash of every declared command's schema is persisted per guild, so
+    an unchanged restart costs no REST calls at all.
+    """
+
+    __slots__ = ("_storage",)
+    document = "commands.json"
+    logger = getLogger(__name__)
+
+    def __init__(self, storage: LocalStorage) -> None:
+        self._storage = storage
+
+    @staticmethod
+    def _key(command: AppCommand[Any]) -> str:
+        return f"{int(command.type)}:{command.name}"
+
+    @staticmethod
+    def _build(client: Client, command: AppCommand[Any]) -> CommandBuilder:
+        builder = command.build()
+
+        if builder.default_member_permissions is UNDEFINED:
+            builder.set_default_member_permissions(
+                client.default_app_cmd_permissions,
+            )
+
+        if builder.is_dm_enabled is UNDEFINED:
+            builder.set_is_dm_enabled(client.dms_enabled_for_app_cmds)
+
+        return builder
+
+    @classmethod
+    def _hash(cls, client: Client, command: AppCommand[Any]) -> str:
+        schema = cls._build(client, command).build(client.rest.entity_factory)
+
+        return sha256(
+            json.dumps(schema, sort_keys=True, default=str).encode(),
+        ).hexdigest()
+
+    @staticmethod
+    def _explicit_id(
+        command: AppCommand[Any],
+        command_ids: Mapping[str, SnowflakeishOr[PartialCommand]],
+        message_ids: Mapping[str, SnowflakeishOr[PartialCommand]],
+        user_ids: Mapping[str, SnowflakeishOr[PartialCommand]],
+    ) -> str | None:
+        ids = {
+            CommandType.MESSAGE: message_ids,
+            CommandType.USER: user_ids,
+        }.get(command.type, command_ids)
+
+        if (command_id := ids.get(command.name)) is None:
+            return None
+
+        return str(int(command_id))
+
+    async def declare(
+        self,
+        client: Client,
+        /,
+        *,
+        application: SnowflakeishOr[PartialApplication],
+        guild: UndefinedOr[SnowflakeishOr[PartialGuild]] = UNDEFINED,
+        command_ids: Mapping[str, SnowflakeishOr[PartialCommand]]
+        | None = None,
+        message_ids: Mapping[str, SnowflakeishOr[PartialCommand]]
+        | None = None,
+        user_ids: Mapping[str, SnowflakeishOr[PartialCommand]] | None = None,
+        force: bool = False,
+    ) -> int:
+        """
+        Declare the client's global commands in a guild, or globally.
+        Returns the number of commands that had to be uploaded.
+        """
+
+        command_ids = command_ids or {}
+        message_ids = message_ids or {}
+        user_ids = user_ids or {}
+        target = "global" if guild is UNDEFINED else str(int(guild))
+        document: Dict[str, Declared] = self._storage.read_json(
+            self.document,
+            {},
+        )
+        declared = {} if force else document.get(target, {})
+        commands: Dict[str, AppCommand[Any]] = {
+            self._key(command): command
+            for command in chain(
+                client.iter_slash_commands(global_only=True),
+                client.iter_menu_commands(global_only=True),
+            )
+        }
+        hashes = {
+            key: self._hash(client, command)
+            for key, command in commands.items()
+        }
+        changed = [
+            key
+            for key, hash_ in hashes.items()
+            if declared.get(key, {}).get("hash") != hash_
+        ]
+        removed = [key for key in declared if key not in commands]
+
+        if not changed and not removed:
+            self.logger.info("Commands for %s are up to date.", target)
+            return 0
+
+        if not declared or len(changed) + len(removed) > len(commands) // 2:
+            # Bulk overwriting is cheaper than many single upserts.
+            responses = await client.declare_application_commands(
+                commands.values(),
+                command_ids,
+                application=application,
+                guild=guild,
+                message_ids=message_ids,
+                user_ids=user_ids,
+                force=True,
+            )
+            uploaded = len(responses)
+            ids = {
+                f"{int(response.type)}:{response.name}": str(response.id)
+                for response in responses
+            }
+
+        else:
+            uploaded, ids = await self._upsert(
+                client,
+                [commands[key] for key in changed],
+                [declared[key]["id"] for key in removed],
+                {key: declared[key]["id"] for key in declared},
+                application=application,
+                guild=guild,
+                command_ids=command_ids,
+                message_ids=message_ids,
+                user_ids=user_ids,
+            )
+
+        document[target] = {
+            key: {"hash": hash_, "id": ids[key]}
+            for key, hash_ in hashes.items()
+            if key in ids
+        }
+        self._storage.write_json(self.document, document)
+        self.logger.info("Uploaded %s commands for %s.", uploaded, target)
+
+        return uploaded
+
+    async def _upsert(
+        self,
+        client: Client,
+        changed: List[AppCommand[Any]],
+        removed: List[str],
+        ids: Dict[str, str],
+        /,
+        *,
+        application: SnowflakeishOr[PartialApplication],
+        guild: UndefinedOr[SnowflakeishOr[PartialGuild]],
+        command_ids: Mapping[str, SnowflakeishOr[PartialCommand]],
+        message_ids: Mapping[str, SnowflakeishOr[PartialCommand]],
+        user_ids: Mapping[str, SnowflakeishOr[PartialCommand]],
+    ) -> Tuple[int, Dict[str, str]]:
+        for command_id in removed:
+            try:
+                await client.rest.delete_application_command(
+                    application,
+                    Snowflake(command_id),
+                    guild=guild,
+                )
+
+            except NotFoundError:
+                pass
+
+        for command in changed:
+            key = self._key(command)
+            command_id = self._explicit_id(
+                command,
+                command_ids,
+                message_ids,
+                user_ids,
+            ) or ids.get(key)
+
+            try:
+                response = await client.declare_application_command(
+                    command,
+                    Snowflake(command_id) if command_id else None,
+                    application=application,
+                    guild=guild,
+                )
+
+            except NotFoundError:
+                # The command was deleted outside of the bot; recreate it.
+                response = await client.declare_application_command(
+                    command,
+                    application=application,
+                    guild=guild,
+                )
+
+            ids[key] = str(response.id)
+
+        return len(changed) + len(removed), ids
+
+
+class CommandTracker:
+    """
+    Tracks the commands that are currently executing, through client hooks.
+    Used to measure how commands in flight fare across a hot reload.
+    """
+
+    __slots__ = (
+        "_metrics",
+        "_in_flight",
+        "_watched",
+        "_latencies",
+        "_condition",
+    )
+
+    def __init__(self, metrics: Metrics | None = None) -> None:
+        self._metrics = metrics
+        self._in_flight: Dict[int, float] = {}
+        self._watched: Set[int] = set()
+        self._latencies: Dict[int, float] = {}
+        self._condition = Condition()
+
+    @property
+    def hooks(self) -> AnyHooks:
+        """The hooks to set on the client to track its commands."""
+
+        return (
+            AnyHooks()
+            .add_pre_execution(self._started)
+            .add_post_execution(self._finished)
+        )
+
+    @property
+    def in_flight(self) -> int:
+        """The number of commands currently executing."""
+
+        return len(self._in_flight)
+
+    async def _started(self, ctx: Context) -> None:
+        self._in_flight[id(ctx)] = perf_counter()
+
+    async def _finished(self, ctx: Context) -> None:
+        key = id(ctx)
+
+        if (started_at := self._in_flight.pop(key, None)) is None:
+            return
+
+        latency = perf_counter() - started_at
+
+        if self._metrics is not None:
+            self._metrics.histogram("commands.latency").observe(latency)
+
+        if key in self._watched:
+            self._watched.discard(key)
+            self._latencies[key] = latency
+
+        async with self._condition:
+            self._condition.notify_all()
+
+    def watch(self, *excluded: Context) -> Collection[int]:
+        """
+        Start recording the latency of the commands currently executing,
+        except ``excluded``, like the command watching them.
+        Returns the keys to pass to :meth:`collect`.
+        """
+
+        keys = set(self._in_flight).difference(map(id, excluded))
+        self._watched |= keys
+
+        return keys
+
+    async def collect(
+        self,
+        keys: Collection[int],
+        timeout: float | None = None,
+    ) -> List[float]:
+        """
+        Wait for the watched commands to finish, up to ``timeout`` seconds,
+        and return the latencies of those that did.
+        """
+
+        async with self._condition:
+            try:
+                await wait_for(
+                    self._condition.wait_for(
+                        lambda: self._in_flight.keys().isdisjoint(keys),
+                    ),
+                    timeout,
+                )
+
+            except TimeoutError:
+                pass
+
+        self._watched.difference_update(keys)
+
+        return [
+            self._latencies.pop(key) for key in keys if key in self._latencies
+        ]
+
+    async def wait_idle(self, timeout: float | None = None) -> bool:
+        """
+        Wait for every command to finish, up to ``timeout`` seconds.
+        Returns whether the tracker became idle in time.
+        """
+
+        async with self._condition:
+            try:
+                await wait_for(
+                    self._condition.wait_for(lambda: not self._in_flight),
+                    timeout,
+                )
+
+            except TimeoutError:
+                return False
+
+        return True
+
+
+__all__: Final = ("CommandDeclarer", "CommandTracker")
@@ -38,6 +38,21 @@ class EnvironmentVariables(str, Enum):
     HOME_GUILD_IDS = auto()
     AUTHOR_ID = auto()
     BOT_ID = auto()
+    MODULES = auto()
+    DATA_PATH = auto()
+    DRAIN_TIMEOUT = auto()
+    LOOP_LAG_THRESHOLD = auto()
+    LOOP_RESTART_AFTER = auto()
+    INTERACTIONS_PUBLIC_KEY = auto()
+    INTERACTIONS_HOST = auto()
+    INTERACTIONS_PORT = auto()
+    LOG_LEVEL = auto()
+    TRAFFIC_RECORD_PATH = auto()
+    MEMORY_TRACE_FRAMES = auto()
+    WORKER_PROCESSES = auto()
+    WORKER_TIMEOUT = auto()
+    DASHBOARD_HOST = auto()
+    DASHBOARD_PORT = auto()
 
     def __index__(self) -> str:
         return self.name
@@ -62,6 +77,26 @@ class EnvironmentVariableMissingException(Exception):
 
 env_set = False
 
+_defaults: Final[Dict[str, Any]] = {
+    "SENTRY_DSN": "",
+    "HOME_GUILD_IDS": True,
+    "MODULES": [],
+    "DATA_PATH": "data",
+    "DRAIN_TIMEOUT": 10,
+    "LOOP_LAG_THRESHOLD": 0.5,
+    "LOOP_RESTART_AFTER": 0.0,
+    "INTERACTIONS_PUBLIC_KEY": "",
+    "INTERACTIONS_HOST": "127.0.0.1",
+    "INTERACTIONS_PORT": 8080,
+    "LOG_LEVEL": "INFO",
+    "TRAFFIC_RECORD_PATH": "",
+    "MEMORY_TRACE_FRAMES": 0,
+    "WORKER_PROCESSES": 2,
+    "WORKER_TIMEOUT": 10.0,
+    "DASHBOARD_HOST": "127.0.0.1",
+    "DASHBOARD_PORT": 0,
+}
+
 
 def _load_dotenv() -> None:
     from pathlib import Path
@@ -114,14 +149,11 @@ class _MetaConfig(type):
         )
 
         for member in EnvironmentVariables.__members__:
-            if member == "HOME_GUILD_IDS":
-                setattr(
-                    self,
-                    member,
-                    self._get_environment_variable(member, True),
-                )
-
-            setattr(self, member, self._get_environment_variable(member))
+            setattr(
+                self,
+                member,
+                self._get_environment_variable(member, _defaults.get(member)),
+            )
 
         return self
 
@@ -138,6 +170,7 @@ class _MetaConfig(type):
             if x == "False"
             else None,
             "int": int,
+            "float": float,
         }
 
         return _map[(v := value.split(":", 1))[0]](v[1])
@@ -183,6 +216,21 @@ class Config(metaclass=_MetaConfig):
         HOME_GUILD_IDS: List[Snowflake] | Literal[True]
         AUTHOR_ID: Snowflake
         BOT_ID: Snowflake
+        MODULES: List[str]
+        DATA_PATH: str
+        DRAIN_TIMEOUT: int
+        LOOP_LAG_THRESHOLD: float
+        LOOP_RESTART_AFTER: float
+        INTERACTIONS_PUBLIC_KEY: str
+        INTERACTIONS_HOST: str
+        INTERACTIONS_PORT: int
+        LOG_LEVEL: str
+        TRAFFIC_RECORD_PATH: str
+        MEMORY_TRACE_FRAMES: int
+        WORKER_PROCESSES: int
+        WORKER_TIMEOUT: float
+        DASHBOARD_HOST: str
+        DASHBOARD_PORT: int
 
 
 __all__: Final = ("Config",)
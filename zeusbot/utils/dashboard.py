@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import json
+from asyncio import Queue, QueueFull, ensure_future, shield, sleep
+from logging import getLogger
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from asyncio import Future, Task
+    from typing import Any, Awaitable, Callable, Dict, Final, List, Set
+
+    from .metrics import Metrics
+    from .player import PlayerEvent
+
+    State = Dict[str, Any]
+
+# The events that do not change a player's state, as the clients see it.
+_IGNORED: Final = frozenset(("update",))
+# How far, in milliseconds, a track's start may move before it is sent;
+# it is computed from a clock, so it jitters by a millisecond or so.
+_DRIFT: Final = 250
+
+
+def _encode(message: Dict[str, Any]) -> str:
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+
+def _diff(old: State, new: State) -> Dict[str, Any]:
+    """
+    The changes from one state to the next: the keys set to a new value,
+    and the queue as a splice, ``[start, removed, inserted]``, which is
+    small for tracks ending, queued, or removed.
+    """
+
+    changes: Dict[str, Any] = {}
+    values = {
+        key: value
+        for key, value in new.items()
+        if key != "queue" and old.get(key) != value
+    }
+
+    if "started_at" in values and None not in (
+        values["started_at"],
+        old.get("started_at"),
+    ):
+        if abs(values["started_at"] - old["started_at"]) < _DRIFT:
+            del values["started_at"]
+
+    if values:
+        changes["set"] = values
+
+    before: List[Any] = old.get("queue", [])
+    after: List[Any] = new.get("queue", [])
+
+    if before != after:
+        start = 0
+        limit = min(len(before), len(after))
+
+        while start < limit and before[start] == after[start]:
+            start += 1
+
+        end = 0
+
+        while (
+            end < limit - start
+            and before[len(before) - 1 - end] == after[len(after) - 1 - end]
+        ):
+            end += 1
+
+        stop = len(after) - end
+        changes["queue"] = [
+            start,
+            len(before) - start - end,
+            after[start:stop],
+        ]
+
+    return changes
+
+
+class Subscription:
+    """A viewer's stream of a guild's player, as encoded messages."""
+
+    __slots__ = ("guild_id", "started", "_feeds", "_queue")
+
+    def __init__(
+        self,
+        feeds: PlayerFeeds,
+        guild_id: int,
+        backlog: int,
+    ) -> None:
+        self.guild_id = guild_id
+        # Whether it was sent its snapshot, and the changes after it since.
+        self.started = False
+        self._feeds = feeds
+        self._queue: Queue[str] = Queue(backlog)
+
+    async def get(self) -> str:
+        """Wait for the next message."""
+
+        return await self._queue.get()
+
+    def close(self) -> None:
+        """Stop receiving messages."""
+
+        self._feeds._unsubscribe(self)
+
+
+class _Feed:
+    """A guild's player state, and the viewers subscribed to it."""
+
+    __slots__ = (
+        "version",
+        "state",
+        "snapshot",
+        "subscribers",
+        "ready",
+        "dirty",
+        "sent_at",
+        "task",
+    )
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.state: State = {}
+        # The encoded state, cached for every viewer joining at its version.
+        self.snapshot: str | None = None
+        self.subscribers: Set[Subscription] = set()
+        self.ready: Future[None] | None = None
+        self.dirty = False
+        self.sent_at = float("-inf")
+        self.task: Task[None] | None = None
+
+
+class PlayerFeeds:
+    """
+    Streams every guild's player state to the dashboard's viewers.
+
+    A guild's state is only kept while someone views it. Viewers first get
+    a snapshot, then the changes to it, each tagged with the version it
+    leads to, ``{"v": 7, "set": {...}, "queue": [start, removed, [...]]}``.
+    Changes are coalesced like the player panels' edits, at most one per
+    ``interval``, and every message is encoded once, however many viewers
+    it is sent to. A viewer that falls ``backlog`` messages behind is sent
+    a fresh snapshot instead, rather than holding messages for it.
+
+    ``render``, which builds a guild's state, is set by the client.
+    """
+
+    __slots__ = ("_metrics", "_interval", "_backlog", "_feeds", "render")
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        *,
+        interval: float = 0.25,
+        backlog: int = 32,
+    ) -> None:
+        self._metrics = metrics
+        self._interval = interval
+        self._backlog = backlog
+        self._feeds: Dict[int, _Feed] = {}
+        self.render: Callable[[int], Awaitable[State]] | None = None
+
+    @property
+    def viewers(self) -> int:
+        """The number of viewers, in every guild."""
+
+        return sum(len(feed.subscribers) for feed in self._feeds.values())
+
+    async def subscribe(self, guild_id: int) -> Subscription:
+        """Start viewing a guild's player, from a snapshot of it."""
+
+        guild_id = int(guild_id)
+
+        if (feed := self._feeds.get(guild_id)) is None:
+            feed = self._feeds[guild_id] = _Feed()
+
+        subscription = Subscription(self, guild_id, self._backlog)
+        feed.subscribers.add(subscription)
+
+        try:
+            if feed.ready is None:
+                # Viewers joining together wait for the same render.
+                feed.ready = ensure_future(self._load(guild_id, feed))
+
+            await shield(feed.ready)
+
+        except BaseException:
+            subscription.close()
+            raise
+
+        subscription._queue.put_nowait(self._snapshot(feed))
+        subscription.started = True
+
+        return subscription
+
+    async def snapshot(self, guild_id: int) -> str:
+        """The encoded state of a guild's player, as first sent to viewers."""
+
+        if (feed := self._feeds.get(int(guild_id))) is not None:
+            if feed.ready is not None and feed.ready.done():
+                return self._snapshot(feed)
+
+        feed = _Feed()
+        await self._load(int(guild_id), feed)
+
+        return self._snapshot(feed)
+
+    def player_event(self, event: PlayerEvent) -> None:
+        """Send the changes of the guild an event happened in."""
+
+        if event.kind not in _IGNORED:
+            self.refresh(event.guild_id)
+
+    def refresh(self, guild_id: int) -> None:
+        """Schedule sending the changes to a guild's player, if viewed."""
+
+        if (feed := self._feeds.get(int(guild_id))) is None:
+            return
+
+        feed.dirty = True
+
+        if feed.task is None:
+            feed.task = ensure_future(self._flush(int(guild_id), feed))
+
+        else:
+            self._metrics.increment("dashboard.coalesced")
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        feed = self._feeds.get(subscription.guild_id)
+
+        if feed is None:
+            return
+
+        feed.subscribers.discard(subscription)
+
+        if not feed.subscribers:
+            del self._feeds[subscription.guild_id]
+
+            if feed.task is not None:
+                feed.task.cancel()
+
+    def _snapshot(self, feed: _Feed) -> str:
+        if feed.snapshot is None:
+            feed.snapshot = _encode({"v": feed.version, "state": feed.state})
+
+        return feed.snapshot
+
+    async def _load(self, guild_id: int, feed: _Feed) -> None:
+        """Render a guild's first state."""
+
+        try:
+            if self.render is not None:
+                feed.state = await self.render(guild_id)
+
+        except BaseException:
+            # Let the next viewer try again.
+            feed.ready = None
+            raise
+
+        feed.version = 1
+        feed.snapshot = None
+
+    async def _render(self, guild_id: int, feed: _Feed) -> bool:
+        """Render a guild's state, returning whether it changed."""
+
+        if self.render is None:
+            return False
+
+        state = await self.render(guild_id)
+
+        if not (changes := _diff(feed.state, state)):
+            return False
+
+        if "started_at" in state and "started_at" not in changes.get(
+            "set", {}
+        ):
+            # Keep the start viewers were sent, so drift does not add up.
+            state["started_at"] = feed.state.get("started_at")
+
+        feed.version += 1
+        feed.state = state
+        feed.snapshot = None
+        self._publish(feed, _encode({"v": feed.version, **changes}))
+
+        return True
+
+    async def _flush(self, guild_id: int, feed: _Feed) -> None:
+        try:
+            if feed.ready is not None:
+                await shield(feed.ready)
+
+            while feed.dirty and feed.subscribers:
+                delay = feed.sent_at + self._interval - monotonic()
+
+                if delay > 0:
+                    await sleep(delay)
+
+                feed.dirty = False
+
+                try:
+                    if await self._render(guild_id, feed):
+                        feed.sent_at = monotonic()
+
+                except Exception:
+                    self.logger.exception("Could not render a player feed.")
+
+        finally:
+            feed.task = None
+
+    def _publish(self, feed: _Feed, message: str) -> None:
+        viewers = 0
+
+        for subscription in feed.subscribers:
+            if not subscription.started:
+                continue
+
+            viewers += 1
+
+            try:
+                subscription._queue.put_nowait(message)
+
+            except QueueFull:
+                # Catch the viewer up with the state, once it is read.
+                while not subscription._queue.empty():
+                    subscription._queue.get_nowait()
+
+                subscription._queue.put_nowait(self._snapshot(feed))
+                self._metrics.increment("dashboard.resynced")
+
+        self._metrics.increment("dashboard.sent", viewers)
+
+
+__all__: Final = ("PlayerFeeds", "Subscription")
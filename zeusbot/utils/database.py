@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from asyncio import Lock, ensure_future, sleep
+from functools import partial
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from . import Config
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from typing import Any, Callable, Final, Set, Tuple
+
+    from asyncpg import Connection, Pool  # type: ignore
+
+    Listener = Callable[[Connection, int, str, str], Any]
+
+
+class Database:
+    """
+    The PostgreSQL connection pool, configured by ``Config.PSQL_*``.
+    The pool is created on first use, so that processes which never touch
+    the database do not have to import :mod:`asyncpg`.
+    """
+
+    __slots__ = (
+        "_pool",
+        "_lock",
+        "_options",
+        "_listener",
+        "_channels",
+        "_missed",
+        "_relistening",
+    )
+    logger = getLogger(__name__)
+
+    def __init__(self, **options: Any) -> None:
+        self._pool: Pool | None = None
+        self._lock: Lock | None = None
+        self._options = options
+        self._listener: Connection | None = None
+        self._channels: Set[Tuple[str, Listener]] = set()
+        self._missed: Set[Callable[[], Any]] = set()
+        self._relistening: Task[None] | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def listening(self) -> bool:
+        """Whether notifications are being received."""
+
+        return self._listener is not None and self._relistening is None
+
+    async def pool(self) -> Pool:
+        """Get the pool, connecting it if needed."""
+
+        if self._pool is not None:
+            return self._pool
+
+        if self._lock is None:
+            self._lock = Lock()
+
+        async with self._lock:
+            if self._pool is None:
+                from asyncpg import create_pool
+
+                self._pool = await create_pool(
+                    host=Config.PSQL_HOST,
+                    port=Config.PSQL_PORT,
+                    user=Config.PSQL_USER,
+                    password=Config.PSQL_PASSWORD,
+                    database=Config.PSQL_DATABASE,
+                    **self._options,
+                )
+                self.logger.info("Connected to the database.")
+
+        return self._pool
+
+    async def listen(
+        self,
+        channel: str,
+        callback: Listener,
+        *,
+        missed: Callable[[], Any] | None = None,
+    ) -> None:
+        """
+        Call ``callback`` with every notification sent on ``channel``.
+        Every channel shares a single connection, held for as long as the
+        pool is open, and listened on again if it is lost. ``missed`` is
+        called when notifications may have been missed: as the connection
+        is lost, and once listening again.
+        """
+
+        self._channels.add((channel, callback))
+
+        if missed is not None:
+            self._missed.add(missed)
+
+        if self._relistening is not None:
+            # Every channel is listened on once connected again.
+            return
+
+        listener = await self._connect_listener()
+        await listener.add_listener(channel, callback)
+
+    async def _connect_listener(self) -> Connection:
+        pool = await self.pool()
+
+        if self._listener is None:
+            self._listener = listener = await pool.acquire()
+            listener.add_termination_listener(partial(self._lost, listener))
+
+        return self._listener
+
+    def _lost(self, listener: Connection, _: Connection) -> None:
+        if listener is not self._listener:
+            # Released by the pool closing, or dropped while listening.
+            return
+
+        self.logger.warning("Lost the connection listening for notifications.")
+        self._listener = None
+        self._notify_missed()
+
+        if self._relistening is None:
+            self._relistening = ensure_future(self._relisten())
+
+    async def _relisten(self) -> None:
+        delay = 1.0
+
+        try:
+            while self._pool is not None:
+                try:
+                    listener = await self._connect_listener()
+
+                    for channel, callback in self._channels:
+                        await listener.add_listener(channel, callback)
+
+                    break
+
+                except Exception:
+                    self.logger.warning(
+                        "Could not listen for notifications, retrying in "
+                        "%.0fs.",
+                        delay,
+                        exc_info=True,
+                    )
+
+                    if (listener := self._listener) is not None:
+                        # Start over, rather than listen twice on a channel.
+                        self._listener = None
+                        listener.terminate()
+
+                    await sleep(delay)
+                    delay = min(delay * 2, 60.0)
+
+            else:
+                return
+
+        finally:
+            self._relistening = None
+
+        self.logger.info("Listening for notifications again.")
+        self._notify_missed()
+
+    def _notify_missed(self) -> None:
+        for callback in self._missed:
+            try:
+                callback()
+
+            except Exception:
+                self.logger.exception("Could not handle missed notifications.")
+
+    async def notify(self, channel: str, payload: str = "") -> None:
+        """Send a notification to every process listening on ``channel``."""
+
+        pool = await self.pool()
+        await pool.execute("SELECT pg_notify($1, $2)", channel, payload)
+
+    async def close(self) -> None:
+        """Close the pool, if it is connected."""
+
+        if self._pool is None:
+            return
+
+        if self._relistening is not None:
+            self._relistening.cancel()
+
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            await self._pool.release(listener)
+
+        pool, self._pool = self._pool, None
+        await pool.close()
+
+
+__all__: Final = ("Database",)
@@ -0,0 +1,552 @@
+from __future__ import annotations
+
+import json
+from asyncio import CancelledError, gather, get_running_loop, sleep, wait_for
+from datetime import datetime, timezone
+from hashlib import sha1
+from logging import ERROR, Handler, getLogger
+from random import random
+from threading import Lock
+from time import monotonic
+from traceback import walk_tb
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from logging import LogRecord
+    from typing import Any, Dict, Final, List, Set, Tuple
+
+    from aiohttp import ClientSession
+
+    from .metrics import Metrics
+
+    Event = Dict[str, Any]
+
+# Set on the exceptions already captured, so that they are captured once.
+_REPORTED: Final = "_zeusbot_reported"
+
+
+class _Group:
+    """The occurrences of an exception, grouped by fingerprint."""
+
+    __slots__ = (
+        "event",
+        "last",
+        "count",
+        "tokens",
+        "counted_at",
+        "seen_at",
+        "guilds",
+    )
+
+    def __init__(self, burst: int, now: float) -> None:
+        self.event: Event | None = None
+        # The event last sent, to carry the occurrences that were not kept.
+        self.last: Event | None = None
+        # The occurrences since an event was last sent.
+        self.count = 0
+        self.tokens = float(burst)
+        self.counted_at = now
+        self.seen_at = now
+        self.guilds: Set[int] = set()
+
+
+class _ReportHandler(Handler):
+    """Captures the exceptions logged at ``ERROR`` and above."""
+
+    def __init__(self, reporter: ErrorReporter) -> None:
+        super().__init__(ERROR)
+        self._reporter = reporter
+
+    def emit(self, record: LogRecord) -> None:
+        if record.exc_info is None or record.exc_info[1] is None:
+            return
+
+        exception = record.exc_info[1]
+
+        if isinstance(exception, Exception):
+            self._reporter.capture(exception, logger=record.name)
+
+
+class ErrorReporter:
+    """
+    Reports exceptions to Sentry, or to any endpoint taking its envelopes.
+
+    Capturing an exception only counts it under its fingerprint, the
+    exception's type and the functions it was raised through, so that the
+    same failure is grouped however its message varies. The first
+    occurrence of a fingerprint is always kept; later ones are sampled at
+    ``sample_rate``, and kept at most ``rate`` per minute, with bursts of
+    ``burst``. A kept occurrence replaces the one waiting to be sent, which
+    carries the number of occurrences since the last one that was; those
+    counted after it are sent again with the last event, as the rate
+    allows, or when the reporter stops.
+
+    Events are sent in batches of at most ``batch_size``, every
+    ``interval`` seconds, by a background task, over one session. Sentry
+    asks clients to wait after a ``429``, and events are kept meanwhile.
+    At most ``capacity`` fingerprints are tracked; those seen for the first
+    time beyond that are dropped, and counted in ``errors.dropped``.
+    """
+
+    __slots__ = (
+        "_metrics",
+        "_endpoint",
+        "_auth",
+        "_release",
+        "_sample_rate",
+        "_rate",
+        "_burst",
+        "_batch_size",
+        "_interval",
+        "_capacity",
+        "_groups",
+        "_lock",
+        "_handler",
+        "_session",
+        "_task",
+        "_retry_at",
+    )
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        dsn: str,
+        metrics: Metrics,
+        *,
+        release: str | None = None,
+        sample_rate: float = 1.0,
+        rate: float = 10.0,
+        burst: int = 5,
+        batch_size: int = 50,
+        interval: float = 5.0,
+        capacity: int = 1_000,
+    ) -> None:
+        url = urlsplit(dsn)
+        prefix, _, project = url.path.rpartition("/")
+
+        if not url.username or not url.hostname or not project:
+            raise ValueError(f"Invalid DSN {dsn!r}")
+
+        host = url.hostname
+
+        if url.port is not None:
+            host = f"{host}:{url.port}"
+
+        self._metrics = metrics
+        self._endpoint = (
+            f"{url.scheme}://{host}{prefix}/api/{project}/envelope/"
+        )
+        self._auth = (
+            "Sentry sentry_version=7, sentry_client=zeusbot, "
+            f"sentry_key={url.username}"
+        )
+        self._release = release
+        self._sample_rate = sample_rate
+        self._rate = rate / 60
+        self._burst = burst
+        self._batch_size = batch_size
+        self._interval = interval
+        self._capacity = capacity
+        self._groups: Dict[str, _Group] = {}
+        # Exceptions are also captured from the threads that log them.
+        self._lock = Lock()
+        self._handler = _ReportHandler(self)
+        self._session: ClientSession | None = None
+        self._task: Task[None] | None = None
+        self._retry_at = 0.0
+
+    @property
+    def pending(self) -> int:
+        """The number of fingerprints with occurrences waiting to be sent."""
+
+        return sum(group.count > 0 for group in self._groups.values())
+
+    @staticmethod
+    def fingerprint(exception: BaseException) -> str:
+        """The fingerprint exceptions are grouped by."""
+
+        frames = [
+            f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}"
+            for frame, _ in walk_tb(exception.__traceback__)
+        ]
+        kind = type(exception)
+
+        return sha1(
+            "\n".join(
+                (f"{kind.__module__}.{kind.__qualname__}", *frames)
+            ).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+
+    def capture(
+        self,
+        exception: BaseException,
+        *,
+        command: str | None = None,
+        guild_id: int | None = None,
+        user_id: int | None = None,
+        logger: str | None = None,
+    ) -> bool:
+        """
+        Capture an exception, and what it happened in, without waiting for
+        it to be sent. Returns whether the occurrence will be sent.
+        """
+
+        if getattr(exception, _REPORTED, False):
+            return False
+
+        try:
+            setattr(exception, _REPORTED, True)
+
+        except AttributeError:
+            pass
+
+        fingerprint = self.fingerprint(exception)
+        now = monotonic()
+
+        with self._lock:
+            if (group := self._groups.get(fingerprint)) is None:
+                if len(self._groups) >= self._capacity:
+                    self._metrics.increment("errors.dropped")
+                    return False
+
+                group = self._groups[fingerprint] = _Group(self._burst, now)
+                kept = True
+
+            else:
+                kept = self._sample(group, now)
+
+            group.count += 1
+            group.seen_at = now
+
+            if guild_id is not None and len(group.guilds) < 100:
+                group.guilds.add(int(guild_id))
+
+        self._metrics.increment("errors.captured")
+
+        if not kept:
+            self._metrics.increment("errors.sampled")
+            return False
+
+        # Built outside of the lock, only for the occurrences that are kept.
+        event = self._event(
+            exception,
+            fingerprint,
+            command=command,
+            guild_id=guild_id,
+            user_id=user_id,
+            logger=logger,
+        )
+
+        with self._lock:
+            group.event = event
+
+        return True
+
+    def _sample(self, group: _Group, now: float) -> bool:
+        if self._sample_rate < 1.0 and random() >= self._sample_rate:  # nosec
+            return False
+
+        return self._spend(group, now)
+
+    def _spend(self, group: _Group, now: float) -> bool:
+        """Take one of the group's tokens, if it has one."""
+
+        group.tokens = min(
+            self._burst,
+            group.tokens + (now - group.counted_at) * self._rate,
+        )
+        group.counted_at = now
+
+        if group.tokens < 1.0:
+            return False
+
+        group.tokens -= 1.0
+
+        return True
+
+    def _event(
+        self,
+        exception: BaseException,
+        fingerprint: str,
+        **context: Any,
+    ) -> Event:
+        values = []
+        seen: Set[int] = set()
+        current: BaseException | None = exception
+
+        # Sentry lists chained exceptions from the first raised.
+        while current is not None and id(current) not in seen:
+            seen.add(id(current))
+            values.append(self._exception(current))
+            current = current.__cause__ or (
+                None if current.__suppress_context__ else current.__context__
+            )
+
+        tags = {
+            key: str(context[key])
+            for key in ("command", "guild_id")
+            if context.get(key) is not None
+        }
+        event: Event = {
+            "event_id": uuid4().hex,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "platform": "python",
+            "level": "error",
+            "logger": context.get("logger") or "zeusbot",
+            "exception": {"values": values[::-1]},
+            "fingerprint": [fingerprint],
+            "tags": tags,
+        }
+
+        if self._release is not None:
+            event["release"] = self._release
+
+        if context.get("user_id") is not None:
+            event["user"] = {"id": str(context["user_id"])}
+
+        return event
+
+    @staticmethod
+    def _exception(exception: BaseException) -> Dict[str, Any]:
+        frames = []
+
+        for frame, lineno in walk_tb(exception.__traceback__):
+            module = frame.f_globals.get("__name__") or ""
+            frames.append(
+                {
+                    "filename": frame.f_code.co_filename,
+                    "function": frame.f_code.co_name,
+                    "module": module,
+                    "lineno": lineno,
+                    "in_app": module.startswith("zeusbot"),
+                }
+            )
+
+        kind = type(exception)
+
+        return {
+            "type": kind.__qualname__,
+            "module": kind.__module__,
+            "value": str(exception),
+            "stacktrace": {"frames": frames},
+        }
+
+    def start(self) -> None:
+        """
+        Send the captured events in the background, and capture the
+        exceptions logged at ``ERROR`` and above.
+        """
+
+        if self._task is not None:
+            return
+
+        getLogger().addHandler(self._handler)
+        self._task = get_running_loop().create_task(self._send_forever())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop sending in the background, and send what is left."""
+
+        if self._task is None:
+            return
+
+        getLogger().removeHandler(self._handler)
+        self._task.cancel()
+
+        try:
+            await self._task
+
+        except CancelledError:
+            pass
+
+        self._task = None
+
+        try:
+            await wait_for(self.flush(final=True), timeout)
+
+        except Exception:
+            self.logger.warning(
+                "Could not send the errors left on stop.",
+                exc_info=True,
+            )
+
+        if self.pending:
+            self.logger.warning(
+                "Dropped the errors of %s fingerprints on stop.",
+                self.pending,
+            )
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _send_forever(self) -> None:
+        delay = self._interval
+
+        while True:
+            await sleep(delay)
+
+            try:
+                await self.flush()
+                delay = self._interval
+
+            except Exception:
+                delay = min(delay * 2, 300.0)
+                self.logger.warning(
+                    "Could not send errors, retrying in %.1fs.",
+                    delay,
+                    exc_info=True,
+                )
+
+    async def flush(self, final: bool = False) -> int:
+        """
+        Send every waiting event, and if ``final``, the occurrences counted
+        since those last sent, regardless of the rate. Returns the number of
+        events sent.
+        """
+
+        sent = 0
+
+        while monotonic() >= self._retry_at and (batch := self._take(final)):
+            results = await gather(
+                *(
+                    self._send(event, count, len(group.guilds))
+                    for group, event, count in batch
+                ),
+                return_exceptions=True,
+            )
+            failed: BaseException | None = None
+
+            for (group, event, count), result in zip(batch, results):
+                if result is True:
+                    sent += 1
+                    continue
+
+                if isinstance(result, BaseException):
+                    failed = result
+
+                if result is not False:
+                    self._requeue(group, event, count)
+
+            if failed is not None:
+                raise failed
+
+        self._prune()
+
+        return sent
+
+    def _take(self, final: bool = False) -> List[Tuple[_Group, Event, int]]:
+        batch = []
+        now = monotonic()
+
+        with self._lock:
+            for group in self._groups.values():
+                if (event := group.event) is None:
+                    if (
+                        not group.count
+                        or group.last is None
+                        or not (final or self._spend(group, now))
+                    ):
+                        continue
+
+                    event = {
+                        **group.last,
+                        "event_id": uuid4().hex,
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                    }
+
+                batch.append((group, event, group.count))
+                group.event = None
+                group.last = event
+                group.count = 0
+
+                if len(batch) >= self._batch_size:
+                    break
+
+        return batch
+
+    def _requeue(self, group: _Group, event: Event, count: int) -> None:
+        with self._lock:
+            group.count += count
+
+            if group.event is None:
+                group.event = event
+
+    def _prune(self, idle: float = 3600.0) -> None:
+        """Forget the fingerprints with nothing to send, unseen for long."""
+
+        now = monotonic()
+
+        with self._lock:
+            for fingerprint, group in list(self._groups.items()):
+                if not group.count and now - group.seen_at > idle:
+                    del self._groups[fingerprint]
+
+    async def _send(
+        self,
+        event: Event,
+        count: int,
+        guilds: int,
+    ) -> bool | None:
+        """
+        Send an event, with the occurrences it stands for and the number of
+        guilds they happened in. Returns whether it was accepted, or
+        ``None`` if it should be sent again later.
+        """
+
+        from aiohttp import ClientSession, ClientTimeout
+
+        if self._session is None:
+            self._session = ClientSession(timeout=ClientTimeout(total=10))
+
+        event = {**event, "extra": {"occurrences": count, "guilds": guilds}}
+        payload = json.dumps(event, default=str).encode()
+        header = json.dumps(
+            {
+                "event_id": event["event_id"],
+                "sent_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        item = json.dumps({"type": "event", "length": len(payload)})
+        body = b"\n".join((header.encode(), item.encode(), payload))
+
+        async with self._session.post(
+            self._endpoint,
+            data=body,
+            headers={
+                "Content-Type": "application/x-sentry-envelope",
+                "X-Sentry-Auth": self._auth,
+            },
+        ) as response:
+            if response.status == 429:
+                try:
+                    retry_after = float(response.headers["Retry-After"])
+
+                except (KeyError, ValueError):
+                    retry_after = 60.0
+
+                self._retry_at = monotonic() + max(retry_after, 1.0)
+                self._metrics.increment("errors.limited")
+                return None
+
+            if response.status >= 500:
+                raise RuntimeError(f"Sentry answered {response.status}")
+
+            if response.status >= 400:
+                self.logger.warning(
+                    "Sentry rejected an event: %s %s",
+                    response.status,
+                    await response.text(),
+                )
+                self._metrics.increment("errors.rejected")
+                return False
+
+        self._metrics.increment("errors.sent")
+
+        return True
+
+
+__all__: Final = ("ErrorReporter",)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from hikari import ShardPayloadEvent
+from hikari.api import CacheComponents
+
+from .traffic import GATEWAY
+
+if TYPE_CHECKING:
+    from typing import Any, Final
+
+    from hikari import GatewayShard
+    from hikari.api import EventManager
+    from hikari.internal.data_binding import JSONObject
+
+    from .metrics import Metrics
+    from .traffic import TrafficRecorder
+
+# The cache components the bot, and Tanjun's checks, read from.
+CACHE_COMPONENTS: Final = (
+    CacheComponents.GUILDS
+    | CacheComponents.GUILD_CHANNELS
+    | CacheComponents.MEMBERS
+    | CacheComponents.ROLES
+    | CacheComponents.VOICE_STATES
+    | CacheComponents.ME
+)
+# The event manager's internals the filter reads, pinned with hikari.
+_INTERNALS: Final = ("_consumers", "_enabled_for_event")
+
+
+class EventFilter:
+    """
+    Wraps an event manager, dropping the gateway dispatches that no listener
+    or waiter subscribed to and no enabled cache component needs, before
+    they are scheduled, deserialized into models or written to the cache.
+    Everything else is forwarded to the wrapped manager.
+
+    Every dispatch is handed to the ``recorder``, if any, before it is
+    filtered, so that replaying a recording exercises the filter too.
+
+    Filtering reads hikari's internals; if the manager does not have them,
+    as after an upgrade, every dispatch is forwarded instead.
+    """
+
+    __slots__ = ("_manager", "_metrics", "_recorder", "_filtering")
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        manager: EventManager,
+        metrics: Metrics | None = None,
+        recorder: TrafficRecorder | None = None,
+    ) -> None:
+        self._manager = manager
+        self._metrics = metrics
+        self._recorder = recorder
+        self._filtering = self.supports(manager)
+
+        if not self._filtering:
+            self.logger.warning(
+                "%s does not have %s; forwarding every dispatch.",
+                type(manager).__name__,
+                ", ".join(_INTERNALS),
+            )
+
+    @staticmethod
+    def supports(manager: EventManager) -> bool:
+        """Whether the event manager has the internals filtering reads."""
+
+        return all(hasattr(manager, name) for name in _INTERNALS)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._manager, name)
+
+    @property
+    def manager(self) -> EventManager:
+        """The wrapped event manager."""
+
+        return self._manager
+
+    def needs(self, event_name: str) -> bool:
+        """Whether anything uses the dispatches named ``event_name``."""
+
+        if not self._filtering:
+            return True
+
+        # The same bookkeeping hikari uses to skip them, once scheduled.
+        consumers = self._manager._consumers  # type: ignore
+
+        if (consumer := consumers.get(event_name.lower())) is None:
+            # Let hikari report the dispatches it does not know.
+            return True
+
+        if consumer.is_enabled:
+            return True
+
+        # Raw payload listeners want every dispatch.
+        return self._manager._enabled_for_event(  # type: ignore
+            ShardPayloadEvent,
+        )
+
+    def consume_raw_event(
+        self,
+        event_name: str,
+        shard: GatewayShard,
+        payload: JSONObject,
+    ) -> None:
+        if self._recorder is not None:
+            self._recorder.record(GATEWAY, event_name, payload)
+
+        if self.needs(event_name):
+            self._manager.consume_raw_event(event_name, shard, payload)
+
+        elif self._metrics is not None:
+            self._metrics.increment("gateway.dropped")
+
+
+__all__: Final = ("CACHE_COMPONENTS", "EventFilter")
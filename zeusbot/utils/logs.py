@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import json
+import sys
+from datetime import datetime, timezone
+from logging import WARNING, Filter, Formatter, getLogger
+from logging.handlers import QueueHandler
+from queue import Empty, Full, Queue
+from random import random
+from threading import Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from logging import LogRecord
+    from typing import IO, Any, Dict, Final, Mapping, Tuple
+
+    from .metrics import Metrics
+
+# The fields every record has, which are not extra fields passed to a log.
+_RECORD_FIELDS: Final = frozenset(
+    (
+        *vars(getLogger().makeRecord("", 0, "", 0, "", (), None)),
+        "message",
+        "asctime",
+    )
+)
+
+
+class LogRule(NamedTuple):
+    """
+    How many of a logger's records below ``WARNING`` are kept: a ``sample``
+    fraction of them, at most ``rate`` per second with bursts of ``burst``.
+    """
+
+    sample: float = 1.0
+    rate: float | None = None
+    burst: int = 10
+
+
+DEFAULT_RULES: Final[Dict[str, LogRule]] = {
+    "hikari.gateway": LogRule(rate=2.0),
+    "hikari.ratelimits": LogRule(sample=0.1, rate=1.0),
+    "hikari.tanjun": LogRule(rate=5.0),
+    "lavaplayer": LogRule(rate=5.0),
+}
+
+
+class JSONFormatter(Formatter):
+    """Formats records as a JSON object per line, with their extra fields."""
+
+    def format(self, record: LogRecord) -> str:
+        document: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(
+                record.created,
+                timezone.utc,
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                document[key] = value
+
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+
+        elif record.exc_text:
+            document["exception"] = record.exc_text
+
+        if record.stack_info:
+            document["stack"] = self.formatStack(record.stack_info)
+
+        return json.dumps(document, default=str)
+
+
+class SamplingFilter(Filter):
+    """
+    Samples and rate limits the records of noisy loggers, following the
+    :class:`LogRule` of the closest configured ancestor. Records at
+    ``WARNING`` and above are always kept.
+    """
+
+    def __init__(
+        self,
+        rules: Mapping[str, LogRule],
+        metrics: Metrics,
+    ) -> None:
+        super().__init__()
+        self._rules = dict(rules)
+        self._metrics = metrics
+        self._resolved: Dict[str, str | None] = {}
+        # The tokens left, and when they were counted, for every rule.
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = Lock()
+
+    def _resolve(self, name: str) -> str | None:
+        try:
+            return self._resolved[name]
+
+        except KeyError:
+            pass
+
+        prefix: str | None = name
+
+        while prefix and prefix not in self._rules:
+            prefix = prefix.rpartition(".")[0]
+
+        self._resolved[name] = prefix or None
+
+        return prefix or None
+
+    def filter(self, record: LogRecord) -> bool:
+        if record.levelno >= WARNING:
+            return True
+
+        if (prefix := self._resolve(record.name)) is None:
+            return True
+
+        rule = self._rules[prefix]
+
+        if rule.sample < 1.0 and random() >= rule.sample:  # nosec
+            self._metrics.increment("logs.sampled")
+            return False
+
+        if rule.rate is None:
+            return True
+
+        with self._lock:
+            now = monotonic()
+            tokens, counted_at = self._buckets.get(prefix, (rule.burst, now))
+            tokens = min(rule.burst, tokens + (now - counted_at) * rule.rate)
+
+            if tokens < 1.0:
+                self._buckets[prefix] = (tokens, now)
+                self._metrics.increment("logs.limited")
+                return False
+
+            self._buckets[prefix] = (tokens - 1.0, now)
+
+        return True
+
+
+class _EnqueueHandler(QueueHandler):
+    """Enqueues records as they are, leaving all formatting to the writer."""
+
+    def __init__(
+        self,
+        queue: Queue[LogRecord | None],
+        metrics: Metrics,
+    ) -> None:
+        super().__init__(queue)
+        self._metrics = metrics
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+
+        except Full:
+            self._metrics.increment("logs.dropped")
+
+
+class _Writer(Thread):
+    """Formats the enqueued records and writes them, in batches."""
+
+    def __init__(
+        self,
+        queue: Queue[LogRecord | None],
+        stream: IO[str],
+        batch_size: int = 512,
+    ) -> None:
+        super().__init__(name="zeusbot-logs", daemon=True)
+        self._queue = queue
+        self._stream = stream
+        self._batch_size = batch_size
+        self._formatter = JSONFormatter()
+
+    def run(self) -> None:
+        while True:
+            records = [self._queue.get()]
+
+            while len(records) < self._batch_size:
+                try:
+                    records.append(self._queue.get_nowait())
+
+                except Empty:
+                    break
+
+            lines = [self._format(r) for r in records if r is not None]
+
+            if lines:
+                # One write per batch, rather than per record.
+                try:
+                    self._stream.write("\n".join(lines) + "\n")
+                    self._stream.flush()
+
+                except (OSError, ValueError):
+                    # Nowhere is left to report it; keep draining the queue.
+                    pass
+
+            if None in records:
+                return
+
+    def _format(self, record: LogRecord) -> str:
+        try:
+            return self._formatter.format(record)
+
+        except Exception as exc:
+            return json.dumps(
+                {
+                    "level": "ERROR",
+                    "logger": __name__,
+                    "message": f"Could not format a record of {record.name}",
+                    "exception": repr(exc),
+                }
+            )
+
+    def stop(self) -> None:
+        # Wait for room, rather than fail, if the queue is full.
+        self._queue.put(None)
+        self.join()
+
+
+class LogPipeline:
+    """
+    Routes every log record through a bounded queue to a background thread,
+    which formats it as JSON and writes it to the stream, so that logging
+    never blocks the event loop on I/O. Noisy loggers are sampled and rate
+    limited before their records are enqueued, and records are dropped,
+    rather than waited for, when the writer falls behind.
+
+    Records' arguments are formatted by the writer, so they should not be
+    mutated after they are logged.
+    """
+
+    __slots__ = (
+        "_level",
+        "_stream",
+        "_queue",
+        "_handler",
+        "_writer",
+    )
+
+    def __init__(
+        self,
+        level: int | str = "INFO",
+        *,
+        metrics: Metrics,
+        rules: Mapping[str, LogRule] = DEFAULT_RULES,
+        stream: IO[str] | None = None,
+        capacity: int = 10_000,
+    ) -> None:
+        # Levels from the environment may be lowercase, like "info".
+        self._level = level.upper() if isinstance(level, str) else level
+        self._stream = stream
+        self._queue: Queue[LogRecord | None] = Queue(capacity)
+        self._handler = _EnqueueHandler(self._queue, metrics)
+        self._handler.addFilter(SamplingFilter(rules, metrics))
+        self._writer: _Writer | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the records are being written."""
+
+        return self._writer is not None
+
+    @property
+    def pending(self) -> int:
+        """The number of records waiting to be written."""
+
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Route the root logger's records through the pipeline."""
+
+        if self._writer is not None:
+            return
+
+        self._writer = _Writer(self._queue, self._stream or sys.stderr)
+        self._writer.start()
+        root = getLogger()
+        root.addHandler(self._handler)
+        root.setLevel(self._level)
+
+    def stop(self) -> None:
+        """Stop routing records, after writing those already enqueued."""
+
+        if self._writer is None:
+            return
+
+        getLogger().removeHandler(self._handler)
+        self._writer.stop()
+        self._writer = None
+
+
+__all__: Final = (
+    "DEFAULT_RULES",
+    "JSONFormatter",
+    "LogPipeline",
+    "LogRule",
+    "SamplingFilter",
+)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import os
+import signal
+import sys
+from asyncio import CancelledError, get_running_loop, sleep
+from logging import getLogger
+from threading import Event, Thread, get_ident
+from time import monotonic
+from traceback import format_stack
+from typing import TYPE_CHECKING
+
+from . import Config
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from typing import Final
+
+    from .metrics import Metrics
+
+
+class LoopMonitor:
+    """
+    Samples the event loop's scheduling delay into ``loop.lag`` metrics.
+    A watchdog thread notices when the loop stops responding altogether,
+    logs the stack it is stuck in, and can optionally terminate the process
+    when a stall lasts too long, so that the supervisor restarts it.
+    """
+
+    __slots__ = (
+        "_metrics",
+        "_interval",
+        "_threshold",
+        "_restart_after",
+        "_heartbeat",
+        "_loop_thread",
+        "_task",
+        "_watchdog",
+        "_stopped",
+    )
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        *,
+        interval: float = 0.1,
+        threshold: float = Config.LOOP_LAG_THRESHOLD,
+        restart_after: float = Config.LOOP_RESTART_AFTER,
+    ) -> None:
+        self._metrics = metrics
+        self._interval = interval
+        self._threshold = threshold
+        self._restart_after = restart_after
+        self._heartbeat = monotonic()
+        self._loop_thread = 0
+        self._task: Task[None] | None = None
+        self._watchdog: Thread | None = None
+        self._stopped = Event()
+
+    def start(self) -> None:
+        """Start sampling; must be called from the event loop's thread."""
+
+        if self._task is not None:
+            return
+
+        self._loop_thread = get_ident()
+        self._heartbeat = monotonic()
+        self._stopped.clear()
+        self._task = get_running_loop().create_task(self._sample())
+        self._watchdog = Thread(
+            target=self._watch,
+            name="zeusbot-loop-watchdog",
+            daemon=True,
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling, and the watchdog."""
+
+        self._stopped.set()
+
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        try:
+            await self._task
+
+        except CancelledError:
+            pass
+
+        self._task = None
+
+    async def _sample(self) -> None:
+        histogram = self._metrics.histogram("loop.lag")
+        reported_at = monotonic()
+
+        while True:
+            scheduled_at = monotonic()
+            await sleep(self._interval)
+            self._heartbeat = now = monotonic()
+            histogram.observe(max(0.0, now - scheduled_at - self._interval))
+
+            if now - reported_at >= 60:
+                reported_at = now
+                self.logger.info(
+                    "Loop lag p50=%.1fms p99=%.1fms max=%.1fms",
+                    histogram.quantile(0.5) * 1000,
+                    histogram.quantile(0.99) * 1000,
+                    histogram.maximum * 1000,
+                )
+
+    def _watch(self) -> None:
+        reported = False
+
+        while not self._stopped.wait(self._interval):
+            stalled = monotonic() - self._heartbeat - self._interval
+
+            if stalled < self._threshold:
+                reported = False
+                continue
+
+            if not reported:
+                reported = True
+                self._metrics.increment("loop.stalls")
+                self.logger.warning(
+                    "Event loop stalled for %.1fms in:\n%s",
+                    stalled * 1000,
+                    self._loop_stack(),
+                )
+
+            if self._restart_after and stalled >= self._restart_after:
+                self._restart(stalled)
+
+    def _loop_stack(self) -> str:
+        if (frame := sys._current_frames().get(self._loop_thread)) is None:
+            return "<unknown>"
+
+        return "".join(format_stack(frame))
+
+    def _restart(self, stalled: float) -> None:
+        self.logger.critical(
+            "Event loop stalled for %.1fs, restarting.",
+            stalled,
+        )
+        self._metrics.increment("loop.restarts")
+        # Let the bot shut down gracefully if the loop recovers in time.
+        os.kill(os.getpid(), signal.SIGTERM)
+
+        if self._stopped.wait(self._restart_after):
+            return
+
+        if monotonic() - self._heartbeat < self._threshold:
+            # The loop recovered and is shutting down on its own.
+            return
+
+        os._exit(70)
+
+
+__all__: Final = ("LoopMonitor",)
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import os
+import sys
+import tracemalloc
+from asyncio import Lock, all_tasks, sleep, to_thread
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from . import Config
+
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Final, List, Tuple
+
+# The hikari modules holding the cache's entries.
+_CACHE_MODULES: Final = frozenset(
+    ("hikari.impl.cache", "hikari.internal.cache")
+)
+_PACKAGE_ROOT: Final = str(Path(__file__).parent.parent.parent)
+# Leave out what tracing, and importing code, allocates.
+_FILTERS: Final = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class SubsystemUsage(NamedTuple):
+    """The memory a subsystem holds, and how it changed over an interval."""
+
+    name: str
+    size: int
+    size_diff: int
+    count: int
+    count_diff: int
+
+
+class MemoryReport(NamedTuple):
+    """A breakdown of the traced memory by subsystem, with object counts."""
+
+    interval: float
+    traced: int
+    peak: int
+    overhead: int
+    subsystems: List[SubsystemUsage]
+    counts: Dict[str, int]
+
+
+class MemoryProfiler:
+    """
+    Attributes the memory allocated while traced to the bot's subsystems:
+    every ``zeusbot`` module, hikari's cache, and the other packages.
+    An allocation is attributed to the most recent ``zeusbot`` frame in its
+    traceback, if it has one, and to the module it was made in otherwise,
+    so tracing more ``frames`` attributes more of the libraries' allocations
+    to the bot's code that made them, at a higher cost.
+
+    Tracing slows down allocating several times over, so by default it is
+    armed for the length of a profile only, which then shows what was
+    allocated and kept during it; leaving the profiler ready costs nothing.
+    ``Config.MEMORY_TRACE_FRAMES`` keeps it armed from the start instead,
+    for when the growth since then is worth the cost.
+    """
+
+    __slots__ = ("_frames", "_counts", "_modules", "_profiling")
+    logger = getLogger(__name__)
+
+    def __init__(self, *, frames: int = Config.MEMORY_TRACE_FRAMES) -> None:
+        self._frames = frames
+        self._counts: Dict[str, Callable[[], int]] = {
+            "tasks": lambda: len(all_tasks()),
+        }
+        self._modules: Dict[str, str] = {}
+        # Profiles run one at a time, as one may disarm tracing under another.
+        self._profiling = Lock()
+
+    @property
+    def armed(self) -> bool:
+        """Whether allocations are being traced."""
+
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        """Arm tracing, if ``frames`` is set."""
+
+        if self._frames and not self.armed:
+            self.arm(self._frames)
+
+    def arm(self, frames: int = 1) -> None:
+        """Start tracing allocations, keeping ``frames`` frames of each."""
+
+        tracemalloc.start(frames)
+        self.logger.info("Tracing allocations, %s frames deep.", frames)
+
+    def disarm(self) -> None:
+        """Stop tracing allocations, freeing the traces."""
+
+        tracemalloc.stop()
+
+    def add_count(self, name: str, count: Callable[[], int]) -> None:
+        """Report ``count()`` as the number of ``name`` in every profile."""
+
+        self._counts[name] = count
+
+    def counts(self) -> Dict[str, int]:
+        """The number of queued, cached and live objects, by name."""
+
+        counts = {}
+
+        for name, count in self._counts.items():
+            try:
+                counts[name] = count()
+
+            except Exception:
+                self.logger.exception("Could not count the %s.", name)
+
+        return counts
+
+    async def profile(
+        self,
+        interval: float = 30.0,
+        frames: int = 1,
+    ) -> MemoryReport:
+        """
+        Profile the memory allocated and kept over ``interval`` seconds,
+        arming tracing with ``frames`` frames for it if it is not armed.
+        With an interval of ``0``, every traced allocation is reported.
+        Profiles requested while one runs wait for it to finish.
+        """
+
+        async with self._profiling:
+            temporary = not self.armed
+
+            if temporary:
+                self.arm(frames)
+
+            try:
+                before = None
+
+                if interval:
+                    before = self._snapshot()
+                    await sleep(interval)
+
+                after = self._snapshot()
+                traced, peak = tracemalloc.get_traced_memory()
+                overhead = tracemalloc.get_tracemalloc_memory()
+
+            finally:
+                if temporary:
+                    self.disarm()
+
+        # Grouping the traces takes a while; let the loop run meanwhile.
+        subsystems = await to_thread(self._compare, before, after)
+
+        return MemoryReport(
+            interval,
+            traced,
+            peak,
+            overhead,
+            subsystems,
+            self.counts(),
+        )
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def _compare(
+        self,
+        before: tracemalloc.Snapshot | None,
+        after: tracemalloc.Snapshot,
+    ) -> List[SubsystemUsage]:
+        old = self._usage(before) if before is not None else {}
+        usage = [
+            SubsystemUsage(
+                name,
+                size,
+                size - old.get(name, (0, 0))[0],
+                count,
+                count - old.get(name, (0, 0))[1],
+            )
+            for name, (size, count) in self._usage(after).items()
+        ]
+        usage.sort(key=lambda u: (u.size_diff, u.size), reverse=True)
+
+        return usage
+
+    def _usage(
+        self, snapshot: tracemalloc.Snapshot
+    ) -> Dict[str, Tuple[int, int]]:
+        usage: Dict[str, Tuple[int, int]] = {}
+
+        for statistic in snapshot.statistics("traceback"):
+            name = self._subsystem(statistic.traceback)
+            size, count = usage.get(name, (0, 0))
+            usage[name] = (size + statistic.size, count + statistic.count)
+
+        return usage
+
+    def _subsystem(self, traceback: tracemalloc.Traceback) -> str:
+        # The frames are ordered from the oldest to the most recent.
+        for frame in reversed(traceback):
+            if (module := self._module(frame.filename)).startswith("zeusbot"):
+                return module
+
+        # Code generated at runtime has no file; look past it.
+        filename = next(
+            (f.filename for f in reversed(traceback) if f.filename[0] != "<"),
+            traceback[-1].filename,
+        )
+        module = self._module(filename)
+
+        if module in _CACHE_MODULES:
+            return "hikari.cache"
+
+        return module.partition(".")[0]
+
+    def _module(self, filename: str) -> str:
+        try:
+            return self._modules[filename]
+
+        except KeyError:
+            pass
+
+        # The longest path on ``sys.path`` the file is in is its root.
+        roots = [
+            root
+            for root in (_PACKAGE_ROOT, *sys.path)
+            if root and filename.startswith(os.path.join(root, ""))
+        ]
+        module = filename
+
+        if roots:
+            start = len(os.path.join(max(roots, key=len), ""))
+            module = os.path.splitext(filename[start:])[0]
+            module = module.replace(os.sep, ".").removesuffix(".__init__")
+
+        self._modules[filename] = module
+
+        return module
+
+
+__all__: Final = ("MemoryProfiler", "MemoryReport", "SubsystemUsage")
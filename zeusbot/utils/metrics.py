@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Final, Sequence
+
+LATENCY_BUCKETS: Final = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """A histogram of observed values, over fixed bucket bounds."""
+
+    __slots__ = ("_bounds", "_counts", "count", "total", "maximum")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self._bounds = tuple(bounds)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile, as the upper bound of the bucket it falls in.
+        Values above the last bound are estimated as the maximum seen.
+        """
+
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+
+        for bound, count in zip(self._bounds, self._counts):
+            seen += count
+
+            if seen >= rank:
+                return min(bound, self.maximum)
+
+        return self.maximum
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The histogram's summary and buckets."""
+
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.maximum,
+            "buckets": dict(zip((*self._bounds, "inf"), self._counts)),
+        }
+
+    def reset(self) -> None:
+        """Forget every observed value."""
+
+        self._counts = [0] * len(self._counts)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+
+class Metrics:
+    """The registry of the bot's counters and histograms."""
+
+    __slots__ = ("_counters", "_histograms")
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, int] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Increment a counter, creating it if needed."""
+
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def counter(self, name: str) -> int:
+        """Get the value of a counter."""
+
+        return self._counters.get(name, 0)
+
+    def histogram(
+        self,
+        name: str,
+        bounds: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Get a histogram, creating it with ``bounds`` if needed."""
+
+        if (histogram := self._histograms.get(name)) is None:
+            histogram = self._histograms[name] = Histogram(bounds)
+
+        return histogram
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every counter's value, and every histogram's summary."""
+
+        return {
+            "counters": dict(self._counters),
+            "histograms": {
+                name: histogram.snapshot()
+                for name, histogram in self._histograms.items()
+            },
+        }
+
+
+__all__: Final = ("Histogram", "Metrics")
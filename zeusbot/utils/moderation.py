@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import re
+from asyncio import ensure_future, to_thread
+from collections import deque
+from logging import getLogger
+from re import _constants, _parser  # type: ignore
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from typing import (
+        Any,
+        Dict,
+        Final,
+        Iterable,
+        Iterator,
+        List,
+        Set,
+        Tuple,
+    )
+
+    from asyncpg import Connection, Pool  # type: ignore
+
+    from .database import Database
+    from .metrics import Metrics
+
+SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS moderation_filters (
+    guild_id BIGINT NOT NULL,
+    pattern TEXT NOT NULL,
+    is_regex BOOLEAN NOT NULL,
+    PRIMARY KEY (guild_id, is_regex, pattern)
+);
+"""
+# Regexes are only run once their longest literal was found by the
+# automaton, so they need one long enough to be selective.
+MIN_REGEX_LITERAL: Final = 3
+_REPEATS: Final = frozenset(
+    (
+        _constants.MAX_REPEAT,
+        _constants.MIN_REPEAT,
+        _constants.POSSESSIVE_REPEAT,
+    )
+)
+
+
+class Automaton:
+    """
+    An Aho-Corasick automaton, matching every one of its keys at once in
+    time linear in the length of the text scanned.
+    """
+
+    __slots__ = ("_goto", "_fail", "_output")
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Tuple[int, ...]] = [()]
+
+        for index, key in enumerate(keys):
+            node = 0
+
+            for char in key:
+                if (child := goto[node].get(char)) is None:
+                    child = goto[node][char] = len(goto)
+                    goto.append({})
+                    output.append(())
+
+                node = child
+
+            output[node] += (index,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+
+                while state and char not in goto[state]:
+                    state = fail[state]
+
+                fail[child] = goto[state].get(char, 0)
+                output[child] += output[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def scan(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yield the end offset and index of every key found in ``text``,
+        in the order they end.
+        """
+
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+
+            node = goto[node].get(char, 0)
+
+            for index in output[node]:
+                yield end, index
+
+
+class FilterMatch(NamedTuple):
+    """A filtered pattern, and where it was found."""
+
+    pattern: str
+    start: int
+    end: int
+
+
+def required_literal(pattern: str) -> str:
+    """
+    The longest run of literal characters that any match of the regex
+    ``pattern`` must contain, lowercased.
+    """
+
+    best = run = ""
+
+    for op, value in _parser.parse(pattern):
+        if op is _constants.LITERAL:
+            run += chr(value)
+            continue
+
+        best = max(best, run, key=len)
+        run = ""
+
+    return max(best, run, key=len).lower()
+
+
+def nested_quantifier(pattern: str) -> bool:
+    """
+    Whether the regex ``pattern`` repeats a variable number of times what
+    itself repeats a variable number of times, like ``(a+)+``, which can
+    backtrack exponentially on text that almost matches.
+    """
+
+    def search(items: Any, repeated: bool) -> bool:
+        if isinstance(items, _parser.SubPattern):
+            for op, av in items:
+                if op not in _REPEATS:
+                    if search(av, repeated):
+                        return True
+
+                    continue
+
+                low, high, subpattern = av
+                varies = low != high
+
+                if varies and repeated:
+                    return True
+
+                if search(subpattern, repeated or varies):
+                    return True
+
+        elif isinstance(items, (tuple, list)):
+            return any(search(item, repeated) for item in items)
+
+        return False
+
+    return search(_parser.parse(pattern), False)
+
+
+class PatternFilter:
+    """
+    A guild's words and regexes, compiled into a single automaton.
+    Words match whole words, case-insensitively. Regexes are matched
+    through their required literal, then confirmed by running the regex.
+    Regexes with a nested quantifier, stored before they were rejected,
+    are left out, as they could stall the event loop.
+    """
+
+    __slots__ = ("words", "regexes", "_automaton", "_targets")
+
+    def __init__(
+        self,
+        words: Iterable[str] = (),
+        regexes: Iterable[str] = (),
+    ) -> None:
+        self.words = frozenset(word.lower() for word in words)
+        self.regexes = frozenset(regexes)
+        self._targets: List[str | re.Pattern[str]] = [*self.words]
+        keys = [*self.words]
+
+        for regex in self.regexes:
+            if nested_quantifier(regex):
+                continue
+
+            keys.append(required_literal(regex))
+            self._targets.append(re.compile(regex, re.IGNORECASE))
+
+        self._automaton = Automaton(keys)
+
+    def __bool__(self) -> bool:
+        return bool(self._targets)
+
+    def match(self, content: str) -> FilterMatch | None:
+        """The first pattern found in ``content``, if any."""
+
+        text = content.lower()
+        tried: Set[int] = set()
+
+        for end, index in self._automaton.scan(text):
+            target = self._targets[index]
+
+            if isinstance(target, str):
+                start = end - len(target) + 1
+
+                if (start == 0 or not text[start - 1].isalnum()) and (
+                    end + 1 == len(text) or not text[end + 1].isalnum()
+                ):
+                    return FilterMatch(target, start, end + 1)
+
+            elif index not in tried:
+                tried.add(index)
+
+                if found := target.search(content):
+                    return FilterMatch(target.pattern, *found.span())
+
+        return None
+
+
+class MessageFilter:
+    """
+    Every guild's :class:`PatternFilter`, persisted in PostgreSQL.
+    Editing a guild's patterns only rebuilds that guild's filter, which is
+    swapped in once built, and notifies the other processes to do the same.
+    """
+
+    __slots__ = ("_database", "_metrics", "_filters", "_reloads", "_ready")
+    channel = "moderation_filters"
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        database: Database,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self._database = database
+        self._metrics = metrics
+        self._filters: Dict[int, PatternFilter] = {}
+        self._reloads: Set[Task[None]] = set()
+        self._ready = False
+
+    async def _pool(self) -> Pool:
+        pool = await self._database.pool()
+
+        if not self._ready:
+            await pool.execute(SCHEMA)
+            self._ready = True
+
+        return pool
+
+    @staticmethod
+    def validate(pattern: str, regex: bool = False) -> None:
+        """Raise :class:`ValueError` if ``pattern`` cannot be filtered."""
+
+        if not pattern.strip():
+            raise ValueError("The pattern is empty.")
+
+        if not regex:
+            return
+
+        try:
+            literal = required_literal(pattern)
+
+        except re.error as exc:
+            raise ValueError(f"The regex is invalid: {exc}.") from None
+
+        if len(literal) < MIN_REGEX_LITERAL:
+            raise ValueError(
+                "The regex must contain a run of at least "
+                f"{MIN_REGEX_LITERAL} plain characters.",
+            )
+
+        if nested_quantifier(pattern):
+            raise ValueError(
+                "The regex must not repeat what it already repeats, "
+                "like `(a+)+`, as it could take forever to run.",
+            )
+
+    def match(self, guild_id: int, content: str) -> FilterMatch | None:
+        """The first of the guild's patterns found in ``content``, if any."""
+
+        if (filter_ := self._filters.get(guild_id)) is None:
+            return None
+
+        match = filter_.match(content)
+
+        if match is not None and self._metrics is not None:
+            self._metrics.increment("moderation.matches")
+
+        return match
+
+    async def load(self) -> None:
+        """Load every guild's patterns, and follow other processes' edits."""
+
+        pool = await self._pool()
+        patterns: Dict[int, Tuple[List[str], List[str]]] = {}
+
+        for row in await pool.fetch("SELECT * FROM moderation_filters"):
+            words, regexes = patterns.setdefault(row["guild_id"], ([], []))
+            (regexes if row["is_regex"] else words).append(row["pattern"])
+
+        self._filters = await to_thread(
+            lambda: {
+                guild_id: PatternFilter(words, regexes)
+                for guild_id, (words, regexes) in patterns.items()
+            }
+        )
+        await self._database.listen(self.channel, self._on_notification)
+        self.logger.info("Loaded filters for %s guilds.", len(self._filters))
+
+    def _on_notification(
+        self,
+        _: Connection,
+        __: int,
+        ___: str,
+        payload: str,
+    ) -> None:
+        task = ensure_future(self._reload(int(payload)))
+        self._reloads.add(task)
+        task.add_done_callback(self._reloads.discard)
+
+    async def _reload(self, guild_id: int) -> None:
+        words, regexes = await self.patterns(guild_id)
+        # Large lists take a while to compile, so keep the loop responsive.
+        filter_ = await to_thread(PatternFilter, words, regexes)
+
+        if filter_:
+            self._filters[guild_id] = filter_
+
+        else:
+            self._filters.pop(guild_id, None)
+
+    async def patterns(self, guild_id: int) -> Tuple[List[str], List[str]]:
+        """The guild's words and regexes."""
+
+        pool = await self._pool()
+        words: List[str] = []
+        regexes: List[str] = []
+
+        for row in await pool.fetch(
+            "SELECT pattern, is_regex FROM moderation_filters "
+            "WHERE guild_id = $1 ORDER BY pattern",
+            int(guild_id),
+        ):
+            (regexes if row["is_regex"] else words).append(row["pattern"])
+
+        return words, regexes
+
+    async def add(
+        self,
+        guild_id: int,
+        pattern: str,
+        regex: bool = False,
+    ) -> bool:
+        """Filter a pattern in a guild. Returns whether it was new."""
+
+        self.validate(pattern, regex)
+        pool = await self._pool()
+        status = await pool.execute(
+            "INSERT INTO moderation_filters VALUES ($1, $2, $3) "
+            "ON CONFLICT DO NOTHING",
+            int(guild_id),
+            pattern if regex else pattern.lower(),
+            regex,
+        )
+        await self._edited(guild_id)
+
+        return status.endswith("1")
+
+    async def remove(
+        self,
+        guild_id: int,
+        pattern: str,
+        regex: bool = False,
+    ) -> bool:
+        """Stop filtering a pattern in a guild. Returns whether it was."""
+
+        pool = await self._pool()
+        status = await pool.execute(
+            "DELETE FROM moderation_filters "
+            "WHERE guild_id = $1 AND pattern = $2 AND is_regex = $3",
+            int(guild_id),
+            pattern if regex else pattern.lower(),
+            regex,
+        )
+        await self._edited(guild_id)
+
+        return status.endswith("1")
+
+    async def _edited(self, guild_id: int) -> None:
+        await self._reload(guild_id)
+        await self._database.notify(self.channel, str(int(guild_id)))
+
+
+__all__: Final = (
+    "Automaton",
+    "FilterMatch",
+    "MessageFilter",
+    "PatternFilter",
+    "nested_quantifier",
+    "required_literal",
+)
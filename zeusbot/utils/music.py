@@ -1,36 +1,242 @@
 from __future__ import annotations
 
-from asyncio import get_event_loop
+import sys
+from asyncio import (
+    TimeoutError,
+    ensure_future,
+    gather,
+    get_event_loop,
+    shield,
+    sleep,
+    wait_for,
+)
+from dataclasses import asdict
+from logging import getLogger
+from time import time
 from typing import TYPE_CHECKING
 
 from hikari import Snowflake
-from lavaplayer import Lavalink, PlayList, TrackLoadFailed  # type: ignore
 
 from . import Config, HikariUtility
+from .player import PlayerClock, PlayerEvent
+from .settings import GuildSettings
+from .traffic import LAVALINK
 
 if TYPE_CHECKING:
-    from typing import Final
-
-    from hikari import GuildVoiceChannel, SnowflakeishOr
+    from typing import Any, Callable, Dict, Final, List, Self, Set
+
+    from hikari import Embed, GuildVoiceChannel, ShardAware, SnowflakeishOr
+    from lavaplayer import (  # type: ignore
+        Lavalink,
+        PlayerUpdateEvent,
+        Track,
+        TrackEndEvent,
+        TrackStartEvent,
+    )
     from tanjun.abc import Context
 
+    from .autoplay import Autoplay
+    from .panels import PlayerPanels
+    from .playlists import SavedPlaylists
+    from .settings import SettingsCache
+    from .storage import LocalStorage
+    from .traffic import TrafficRecorder
+
 
 class MusicUtility:
     """The utility store for music-related operations."""
 
-    __slots__ = ("_lavalink",)
+    __slots__ = (
+        "_lavalink",
+        "_channels",
+        "_clocks",
+        "_seeded",
+        "_listeners",
+        "settings",
+        "playlists",
+        "recorder",
+        "panels",
+        "autoplay",
+    )
+    checkpoint_document = "players.json"
+    # How long a command waits for the guild's settings, well within the
+    # time it has to respond, before it uses the defaults.
+    settings_timeout = 1.0
+    max_playlist_length = 1000
+    logger = getLogger(__name__)
 
     def __init__(self) -> None:
-        self._lavalink = Lavalink(
-            host=Config.LAVALINK_HOST,
-            port=Config.LAVALINK_PORT,
-            password=Config.LAVALINK_PASSWORD,
-            user_id=Config.BOT_ID,
+        self._lavalink: Lavalink | None = None
+        self._channels: Dict[int, Snowflake] = {}
+        self._clocks: Dict[int, PlayerClock] = {}
+        self._seeded: Set[int] = set()
+        self._listeners: List[Callable[[PlayerEvent], None]] = []
+        self.settings: SettingsCache | None = None
+        self.playlists: SavedPlaylists | None = None
+        self.recorder: TrafficRecorder | None = None
+        self.panels: PlayerPanels | None = None
+        self.autoplay: Autoplay | None = None
+
+    @property
+    def lavalink(self) -> Lavalink:
+        """
+        The Lavalink client.
+        It is created on first use, so that processes which never play music
+        do not have to import :mod:`lavaplayer`.
+        """
+
+        if self._lavalink is None:
+            from lavaplayer import (
+                Lavalink,
+                PlayerUpdateEvent,
+                TrackEndEvent,
+                TrackStartEvent,
+            )
+
+            self._lavalink = Lavalink(
+                host=Config.LAVALINK_HOST,
+                port=Config.LAVALINK_PORT,
+                password=Config.LAVALINK_PASSWORD,
+                user_id=Config.BOT_ID,
+            )
+            emitter = self._lavalink.event_manager
+            emitter.add_listener(TrackStartEvent, self._on_track_start)
+            emitter.add_listener(TrackEndEvent, self._on_track_end)
+            emitter.add_listener(PlayerUpdateEvent, self._on_player_update)
+
+        return self._lavalink
+
+    @classmethod
+    def adopt(cls, other: MusicUtility) -> Self:
+        """
+        Create a utility that takes over the state of another.
+        Used after hot reloading this module, so that the new class keeps
+        the old instance's Lavalink connection and active players.
+        """
+
+        self = cls()
+
+        for slot in other.__slots__:
+            if slot in cls.__slots__:
+                setattr(self, slot, getattr(other, slot))
+
+        if self._lavalink is not None:
+            # Point the Lavalink listeners at the new instance's methods.
+            for listener in self._lavalink.event_manager.listeners:
+                if getattr(listener["func"], "__self__", None) is other:
+                    listener["func"] = getattr(
+                        self,
+                        listener["func"].__name__,
+                    )
+
+        return self
+
+    def add_listener(self, callback: Callable[[PlayerEvent], None]) -> None:
+        """Call ``callback`` with every :class:`PlayerEvent`."""
+
+        self._listeners.append(callback)
+
+    def remove_listener(
+        self,
+        callback: Callable[[PlayerEvent], None],
+    ) -> None:
+        self._listeners.remove(callback)
+
+    def _dispatch(self, event: PlayerEvent) -> None:
+        for callback in self._listeners:
+            try:
+                callback(event)
+
+            except Exception:
+                self.logger.exception("Player listener %r failed", callback)
+
+    def clock(self, guild_id: int) -> PlayerClock | None:
+        """The clock of the guild's current track, if one is playing."""
+
+        return self._clocks.get(guild_id)
+
+    async def _on_track_start(self, event: TrackStartEvent) -> None:
+        # A track queued while paused starts paused.
+        node = await self.lavalink.get_guild_node(event.guild_id)
+        paused = bool(node and node.is_pause)
+
+        # Restoring a player seeds the clock, if it seeks before this event.
+        # Any other clock is the previous track's, left if its end was missed.
+        seeded = event.guild_id in self._seeded
+        self._seeded.discard(event.guild_id)
+
+        if seeded and (clock := self._clocks.get(event.guild_id)):
+            clock.pause(paused)
+
+        else:
+            self._clocks[event.guild_id] = PlayerClock(
+                event.track.length,
+                paused=paused,
+            )
+        self._dispatch(PlayerEvent("start", event.guild_id, event.track))
+
+    async def _on_track_end(self, event: TrackEndEvent) -> None:
+        self._clocks.pop(event.guild_id, None)
+        self._dispatch(
+            PlayerEvent("end", event.guild_id, event.track, event.reason),
         )
 
+        if (
+            event.reason == "FINISHED"
+            and self.autoplay is not None
+            and self.autoplay.enabled(event.guild_id)
+        ):
+            await self._play_next(event.guild_id, event.track)
+
+    async def _play_next(self, guild_id: int, track: Track) -> None:
+        """Play the track autoplay picks, if the queue ran dry."""
+
+        # Lavaplayer has moved the queue on by the time listeners run.
+        node = await self.lavalink.get_guild_node(guild_id)
+
+        if node is None or node.queue or node.repeat:
+            return
+
+        assert self.autoplay is not None
+
+        if picked := self.autoplay.pick(guild_id, track):
+            await self.lavalink.play(guild_id, picked, Config.BOT_ID)
+            self._dispatch(PlayerEvent("autoplay", guild_id, picked))
+
+    async def _on_player_update(self, event: PlayerUpdateEvent) -> None:
+        if event.position is None:
+            return
+
+        if clock := self._clocks.get(event.guild_id):
+            clock.update(int(event.position * 1000))
+
+        self._dispatch(PlayerEvent("update", event.guild_id))
+
+    def queued(self) -> int:
+        """The number of tracks queued, in every guild."""
+
+        nodes = self._lavalink.nodes if self._lavalink else {}
+
+        return sum(len(node.queue) for node in nodes.values())
+
     async def connect(self) -> None:
-        self._lavalink.set_event_loop(get_event_loop())
-        self._lavalink.connect()
+        self.lavalink.set_event_loop(get_event_loop())
+        self.lavalink.connect()
+
+        if self.recorder is not None:
+            self._record_frames(self.recorder)
+
+    def _record_frames(self, recorder: TrafficRecorder) -> None:
+        """Record the frames Lavalink sends, before they are handled."""
+
+        socket = self.lavalink._ws
+        handle = socket.callback
+
+        async def callback(payload: Dict[str, Any]) -> None:
+            recorder.record(LAVALINK, payload.get("op", ""), payload)
+            await handle(payload)
+
+        socket.callback = callback
 
     async def raw_voice_state_update(
         self,
@@ -39,7 +245,18 @@ class MusicUtility:
         session_id: str,
         channel_id: Snowflake | None,
     ) -> None:
-        await self._lavalink.raw_voice_state_update(
+        if user_id == Config.BOT_ID:
+            if channel_id is None:
+                # Left the channel, by /disconnect or being moved out.
+                self._channels.pop(guild_id, None)
+
+                if self.panels is not None:
+                    self.panels.detach(guild_id)
+
+            else:
+                self._channels[guild_id] = channel_id
+
+        await self.lavalink.raw_voice_state_update(
             guild_id,
             user_id,
             session_id,
@@ -52,12 +269,229 @@ class MusicUtility:
         endpoint: str,
         token: str,
     ) -> None:
-        await self._lavalink.raw_voice_server_update(
+        await self.lavalink.raw_voice_server_update(
             guild_id,
             endpoint,
             token,
         )
 
+    async def wait_until_connected(self, timeout: float = 30) -> bool:
+        """Wait for the Lavalink websocket to connect."""
+
+        async def poll() -> None:
+            while not self.lavalink.is_connect:
+                await sleep(0.1)
+
+        try:
+            await wait_for(poll(), timeout)
+
+        except TimeoutError:
+            return False
+
+        return True
+
+    async def checkpoint(self, storage: LocalStorage) -> int:
+        """
+        Save every guild's player (queue, position, volume and repeat modes)
+        to local storage, so that :meth:`restore` can resume it after a
+        restart. Returns the number of players saved.
+        """
+
+        players = []
+        nodes = self._lavalink.nodes if self._lavalink else {}
+
+        for guild_id, node in nodes.items():
+            if not node.queue or guild_id not in self._channels:
+                continue
+
+            players.append(
+                {
+                    "guild_id": str(guild_id),
+                    "channel_id": str(self._channels[guild_id]),
+                    "queue": [asdict(track) for track in node.queue],
+                    "position": self._position(guild_id, node.queue[0]),
+                    "volume": node.volume,
+                    "paused": node.is_pause,
+                    "repeat": node.repeat,
+                    "queue_repeat": node.queue_repeat,
+                }
+            )
+
+        storage.write_json(
+            self.checkpoint_document,
+            {"saved_at": time(), "players": players},
+        )
+
+        return len(players)
+
+    async def restore(
+        self,
+        shards: ShardAware,
+        storage: LocalStorage,
+        max_age: float = 300,
+    ) -> int:
+        """
+        Resume the players saved by :meth:`checkpoint`, unless they are older
+        than ``max_age`` seconds. Returns the number of players resumed.
+        """
+
+        document = storage.read_json(self.checkpoint_document)
+        storage.delete(self.checkpoint_document)
+
+        if not document or time() - document["saved_at"] > max_age:
+            return 0
+
+        if not await self.wait_until_connected():
+            self.logger.warning("Lavalink unavailable, not restoring players.")
+            return 0
+
+        results = await gather(
+            *(
+                self._restore_player(shards, player)
+                for player in document["players"]
+            ),
+            return_exceptions=True,
+        )
+
+        for result in results:
+            if isinstance(result, BaseException):
+                self.logger.error("Failed to restore a player: %r", result)
+
+        return sum(1 for result in results if result is None)
+
+    async def _restore_player(
+        self,
+        shards: ShardAware,
+        player: Dict[str, Any],
+    ) -> None:
+        from lavaplayer import Track
+
+        guild_id = Snowflake(player["guild_id"])
+        tracks = [Track(**track) for track in player["queue"]]
+
+        await shards.update_voice_state(
+            guild_id,
+            Snowflake(player["channel_id"]),
+            self_deaf=True,
+        )
+        node = await wait_for(self.lavalink.wait_for_connection(guild_id), 10)
+        await self.lavalink.play(guild_id, tracks[0], tracks[0].requester)
+        node.queue.extend(tracks[1:])
+
+        if player["position"]:
+            await self.lavalink.seek(guild_id, player["position"])
+
+            # The track may have started, at 0, before the seek.
+            if clock := self._clocks.get(guild_id):
+                clock.update(player["position"])
+
+            else:
+                self._clocks[guild_id] = PlayerClock(
+                    tracks[0].length,
+                    player["position"],
+                )
+                self._seeded.add(guild_id)
+
+        await self.lavalink.volume(guild_id, player["volume"])
+        await self.lavalink.repeat(guild_id, player["repeat"])
+        await self.lavalink.queue_repeat(guild_id, player["queue_repeat"])
+
+        if player["paused"]:
+            await self._pause(guild_id, True)
+
+    def _position(self, guild_id: int, track: Any) -> int:
+        if clock := self._clocks.get(guild_id):
+            return clock.position
+
+        return int((track.position or 0) * 1000)
+
+    async def _pause(self, guild_id: Snowflake, paused: bool) -> None:
+        await self.lavalink.pause(guild_id, paused)
+
+        if node := await self.lavalink.get_guild_node(guild_id):
+            node.is_pause = paused
+
+        if clock := self._clocks.get(guild_id):
+            clock.pause(paused)
+
+        self._dispatch(PlayerEvent("pause" if paused else "resume", guild_id))
+
+    @staticmethod
+    def _format_duration(milliseconds: int) -> str:
+        minutes, seconds = divmod(milliseconds // 1000, 60)
+        hours, minutes = divmod(minutes, 60)
+
+        if hours:
+            return f"{hours}:{minutes:02}:{seconds:02}"
+
+        return f"{minutes}:{seconds:02}"
+
+    async def _guild_settings(self, guild_id: Snowflake) -> GuildSettings:
+        """A guild's settings, or the defaults if they cannot be read."""
+
+        from asyncpg import (  # type: ignore
+            InterfaceError,
+            PostgresConnectionError,
+        )
+
+        if self.settings is None:
+            return GuildSettings()
+
+        # Left to finish after a timeout, so that the next command has them.
+        loading = ensure_future(self.settings.get(guild_id))
+        loading.add_done_callback(
+            lambda task: task.cancelled() or task.exception(),
+        )
+
+        try:
+            return await wait_for(shield(loading), self.settings_timeout)
+
+        except (
+            OSError,
+            TimeoutError,
+            InterfaceError,
+            PostgresConnectionError,
+        ):
+            # Playing music does not need the database to be up.
+            self.logger.warning(
+                "Could not read the settings of guild %s, using the defaults.",
+                guild_id,
+                exc_info=True,
+            )
+
+            return GuildSettings()
+
+    async def _apply_default_volume(self, guild_id: Snowflake) -> None:
+        if self.settings is None:
+            return
+
+        settings = await self._guild_settings(guild_id)
+
+        if settings.default_volume != 100:
+            await self.lavalink.volume(guild_id, settings.default_volume)
+
+    async def _check_dj(self, ctx: Context) -> bool:
+        """
+        Whether the author may control the player, responding if not.
+        Every command changing the player or its queue is gated, except
+        /play, so that anyone may still queue a track.
+        """
+
+        if self.settings is None or ctx.guild_id is None:
+            return True
+
+        settings = await self._guild_settings(ctx.guild_id)
+
+        if settings.dj_role_id is None or (
+            ctx.member is not None
+            and settings.dj_role_id in ctx.member.role_ids
+        ):
+            return True
+
+        await ctx.respond(f"Only <@&{settings.dj_role_id}> can do that.")
+
+        return False
+
     async def join_voice(
         self,
         ctx: Context,
@@ -85,7 +519,8 @@ class MusicUtility:
                     voice_channel,
                     self_deaf=True,
                 )
-                await self._lavalink.wait_for_connection(ctx.guild_id)
+                await self.lavalink.wait_for_connection(ctx.guild_id)
+                await self._apply_default_volume(ctx.guild_id)
                 mention = (
                     f"<#{voice_channel}>"
                     if isinstance(voice_channel, (Snowflake, int))
@@ -105,9 +540,21 @@ class MusicUtility:
             voice_state.channel_id,
             self_deaf=True,
         )
-        await self._lavalink.wait_for_connection(ctx.guild_id)
+        await self.lavalink.wait_for_connection(ctx.guild_id)
+        await self._apply_default_volume(ctx.guild_id)
         await ctx.respond(f"Connected to <#{voice_state.channel_id}>")
 
+    async def _queue_room(self, guild_id: Snowflake) -> int:
+        """How many tracks can still be queued in the guild."""
+
+        if self.settings is None:
+            return sys.maxsize
+
+        settings = await self._guild_settings(guild_id)
+        node = await self.lavalink.get_guild_node(guild_id)
+
+        return settings.max_queue_length - (len(node.queue) if node else 0)
+
     async def play(self, ctx: Context, song: str | None = None) -> None:
         """Play a song and/or add it to queue."""
 
@@ -125,11 +572,16 @@ class MusicUtility:
             await self.join_voice(ctx)
             return
 
+        if self.panels is not None:
+            self.panels.attach(ctx.guild_id, ctx.channel_id)
+
         if song is None:
-            await self._lavalink.pause(ctx.guild_id, False)
+            await self._pause(ctx.guild_id, False)
             return
 
-        result = await self._lavalink.auto_search_tracks(song)
+        from lavaplayer import PlayList, TrackLoadFailed
+
+        result = await self.lavalink.auto_search_tracks(song)
 
         if not result:
             await ctx.respond("Error")
@@ -139,106 +591,332 @@ class MusicUtility:
             await ctx.respond("Track unable to be loaded.")
             return
 
+        room = await self._queue_room(ctx.guild_id)
+
+        if room <= 0:
+            await ctx.respond("The queue is full.")
+            return
+
         if isinstance(result, PlayList):
-            await self._lavalink.add_to_queue(
+            tracks = result.tracks[:room]
+            await self.lavalink.add_to_queue(
                 ctx.guild_id,
-                result.tracks,
+                tracks,
                 ctx.author.id,
             )
-            await ctx.respond(f"Added {len(result.tracks)} to queue.")
+
+            if self.autoplay is not None:
+                self.autoplay.queued(tracks)
+            self._dispatch(PlayerEvent("queue", ctx.guild_id))
+            await ctx.respond(f"Added {len(tracks)} to queue.")
             return
 
-        await self._lavalink.play(
+        await self.lavalink.play(
             ctx.guild_id,
             result[0],
             ctx.author.id,
         )
+        self._dispatch(PlayerEvent("queue", ctx.guild_id, result[0]))
         await ctx.respond(f"Added {result[0].title} to queue.")
 
+    async def _enqueue(
+        self,
+        guild_id: Snowflake,
+        tracks: List[Track],
+        requester: Snowflake,
+    ) -> None:
+        """Queue many tracks at once, starting the first if nothing plays."""
+
+        node = await self.lavalink.get_guild_node(guild_id)
+
+        if node is None:
+            return
+
+        for track in tracks:
+            track.requester = requester
+
+        if node.queue:
+            node.queue.extend(tracks)
+
+        else:
+            await self.lavalink.play(guild_id, tracks[0], requester)
+            node.queue.extend(tracks[1:])
+
+        if self.autoplay is not None:
+            self.autoplay.queued(tracks)
+
+        self._dispatch(PlayerEvent("queue", guild_id))
+
+    async def save_playlist(
+        self,
+        ctx: Context,
+        name: str,
+        link: str | None = None,
+    ) -> None:
+        """
+        Save the tracks of a link, or the queue, as one of the author's
+        playlists.
+        """
+
+        if self.playlists is None:
+            await ctx.respond("Saved playlists are unavailable.")
+            return
+
+        if link is not None:
+            from lavaplayer import TrackLoadFailed
+
+            result = await self.lavalink.auto_search_tracks(link)
+
+            if not result or isinstance(result, TrackLoadFailed):
+                await ctx.respond("Could not load that link.")
+                return
+
+            tracks = getattr(result, "tracks", result)
+
+        elif ctx.guild_id is not None and (
+            node := await self.lavalink.get_guild_node(ctx.guild_id)
+        ):
+            tracks = node.queue
+
+        else:
+            tracks = []
+
+        if not tracks:
+            await ctx.respond("There is nothing to save.")
+            return
+
+        tracks = tracks[: self.max_playlist_length]
+        await self.playlists.save(ctx.author.id, name, tracks, link)
+        await ctx.respond(f"Saved {len(tracks)} tracks as `{name}`.")
+
+    async def load_playlist(self, ctx: Context, name: str) -> None:
+        """Queue one of the author's saved playlists."""
+
+        if ctx.guild_id is None:
+            await ctx.respond("Cannot use music component in DMs.")
+            return
+
+        if self.playlists is None:
+            await ctx.respond("Saved playlists are unavailable.")
+            return
+
+        if ctx.client.cache is None or ctx.client.shards is None:
+            return
+
+        if not await self._check_dj(ctx):
+            return
+
+        if not ctx.client.cache.get_voice_state(
+            ctx.guild_id,
+            ctx.client.shards.get_me().id,  # type: ignore
+        ):
+            await self.join_voice(ctx)
+            return
+
+        playlist = await self.playlists.load(
+            ctx.author.id,
+            name,
+            self.lavalink.auto_search_tracks,
+        )
+
+        if playlist is None:
+            await ctx.respond(f"You have no playlist named `{name}`.")
+            return
+
+        room = await self._queue_room(ctx.guild_id)
+
+        if room <= 0:
+            await ctx.respond("The queue is full.")
+            return
+
+        tracks = playlist.tracks[:room]
+        await self._enqueue(ctx.guild_id, tracks, ctx.author.id)
+        await ctx.respond(f"Added {len(tracks)} from `{name}` to queue.")
+
     async def stop(self, ctx: Context) -> None:
         """Stop the queue."""
 
-        if ctx.guild_id is None:
+        if ctx.guild_id is None or not await self._check_dj(ctx):
             return
 
-        await self._lavalink.stop(ctx.guild_id)
+        await self.lavalink.stop(ctx.guild_id)
+        self._clocks.pop(ctx.guild_id, None)
+        self._seeded.discard(ctx.guild_id)
+        self._dispatch(PlayerEvent("stop", ctx.guild_id))
+
+        if self.panels is not None:
+            self.panels.detach(ctx.guild_id)
+
         await ctx.respond("Stopped playing.")
 
     async def disconnect(self, ctx: Context) -> None:
         """Disconnect from the voice channel."""
 
-        if ctx.guild_id is None or ctx.client.shards is None:
+        if (
+            ctx.guild_id is None
+            or ctx.client.shards is None
+            or not await self._check_dj(ctx)
+        ):
             return
 
         await ctx.client.shards.update_voice_state(ctx.guild_id, None)
-        await self._lavalink.wait_for_remove_connection(ctx.guild_id)
+        await self.lavalink.wait_for_remove_connection(ctx.guild_id)
         await ctx.respond("Disconnected")
 
     async def skip(self, ctx: Context) -> None:
         """Skip to the next song."""
 
-        if ctx.guild_id is None:
+        if ctx.guild_id is None or not await self._check_dj(ctx):
             return
 
-        if not await self._lavalink.get_guild_node(ctx.guild_id):
+        if not await self.lavalink.get_guild_node(ctx.guild_id):
             await ctx.respond("Node not available, so I can't skip.")
             return
 
-        await self._lavalink.skip(ctx.guild_id)
+        await self.lavalink.skip(ctx.guild_id)
 
-    async def now_playing(self, ctx: Context) -> None:
-        """Display the currently playing song."""
-
-        if ctx.guild_id is None:
-            return
+    async def player_embed(self, guild_id: int) -> Embed | None:
+        """The embed showing the guild's current track, if one is playing."""
 
         if (
-            not (node := await self._lavalink.get_guild_node(ctx.guild_id))
+            not (node := await self.lavalink.get_guild_node(guild_id))
             or not node.queue
         ):
-            return
+            return None
 
+        track = node.queue[0]
+        position = self._position(guild_id, track)
         fields = [
-            ("Title", f"[{node.queue[0].title}]({node.queue[0].uri})", True),
+            ("Title", f"[{track.title}]({track.uri})", True),
             (
                 "Position",
-                f"{node.queue[0].position}/{node.queue[0].length}",
+                f"{self._format_duration(position)}/"
+                f"{self._format_duration(track.length)}",
                 True,
             ),
         ]
 
-        embed = HikariUtility.build_embed(
-            title="Now playing",
+        if upcoming := node.queue[1:]:
+            more = f" and {len(upcoming) - 1} more" if upcoming[1:] else ""
+            fields.append(("Up next", f"{upcoming[0].title}{more}", False))
+
+        return HikariUtility.build_embed(
+            title="Paused" if node.is_pause else "Now playing",
             fields=fields,
         )
 
-        await ctx.respond(embed=embed)
+    @staticmethod
+    def _track_state(track: Track) -> Dict[str, Any]:
+        return {
+            "identifier": track.identifier,
+            "title": track.title,
+            "author": track.author,
+            "uri": track.uri,
+            "length": track.length,
+            "requester": None
+            if track.requester is None
+            else str(track.requester),
+        }
+
+    async def player_state(
+        self,
+        guild_id: int,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        The guild's player, as the dashboard shows it: the current track, the
+        first ``limit`` tracks after it, and, while playing, when the track
+        would have started, so that its position can be followed locally.
+        """
+
+        node = await self.lavalink.get_guild_node(guild_id)
+        queue = node.queue if node else []
+        track = queue[0] if queue else None
+        position = self._position(guild_id, track) if track else None
+        paused = bool(node and node.is_pause)
+        end = limit + 1
+
+        return {
+            "track": self._track_state(track) if track else None,
+            "paused": paused,
+            "position": position if paused else None,
+            "started_at": (
+                None
+                if position is None or paused
+                else int(time() * 1000) - position
+            ),
+            "volume": node.volume if node else None,
+            "repeat": bool(node and node.repeat),
+            "queue_repeat": bool(node and node.queue_repeat),
+            "autoplay": bool(
+                self.autoplay and self.autoplay.enabled(guild_id),
+            ),
+            "queued": max(len(queue) - 1, 0),
+            "queue": [self._track_state(t) for t in queue[1:end]],
+        }
+
+    async def now_playing(self, ctx: Context) -> None:
+        """Display the currently playing song."""
+
+        if ctx.guild_id is None:
+            return
+
+        if (embed := await self.player_embed(ctx.guild_id)) is None:
+            return
+
+        if self.panels is None:
+            await ctx.respond(embed=embed)
+            return
+
+        # The reply becomes the panel, rather than another message to edit.
+        message = await ctx.respond(embed=embed, ensure_result=True)
+        self.panels.adopt(ctx.guild_id, ctx.channel_id, message.id)
 
     async def shuffle(self, ctx: Context) -> None:
         """Shuffle the queue."""
 
-        if ctx.guild_id is None:
+        if ctx.guild_id is None or not await self._check_dj(ctx):
             return
 
-        await self._lavalink.shuffle(ctx.guild_id)  # type: ignore
+        await self.lavalink.shuffle(ctx.guild_id)  # type: ignore
+        self._dispatch(PlayerEvent("queue", ctx.guild_id))
         await ctx.respond("Queue shuffled.")
 
     async def repeat(self, ctx: Context, status: bool) -> None:
         """Repeat song."""
 
-        if ctx.guild_id is None:
+        if ctx.guild_id is None or not await self._check_dj(ctx):
             return
 
-        await self._lavalink.repeat(ctx.guild_id, status)
+        await self.lavalink.repeat(ctx.guild_id, status)
+        self._dispatch(PlayerEvent("repeat", ctx.guild_id))
         await ctx.respond("Repeating every song.")
 
+    async def set_autoplay(self, ctx: Context, status: bool) -> None:
+        """Turn autoplay on or off."""
+
+        if (
+            ctx.guild_id is None
+            or self.autoplay is None
+            or not await self._check_dj(ctx)
+        ):
+            return
+
+        self.autoplay.enable(ctx.guild_id, status)
+        await ctx.respond(
+            "I'll pick what plays next when the queue runs out."
+            if status
+            else "Autoplay is off."
+        )
+
     async def volume(self, ctx: Context, volume: int) -> None:
         """Set the volume."""
 
-        if ctx.guild_id is None:
+        if ctx.guild_id is None or not await self._check_dj(ctx):
             return
 
-        await self._lavalink.volume(ctx.guild_id, volume)
+        await self.lavalink.volume(ctx.guild_id, volume)
+        self._dispatch(PlayerEvent("volume", ctx.guild_id))
         await ctx.respond(f"Set volume to {volume}")
 
     async def queue(self, ctx: Context) -> None:
@@ -248,7 +926,7 @@ class MusicUtility:
             return
 
         if (
-            not (node := await self._lavalink.get_guild_node(ctx.guild_id))
+            not (node := await self.lavalink.get_guild_node(ctx.guild_id))
             or not node.queue
         ):
             await ctx.respond("Error.")
@@ -270,19 +948,31 @@ class MusicUtility:
     async def seek(self, ctx: Context, position: int) -> None:
         """Set the position of the track."""
 
-        if ctx.guild_id is None:
+        if ctx.guild_id is None or not await self._check_dj(ctx):
             return
 
-        await self._lavalink.seek(ctx.guild_id, position)
+        if (clock := self._clocks.get(ctx.guild_id)) is None:
+            await ctx.respond("Nothing is playing.")
+            return
+
+        if not 0 <= position <= clock.length:
+            await ctx.respond(
+                f"The position must be between 0 and {clock.length}.",
+            )
+            return
+
+        await self.lavalink.seek(ctx.guild_id, position)
+        clock.update(position)
+        self._dispatch(PlayerEvent("seek", ctx.guild_id))
         await ctx.respond("Seeked.")
 
     async def pause(self, ctx: Context) -> None:
         """Pasuse the playback."""
 
-        if ctx.guild_id is None:
+        if ctx.guild_id is None or not await self._check_dj(ctx):
             return
 
-        await self._lavalink.pause(ctx.guild_id, True)
+        await self._pause(ctx.guild_id, True)
 
 
 __all__: Final = ("MusicUtility",)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from asyncio import ensure_future, sleep
+from logging import getLogger
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from hikari import ForbiddenError, NotFoundError, Snowflake
+
+from . import HikariUtility
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from typing import Awaitable, Callable, Dict, Final
+
+    from hikari import Embed, SnowflakeishOr
+    from hikari.api import RESTClient
+
+    from .metrics import Metrics
+    from .player import PlayerEvent
+
+# The events that do not change what a panel shows.
+_IGNORED: Final = frozenset(("update",))
+
+
+class _Panel:
+    """A guild's panel message, and its pending edit."""
+
+    __slots__ = ("channel_id", "message_id", "dirty", "sent_at", "task")
+
+    def __init__(self, channel_id: Snowflake) -> None:
+        self.channel_id = channel_id
+        self.message_id: Snowflake | None = None
+        self.dirty = False
+        self.sent_at = float("-inf")
+        self.task: Task[None] | None = None
+
+
+class PlayerPanels:
+    """
+    Keeps one player panel message per guild, in the channel music was last
+    played from, and edits it in place as the player changes, rather than
+    posting a message for every change.
+
+    Edits are coalesced: the first change after a quiet ``interval`` is
+    sent at once, and every change within ``interval`` of the last edit is
+    folded into a single edit at the end of it, showing the latest state.
+    A guild's panel therefore makes at most one REST call per ``interval``.
+
+    ``rest`` and ``render``, which builds a guild's panel, or returns
+    ``None`` when nothing is playing, are set by the client.
+    """
+
+    __slots__ = ("_metrics", "_interval", "_panels", "rest", "render")
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        *,
+        interval: float = 2.0,
+    ) -> None:
+        self._metrics = metrics
+        self._interval = interval
+        self._panels: Dict[int, _Panel] = {}
+        self.rest: RESTClient | None = None
+        self.render: Callable[[int], Awaitable[Embed | None]] | None = None
+
+    def attach(
+        self,
+        guild_id: SnowflakeishOr[int],
+        channel_id: SnowflakeishOr[int],
+    ) -> None:
+        """Show the guild's panel in a channel, moving it if needed."""
+
+        guild_id, channel_id = int(guild_id), Snowflake(channel_id)
+        panel = self._panels.get(guild_id)
+
+        if panel is not None and panel.channel_id == channel_id:
+            return
+
+        self._panels[guild_id] = new = _Panel(channel_id)
+
+        if panel is not None:
+            # Keep the old panel's pacing, moving its pending edit over.
+            new.sent_at = panel.sent_at
+
+            if panel.task is not None:
+                panel.task.cancel()
+                self.refresh(guild_id)
+
+    def adopt(
+        self,
+        guild_id: SnowflakeishOr[int],
+        channel_id: SnowflakeishOr[int],
+        message_id: SnowflakeishOr[int],
+    ) -> None:
+        """Use a message just sent showing the player as the guild's panel."""
+
+        self.attach(guild_id, channel_id)
+        panel = self._panels[int(guild_id)]
+        panel.message_id = Snowflake(message_id)
+        panel.sent_at = monotonic()
+
+    def detach(self, guild_id: SnowflakeishOr[int]) -> None:
+        """Stop updating the guild's panel."""
+
+        if panel := self._panels.pop(int(guild_id), None):
+            if panel.task is not None:
+                panel.task.cancel()
+
+    def player_event(self, event: PlayerEvent) -> None:
+        """Refresh the panel of the guild an event happened in."""
+
+        if event.kind not in _IGNORED:
+            self.refresh(event.guild_id)
+
+    def refresh(self, guild_id: SnowflakeishOr[int]) -> None:
+        """Schedule an edit of the guild's panel, if it has one."""
+
+        if (panel := self._panels.get(int(guild_id))) is None:
+            return
+
+        panel.dirty = True
+
+        if panel.task is None:
+            panel.task = ensure_future(self._flush(int(guild_id), panel))
+
+        else:
+            self._metrics.increment("panels.coalesced")
+
+    async def _flush(self, guild_id: int, panel: _Panel) -> None:
+        try:
+            while panel.dirty:
+                delay = panel.sent_at + self._interval - monotonic()
+
+                if delay > 0:
+                    await sleep(delay)
+
+                panel.dirty = False
+                await self._send(guild_id, panel)
+                panel.sent_at = monotonic()
+
+        finally:
+            panel.task = None
+
+    async def _send(self, guild_id: int, panel: _Panel) -> None:
+        if self.rest is None or self.render is None:
+            return
+
+        try:
+            embed = await self.render(guild_id)
+
+            if embed is None:
+                embed = HikariUtility.build_embed(title="Nothing is playing")
+
+            if panel.message_id is not None:
+                try:
+                    await self.rest.edit_message(
+                        panel.channel_id,
+                        panel.message_id,
+                        embed=embed,
+                    )
+                    self._metrics.increment("panels.edited")
+                    return
+
+                except NotFoundError:
+                    # The panel was deleted; post a new one.
+                    panel.message_id = None
+
+            message = await self.rest.create_message(
+                panel.channel_id,
+                embed=embed,
+            )
+            panel.message_id = message.id
+            self._metrics.increment("panels.created")
+
+        except ForbiddenError:
+            self.logger.warning(
+                "Cannot post the player panel in %s.",
+                panel.channel_id,
+            )
+            self._panels.pop(guild_id, None)
+
+        except Exception:
+            self.logger.exception("Could not update the player panel.")
+
+
+__all__: Final = ("PlayerPanels",)
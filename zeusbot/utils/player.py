@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from time import monotonic
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from typing import Any, Final
+
+
+class PlayerEvent(NamedTuple):
+    """A change to a guild's player, as dispatched by the music utility."""
+
+    kind: str
+    guild_id: int
+    track: Any = None
+    reason: str | None = None
+
+
+class PlayerClock:
+    """
+    A player's playback position, interpolated locally with monotonic time.
+    It is corrected by every player update, pause, seek and track change,
+    so reading it never needs a round trip to the Lavalink node.
+    """
+
+    __slots__ = ("length", "_position", "_updated_at", "_paused")
+
+    def __init__(
+        self,
+        length: int = 0,
+        position: int = 0,
+        paused: bool = False,
+    ) -> None:
+        self.length = length
+        self._position = position
+        self._updated_at = monotonic()
+        self._paused = paused
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def position(self) -> int:
+        """The current position, in milliseconds."""
+
+        if self._paused:
+            return self._position
+
+        position = self._position + int(
+            (monotonic() - self._updated_at) * 1000,
+        )
+
+        return min(position, self.length) if self.length else position
+
+    def update(self, position: int) -> None:
+        """Correct the position, e.g. from a node's player update."""
+
+        self._position = position
+        self._updated_at = monotonic()
+
+    def pause(self, paused: bool) -> None:
+        """Freeze or resume the clock at its current position."""
+
+        if paused == self._paused:
+            return
+
+        self.update(self.position)
+        self._paused = paused
+
+
+__all__: Final = ("PlayerClock", "PlayerEvent")
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import struct
+from asyncio import ensure_future
+from base64 import b64decode, b64encode
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from typing import Any, Awaitable, Callable, Final, List, Sequence, Set
+
+    from asyncpg import Pool  # type: ignore
+    from lavaplayer import Track  # type: ignore
+
+    from .database import Database
+    from .metrics import Metrics
+
+SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS saved_playlists (
+    user_id BIGINT NOT NULL,
+    name TEXT NOT NULL,
+    source TEXT,
+    track_count INTEGER NOT NULL,
+    tracks BYTEA NOT NULL,
+    saved_at TIMESTAMPTZ NOT NULL,
+    checked_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, name)
+);
+"""
+# The version of the blob format, stored as its first byte.
+BLOB_VERSION: Final = 1
+_HEADER: Final = struct.Struct(">I")
+_SHORT: Final = struct.Struct(">H")
+_LONG: Final = struct.Struct(">q")
+
+
+class _Reader:
+    """Reads the fields of a Lavaplayer message."""
+
+    __slots__ = ("_data", "_offset")
+
+    def __init__(self, data: bytes, offset: int = 0) -> None:
+        self._data = data
+        self._offset = offset
+
+    def byte(self) -> int:
+        self._offset += 1
+
+        return self._data[self._offset - 1]
+
+    def long(self) -> int:
+        (value,) = _LONG.unpack_from(self._data, self._offset)
+        self._offset += 8
+
+        return int(value)
+
+    def text(self) -> str:
+        (size,) = _SHORT.unpack_from(self._data, self._offset)
+        start = self._offset + _SHORT.size
+        self._offset = end = start + size
+        raw = self._data[start:end]
+
+        try:
+            return raw.decode()
+
+        except UnicodeDecodeError:
+            # Java's modified UTF-8 encodes characters outside of the BMP as
+            # surrogate pairs, and NUL as two bytes.
+            return (
+                raw.replace(b"\xc0\x80", b"\x00")
+                .decode("utf-8", "surrogatepass")
+                .encode("utf-16", "surrogatepass")
+                .decode("utf-16")
+            )
+
+    def nullable_text(self) -> str | None:
+        return self.text() if self.byte() else None
+
+
+def decode_track(message: bytes) -> Track:
+    """
+    Decode a Lavaplayer track message (a Lavalink encoded track, before its
+    base64 encoding) locally, without a round trip to Lavalink.
+    """
+
+    from lavaplayer import Track
+
+    (header,) = _HEADER.unpack_from(message)
+    reader = _Reader(message, _HEADER.size)
+    version = reader.byte() if header >> 30 & 1 else 1
+    title = reader.text()
+    author = reader.text()
+    length = reader.long()
+    identifier = reader.text()
+    is_stream = bool(reader.byte())
+    # Version 1 messages have no URI.
+    uri = reader.nullable_text() if version >= 2 else None
+
+    if version >= 3:
+        reader.nullable_text()  # The artwork URL
+        reader.nullable_text()  # The ISRC
+
+    source_name = reader.text()
+
+    return Track(
+        track=b64encode(message).decode(),
+        identifier=identifier,
+        is_seekable=not is_stream,
+        author=author,
+        length=length,
+        is_stream=is_stream,
+        position=0,
+        title=title,
+        uri=uri or "",
+        source_name=source_name,
+    )
+
+
+def encode_tracks(tracks: Sequence[Track]) -> bytes:
+    """
+    Pack tracks into a blob of their Lavaplayer messages, back to back.
+    Each message starts with its size, so no framing is needed.
+    """
+
+    return bytes((BLOB_VERSION,)) + b"".join(
+        b64decode(track.track) for track in tracks
+    )
+
+
+def decode_tracks(blob: bytes) -> List[Track]:
+    """Unpack the tracks in a blob made by :func:`encode_tracks`."""
+
+    if not blob or blob[0] != BLOB_VERSION:
+        raise ValueError("Unsupported playlist blob")
+
+    tracks = []
+    offset = 1
+
+    while offset < len(blob):
+        (header,) = _HEADER.unpack_from(blob, offset)
+        end = offset + _HEADER.size + (header & 0x3FFFFFFF)
+        tracks.append(decode_track(blob[offset:end]))
+        offset = end
+
+    return tracks
+
+
+class SavedPlaylist(NamedTuple):
+    """A playlist a user saved, with its tracks ready to queue."""
+
+    name: str
+    source: str | None
+    tracks: List[Track]
+    saved_at: datetime
+    checked_at: datetime
+
+
+class SavedPlaylists:
+    """
+    Users' saved playlists, stored as blobs of Lavalink encoded tracks, so
+    that loading one queues it without searching for it again.
+
+    Playlists saved from a link are refreshed in the background once they
+    are loaded after ``max_age``, so that they follow the source's changes
+    without making anyone wait for the search.
+    """
+
+    __slots__ = (
+        "_database",
+        "_metrics",
+        "_max_age",
+        "_refreshing",
+        "_ready",
+    )
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        database: Database,
+        metrics: Metrics | None = None,
+        *,
+        max_age: timedelta = timedelta(days=7),
+    ) -> None:
+        self._database = database
+        self._metrics = metrics
+        self._max_age = max_age
+        self._refreshing: Set[Task[None]] = set()
+        self._ready = False
+
+    async def _pool(self) -> Pool:
+        pool = await self._database.pool()
+
+        if not self._ready:
+            await pool.execute(SCHEMA)
+            self._ready = True
+
+        return pool
+
+    async def save(
+        self,
+        user_id: int,
+        name: str,
+        tracks: Sequence[Track],
+        source: str | None = None,
+    ) -> None:
+        """Save tracks as a user's playlist, replacing it if it exists."""
+
+        now = datetime.now(timezone.utc)
+        pool = await self._pool()
+        await pool.execute(
+            "INSERT INTO saved_playlists "
+            "(user_id, name, source, track_count, tracks, saved_at, "
+            "checked_at) "
+            "VALUES ($1, $2, $3, $4, $5, $6, $6) "
+            "ON CONFLICT (user_id, name) DO UPDATE "
+            "SET source = excluded.source, "
+            "track_count = excluded.track_count, "
+            "tracks = excluded.tracks, saved_at = excluded.saved_at, "
+            "checked_at = excluded.checked_at",
+            int(user_id),
+            name,
+            source,
+            len(tracks),
+            encode_tracks(tracks),
+            now,
+        )
+
+    async def load(
+        self,
+        user_id: int,
+        name: str,
+        resolve: Callable[[str], Awaitable[Any]] | None = None,
+    ) -> SavedPlaylist | None:
+        """
+        A user's playlist, if it exists. If it is stale, it is refreshed
+        in the background, searching its source with ``resolve``.
+        """
+
+        pool = await self._pool()
+        row = await pool.fetchrow(
+            "SELECT source, tracks, saved_at, checked_at "
+            "FROM saved_playlists WHERE user_id = $1 AND name = $2",
+            int(user_id),
+            name,
+        )
+
+        if row is None:
+            return None
+
+        playlist = SavedPlaylist(
+            name,
+            row["source"],
+            decode_tracks(row["tracks"]),
+            row["saved_at"],
+            row["checked_at"],
+        )
+
+        if (
+            resolve is not None
+            and playlist.source is not None
+            and datetime.now(timezone.utc) - playlist.checked_at
+            > self._max_age
+        ):
+            task = ensure_future(self._refresh(user_id, playlist, resolve))
+            self._refreshing.add(task)
+            task.add_done_callback(self._refreshing.discard)
+
+        return playlist
+
+    async def names(self, user_id: int) -> List[Any]:
+        """The names and lengths of a user's playlists."""
+
+        pool = await self._pool()
+
+        return await pool.fetch(  # type: ignore
+            "SELECT name, track_count FROM saved_playlists "
+            "WHERE user_id = $1 ORDER BY name",
+            int(user_id),
+        )
+
+    async def delete(self, user_id: int, name: str) -> bool:
+        """Delete a user's playlist. Returns whether it existed."""
+
+        pool = await self._pool()
+        status = await pool.execute(
+            "DELETE FROM saved_playlists WHERE user_id = $1 AND name = $2",
+            int(user_id),
+            name,
+        )
+
+        return status.endswith(" 1")
+
+    async def _refresh(
+        self,
+        user_id: int,
+        playlist: SavedPlaylist,
+        resolve: Callable[[str], Awaitable[Any]],
+    ) -> None:
+        assert playlist.source is not None
+
+        try:
+            result = await resolve(playlist.source)
+
+        except Exception:
+            self.logger.exception("Could not refresh %s.", playlist.source)
+            return
+
+        tracks = getattr(result, "tracks", result)
+        pool = await self._pool()
+
+        if not isinstance(tracks, list) or not tracks:
+            # Keep what was saved, should the source be gone for good.
+            await pool.execute(
+                "UPDATE saved_playlists SET checked_at = $3 "
+                "WHERE user_id = $1 AND name = $2",
+                int(user_id),
+                playlist.name,
+                datetime.now(timezone.utc),
+            )
+            return
+
+        unchanged = [track.identifier for track in tracks] == [
+            track.identifier for track in playlist.tracks
+        ]
+        await pool.execute(
+            "UPDATE saved_playlists "
+            "SET track_count = $3, tracks = $4, checked_at = $5 "
+            "WHERE user_id = $1 AND name = $2 AND saved_at = $6",
+            int(user_id),
+            playlist.name,
+            len(tracks),
+            encode_tracks(tracks),
+            datetime.now(timezone.utc),
+            playlist.saved_at,
+        )
+
+        if not unchanged and self._metrics is not None:
+            self._metrics.increment("playlists.refreshed")
+
+
+__all__: Final = (
+    "SavedPlaylist",
+    "SavedPlaylists",
+    "decode_track",
+    "decode_tracks",
+    "encode_tracks",
+)
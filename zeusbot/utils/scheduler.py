@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+import json
+from asyncio import ensure_future, gather
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from math import ceil
+from time import time
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from typing import (
+        Any,
+        Awaitable,
+        Callable,
+        Dict,
+        Final,
+        Hashable,
+        List,
+        Set,
+        Tuple,
+    )
+
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
+    from asyncpg import Connection, Pool  # type: ignore
+
+    from .database import Database
+    from .metrics import Metrics
+
+SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    due_at TIMESTAMPTZ NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scheduled_jobs_by_due_at
+    ON scheduled_jobs (due_at);
+"""
+
+
+class TimerWheel:
+    """
+    A hierarchical timer wheel, holding keys until their due time.
+    Adding and removing a key is constant time, and advancing the wheel
+    only touches the slots that became due, however many keys it holds.
+    """
+
+    __slots__ = ("_resolution", "_slots", "_wheels", "_tick", "_entries")
+
+    def __init__(
+        self,
+        resolution: float = 1.0,
+        slots: int = 64,
+        levels: int = 3,
+        now: float | None = None,
+    ) -> None:
+        self._resolution = resolution
+        self._slots = slots
+        self._wheels: List[List[Set[Hashable]]] = [
+            [set() for _ in range(slots)] for _ in range(levels)
+        ]
+        self._tick = int((time() if now is None else now) // resolution)
+        # The level, slot and due tick of every key.
+        self._entries: Dict[Hashable, Tuple[int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def span(self) -> float:
+        """How far ahead of its current time the wheel can hold keys."""
+
+        return self._slots ** len(self._wheels) * self._resolution
+
+    def add(self, key: Hashable, due: float) -> None:
+        """Hold ``key`` until the time ``due``, replacing it if held."""
+
+        self.remove(key)
+        # The current tick was already advanced past.
+        self._place(key, max(ceil(due / self._resolution), self._tick + 1))
+
+    def remove(self, key: Hashable) -> None:
+        """Stop holding ``key``, if it is held."""
+
+        if (entry := self._entries.pop(key, None)) is not None:
+            level, slot, _ = entry
+            self._wheels[level][slot].discard(key)
+
+    def _place(self, key: Hashable, due_tick: int) -> None:
+        delta = due_tick - self._tick
+        span = self._slots
+
+        for level, wheel in enumerate(self._wheels):
+            if delta < span or level == len(self._wheels) - 1:
+                slot = (due_tick // (span // self._slots)) % self._slots
+                wheel[slot].add(key)
+                self._entries[key] = (level, slot, due_tick)
+                return
+
+            span *= self._slots
+
+    def advance(self, now: float | None = None) -> List[Hashable]:
+        """Move the wheel to ``now``, and return the keys that became due."""
+
+        target = int((time() if now is None else now) // self._resolution)
+        due: List[Hashable] = []
+
+        while self._tick < target:
+            self._tick += 1
+            aligned = []
+            span = self._slots
+
+            for level in range(1, len(self._wheels)):
+                if self._tick % span:
+                    break
+
+                aligned.append((level, (self._tick // span) % self._slots))
+                span *= self._slots
+
+            # Cascade the outer slots that start now, outermost first.
+            for level, slot in reversed(aligned):
+                keys = self._wheels[level][slot]
+                self._wheels[level][slot] = set()
+
+                for key in keys:
+                    self._place(key, self._entries[key][2])
+
+            slot = self._tick % self._slots
+            keys = self._wheels[0][slot]
+            self._wheels[0][slot] = set()
+
+            for key in keys:
+                del self._entries[key]
+
+            due.extend(keys)
+
+        return due
+
+
+class ScheduledJob(NamedTuple):
+    """A job, due at a given time."""
+
+    id: int
+    kind: str
+    due_at: datetime
+    payload: Dict[str, Any]
+
+
+class Scheduler:
+    """
+    Runs jobs at a given time, persisted in PostgreSQL so that they survive
+    restarts. Only the jobs due within the ``horizon`` are held in memory,
+    in a :class:`TimerWheel`, and they are loaded as their window approaches,
+    so memory stays flat however many jobs are pending. APScheduler drives
+    the ticks and loads.
+
+    Due jobs are deleted from the store in batches before they are
+    dispatched, so a job never fires twice, even across processes, and the
+    jobs that fell due while the bot was down fire as soon as it starts.
+    Only the kinds with a handler are claimed; the others stay stored, and
+    fire once a handler is set, e.g. after their module is reloaded.
+    """
+
+    __slots__ = (
+        "_database",
+        "_metrics",
+        "_horizon",
+        "_resolution",
+        "_batch_size",
+        "_handlers",
+        "_wheel",
+        "_failures",
+        "_scheduler",
+        "_dispatching",
+        "_ready",
+    )
+    channel = "scheduled_jobs"
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        database: Database,
+        metrics: Metrics | None = None,
+        *,
+        horizon: float = 300.0,
+        resolution: float = 1.0,
+        batch_size: int = 500,
+    ) -> None:
+        self._database = database
+        self._metrics = metrics
+        self._horizon = horizon
+        self._resolution = resolution
+        self._batch_size = batch_size
+        self._handlers: Dict[
+            str, Callable[[ScheduledJob], Awaitable[Any]]
+        ] = {}
+        self._wheel = TimerWheel(resolution)
+        # The claims that failed in a row, to back off while they fail.
+        self._failures = 0
+        self._scheduler: AsyncIOScheduler | None = None
+        self._dispatching: Set[Task[None]] = set()
+        self._ready = False
+
+    @property
+    def pending(self) -> int:
+        """The number of jobs held in memory."""
+
+        return len(self._wheel)
+
+    def set_handler(
+        self,
+        kind: str,
+        handler: Callable[[ScheduledJob], Awaitable[Any]] | None,
+    ) -> None:
+        """Set, or remove, the handler of a kind of job."""
+
+        if handler is None:
+            self._handlers.pop(kind, None)
+
+        else:
+            self._handlers[kind] = handler
+
+    async def _pool(self) -> Pool:
+        pool = await self._database.pool()
+
+        if not self._ready:
+            await pool.execute(SCHEMA)
+            self._ready = True
+
+        return pool
+
+    async def schedule(
+        self,
+        kind: str,
+        due_at: datetime,
+        payload: Dict[str, Any] | None = None,
+    ) -> int:
+        """Schedule a job. Returns its ID."""
+
+        pool = await self._pool()
+        job_id: int = await pool.fetchval(
+            "INSERT INTO scheduled_jobs (kind, due_at, payload) "
+            "VALUES ($1, $2, $3) RETURNING id",
+            kind,
+            due_at,
+            json.dumps(payload or {}),
+        )
+        # Processes that already loaded this window need to hold it.
+        await self._database.notify(
+            self.channel,
+            f"{job_id}:{due_at.timestamp()}",
+        )
+
+        return job_id
+
+    async def cancel(self, job_id: int) -> bool:
+        """Cancel a job. Returns whether it was still pending."""
+
+        self._wheel.remove(job_id)
+        pool = await self._pool()
+        status = await pool.execute(
+            "DELETE FROM scheduled_jobs WHERE id = $1",
+            job_id,
+        )
+
+        return status.endswith(" 1")
+
+    async def start(self) -> None:
+        """Load the jobs due soon, and start running them."""
+
+        if self._scheduler is not None:
+            return
+
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        await self._database.listen(self.channel, self._on_notification)
+        await self._load()
+        self._scheduler = AsyncIOScheduler(timezone=timezone.utc)
+        self._scheduler.add_job(
+            self._tick,
+            "interval",
+            seconds=self._resolution,
+            coalesce=True,
+            max_instances=1,
+        )
+        self._scheduler.add_job(
+            self._load,
+            "interval",
+            seconds=self._horizon / 2,
+            coalesce=True,
+            max_instances=1,
+        )
+        self._scheduler.start()
+        self.logger.info("Started with %s jobs due soon.", self.pending)
+
+    async def stop(self) -> None:
+        """Stop running jobs, waiting for those being dispatched."""
+
+        if self._scheduler is None:
+            return
+
+        self._scheduler.shutdown(wait=False)
+        self._scheduler = None
+        await gather(*self._dispatching, return_exceptions=True)
+        # Jobs still pending are loaded from the store again on start.
+        self._wheel = TimerWheel(self._resolution)
+
+    def _on_notification(
+        self,
+        _: Connection,
+        __: int,
+        ___: str,
+        payload: str,
+    ) -> None:
+        job_id, due = payload.split(":")
+
+        # Holding a job twice is harmless, as adding it again replaces it.
+        if self._scheduler is not None and float(due) < time() + self._horizon:
+            self._wheel.add(int(job_id), float(due))
+
+    async def _load(self) -> None:
+        until = datetime.now(timezone.utc) + timedelta(seconds=self._horizon)
+        pool = await self._pool()
+        # Every job due before the horizon, not just the new window, picks up
+        # those that fell due while the bot was down, whose notification was
+        # missed, or whose claim failed; the wheel holds each job once.
+        rows = await pool.fetch(
+            "SELECT id, due_at FROM scheduled_jobs WHERE due_at < $1",
+            until,
+        )
+
+        for row in rows:
+            self._wheel.add(row["id"], row["due_at"].timestamp())
+
+    async def _tick(self) -> None:
+        due = self._wheel.advance()
+
+        while due:
+            batch = due[: self._batch_size]
+            del due[: self._batch_size]
+            task = ensure_future(self._dispatch(batch))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, job_ids: List[Hashable]) -> None:
+        try:
+            pool = await self._pool()
+            # Claim the jobs before running them, so they never run twice.
+            rows = await pool.fetch(
+                "DELETE FROM scheduled_jobs WHERE id = ANY($1::BIGINT[]) "
+                "AND kind = ANY($2::TEXT[]) "
+                "RETURNING id, kind, due_at, payload",
+                job_ids,
+                list(self._handlers),
+            )
+
+        except Exception:
+            self._failures += 1
+            delay = min(self._resolution * 2**self._failures, 60.0)
+            self.logger.warning(
+                "Could not claim %s jobs, retrying in %.1fs.",
+                len(job_ids),
+                delay,
+                exc_info=True,
+            )
+
+            # The jobs are still stored, so they are held again.
+            for job_id in job_ids:
+                self._wheel.add(job_id, time() + delay)
+
+            return
+
+        self._failures = 0
+        jobs = [
+            ScheduledJob(
+                row["id"],
+                row["kind"],
+                row["due_at"],
+                json.loads(row["payload"]),
+            )
+            for row in rows
+        ]
+
+        if self._metrics is not None:
+            self._metrics.increment("scheduler.fired", len(jobs))
+            now = time()
+
+            for job in jobs:
+                self._metrics.histogram("scheduler.delay").observe(
+                    max(0.0, now - job.due_at.timestamp()),
+                )
+
+        await gather(*map(self._run, jobs))
+
+    async def _run(self, job: ScheduledJob) -> None:
+        try:
+            if (handler := self._handlers.get(job.kind)) is not None:
+                await handler(job)
+                return
+
+            # Removed since the job was claimed; keep it until one is set.
+            self.logger.warning("No handler for %s job %s.", job.kind, job.id)
+            pool = await self._pool()
+            await pool.execute(
+                "INSERT INTO scheduled_jobs (id, kind, due_at, payload) "
+                "VALUES ($1, $2, $3, $4)",
+                job.id,
+                job.kind,
+                job.due_at,
+                json.dumps(job.payload),
+            )
+
+        except Exception:
+            self.logger.exception("Job %s (%s) failed.", job.id, job.kind)
+
+
+__all__: Final = ("ScheduledJob", "Scheduler", "TimerWheel")
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from asyncio import get_running_loop
+from collections import OrderedDict
+from logging import getLogger
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from asyncio import Future
+    from typing import Any, Dict, Final
+
+    from asyncpg import Connection, Pool  # type: ignore
+
+    from .database import Database
+    from .metrics import Metrics
+
+SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id BIGINT PRIMARY KEY,
+    default_volume INTEGER NOT NULL DEFAULT 100,
+    max_queue_length INTEGER NOT NULL DEFAULT 500,
+    dj_role_id BIGINT
+);
+"""
+
+
+class GuildSettings(NamedTuple):
+    """A guild's settings."""
+
+    default_volume: int = 100
+    max_queue_length: int = 500
+    dj_role_id: int | None = None
+
+
+class SettingsCache:
+    """
+    Every guild's :class:`GuildSettings`, read through a bounded LRU cache.
+    Concurrent loads of the same guild share a single query, and updates
+    evict the guild from the cache of every process through LISTEN/NOTIFY.
+    Until the process listens for those, or while the connection receiving
+    them is lost, nothing is cached, so that it never serves settings
+    another process changed.
+    """
+
+    __slots__ = (
+        "_database",
+        "_metrics",
+        "_capacity",
+        "_cache",
+        "_loading",
+        "_listening",
+        "_ready",
+    )
+    channel = "guild_settings"
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        database: Database,
+        metrics: Metrics | None = None,
+        *,
+        capacity: int = 10_000,
+    ) -> None:
+        self._database = database
+        self._metrics = metrics
+        self._capacity = capacity
+        self._cache: OrderedDict[int, GuildSettings] = OrderedDict()
+        self._loading: Dict[int, Future[GuildSettings]] = {}
+        self._listening = False
+        self._ready = False
+
+    async def _pool(self) -> Pool:
+        pool = await self._database.pool()
+
+        if not self._ready:
+            await pool.execute(SCHEMA)
+            self._ready = True
+
+        return pool
+
+    async def start(self) -> None:
+        """Start following other processes' updates, and caching."""
+
+        if self._listening:
+            return
+
+        await self._database.listen(
+            self.channel,
+            self._on_notification,
+            missed=self.clear,
+        )
+        self._listening = True
+
+    def stop(self) -> None:
+        """Stop caching, e.g. as the database connection is closing."""
+
+        self._listening = False
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every guild's settings."""
+
+        self._cache.clear()
+        # Loads in flight may have read changed settings; do not cache them.
+        self._loading.clear()
+
+    def _on_notification(
+        self,
+        _: Connection,
+        __: int,
+        ___: str,
+        payload: str,
+    ) -> None:
+        self.invalidate(int(payload))
+
+    def invalidate(self, guild_id: int) -> None:
+        """Forget a guild's settings, so the next read loads them again."""
+
+        self._cache.pop(guild_id, None)
+        # A load in flight may have read the old settings; do not cache it.
+        self._loading.pop(guild_id, None)
+
+    def cached(self, guild_id: int) -> GuildSettings | None:
+        """A guild's settings, if cached."""
+
+        if (settings := self._cache.get(guild_id)) is not None:
+            self._cache.move_to_end(guild_id)
+
+        return settings
+
+    async def get(self, guild_id: int) -> GuildSettings:
+        """A guild's settings, loading them if they are not cached."""
+
+        if (settings := self.cached(guild_id)) is not None:
+            return settings
+
+        if (future := self._loading.get(guild_id)) is not None:
+            return await future
+
+        if self._metrics is not None:
+            self._metrics.increment("settings.misses")
+
+        future = self._loading[guild_id] = get_running_loop().create_future()
+
+        try:
+            settings = await self._load(guild_id)
+
+        except BaseException as exc:
+            if self._loading.get(guild_id) is future:
+                del self._loading[guild_id]
+
+            future.set_exception(exc)
+            # Retrieve it, so that an unawaited future does not warn.
+            future.exception()
+            raise
+
+        if self._loading.get(guild_id) is future:
+            del self._loading[guild_id]
+
+            if self._listening and self._database.listening:
+                self._cache[guild_id] = settings
+
+                if len(self._cache) > self._capacity:
+                    self._cache.popitem(last=False)
+
+        future.set_result(settings)
+
+        return settings
+
+    async def _load(self, guild_id: int) -> GuildSettings:
+        pool = await self._pool()
+        row = await pool.fetchrow(
+            "SELECT default_volume, max_queue_length, dj_role_id "
+            "FROM guild_settings WHERE guild_id = $1",
+            int(guild_id),
+        )
+
+        return GuildSettings() if row is None else GuildSettings(*row)
+
+    async def update(self, guild_id: int, **changes: Any) -> GuildSettings:
+        """Change some of a guild's settings. Returns the new settings."""
+
+        if unknown := changes.keys() - GuildSettings._fields:
+            raise ValueError(f"Unknown settings: {', '.join(unknown)}")
+
+        columns = ", ".join(changes)
+        values = ", ".join(f"${index}" for index in range(2, len(changes) + 2))
+        updates = ", ".join(
+            f"{column} = excluded.{column}" for column in changes
+        )
+        pool = await self._pool()
+        # Only the changed columns are written, so that concurrent updates
+        # of different settings do not overwrite each other.
+        await pool.execute(
+            f"INSERT INTO guild_settings (guild_id, {columns}) "  # nosec
+            f"VALUES ($1, {values}) "
+            f"ON CONFLICT (guild_id) DO UPDATE SET {updates}",
+            int(guild_id),
+            *changes.values(),
+        )
+        self.invalidate(guild_id)
+        await self._database.notify(self.channel, str(int(guild_id)))
+
+        return await self.get(guild_id)
+
+
+__all__: Final = ("GuildSettings", "SettingsCache")
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Dict, Final, Iterator
+
+
+class StartupTimer:
+    """Records how long each phase of the bot's startup takes."""
+
+    __slots__ = ("_phases", "_started_at", "_last_mark")
+
+    def __init__(self) -> None:
+        self._phases: Dict[str, float] = {}
+        self._started_at = self._last_mark = perf_counter()
+
+    @property
+    def phases(self) -> Dict[str, float]:
+        """The recorded phases, in seconds, in the order they finished."""
+
+        return dict(self._phases)
+
+    @property
+    def total(self) -> float:
+        """The time elapsed since the timer was created, in seconds."""
+
+        return self._last_mark - self._started_at
+
+    def mark(self, name: str) -> float:
+        """Record the time elapsed since the previous mark as a phase."""
+
+        now = perf_counter()
+        elapsed = self._phases[name] = now - self._last_mark
+        self._last_mark = now
+
+        return elapsed
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the time spent inside the ``with`` block as a phase."""
+
+        started_at = perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self._last_mark = perf_counter()
+            self._phases[name] = self._last_mark - started_at
+
+    def report(self) -> str:
+        """Render the phases as a single human-readable line."""
+
+        phases = ", ".join(
+            f"{name}={elapsed * 1000:.1f}ms"
+            for name, elapsed in self._phases.items()
+        )
+
+        return f"{self.total * 1000:.1f}ms ({phases})"
+
+
+__all__: Final = ("StartupTimer",)
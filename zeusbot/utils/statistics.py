@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+from asyncio import (
+    CancelledError,
+    Event,
+    TimeoutError,
+    get_running_loop,
+    sleep,
+    wait_for,
+)
+from collections import Counter, deque
+from datetime import datetime, timezone
+from logging import getLogger
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from typing import Any, Deque, Dict, Final, List, Tuple
+
+    from asyncpg import Record  # type: ignore
+
+    from .database import Database
+    from .metrics import Metrics
+    from .player import PlayerEvent
+
+SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS statistics_events (
+    kind TEXT NOT NULL,
+    guild_id BIGINT NOT NULL,
+    user_id BIGINT,
+    subject TEXT,
+    detail TEXT,
+    occurred_at TIMESTAMPTZ NOT NULL
+);
+CREATE TABLE IF NOT EXISTS track_plays (
+    guild_id BIGINT NOT NULL,
+    identifier TEXT NOT NULL,
+    title TEXT NOT NULL,
+    plays BIGINT NOT NULL,
+    last_played_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (guild_id, identifier)
+);
+CREATE INDEX IF NOT EXISTS track_plays_by_plays
+    ON track_plays (guild_id, plays DESC);
+CREATE TABLE IF NOT EXISTS command_uses (
+    guild_id BIGINT NOT NULL,
+    command TEXT NOT NULL,
+    uses BIGINT NOT NULL,
+    PRIMARY KEY (guild_id, command)
+);
+CREATE TABLE IF NOT EXISTS voice_joins (
+    guild_id BIGINT NOT NULL,
+    user_id BIGINT NOT NULL,
+    joins BIGINT NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+"""
+_UPSERT_TRACK_PLAYS: Final = """
+INSERT INTO track_plays AS t (
+    guild_id, identifier, title, plays, last_played_at
+)
+VALUES ($1, $2, $3, $4, $5)
+ON CONFLICT (guild_id, identifier) DO UPDATE
+SET title = excluded.title,
+    plays = t.plays + excluded.plays,
+    last_played_at = GREATEST(t.last_played_at, excluded.last_played_at)
+"""
+_UPSERT_COMMAND_USES: Final = """
+INSERT INTO command_uses AS t (guild_id, command, uses)
+VALUES ($1, $2, $3)
+ON CONFLICT (guild_id, command) DO UPDATE SET uses = t.uses + excluded.uses
+"""
+_UPSERT_VOICE_JOINS: Final = """
+INSERT INTO voice_joins AS t (guild_id, user_id, joins)
+VALUES ($1, $2, $3)
+ON CONFLICT (guild_id, user_id) DO UPDATE SET joins = t.joins + excluded.joins
+"""
+
+
+class StatisticsEvent(NamedTuple):
+    """A recorded event, as a row of ``statistics_events``."""
+
+    kind: str
+    guild_id: int
+    user_id: int | None
+    subject: str | None
+    detail: str | None
+    occurred_at: datetime
+
+
+class Statistics:
+    """
+    Records play history and usage statistics into PostgreSQL.
+    Events are appended to a bounded in-memory buffer and written behind,
+    in batches, by a background task, so recording never waits on the
+    database. When the database falls behind the buffer drops its oldest
+    events, which are counted in ``statistics.dropped``. Every batch also
+    updates the rollup tables that aggregate queries read from.
+    """
+
+    __slots__ = (
+        "_database",
+        "_metrics",
+        "_buffer",
+        "_batch_size",
+        "_interval",
+        "_wake",
+        "_task",
+        "_schema_ready",
+    )
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        database: Database,
+        metrics: Metrics | None = None,
+        *,
+        capacity: int = 100_000,
+        batch_size: int = 1_000,
+        interval: float = 5.0,
+    ) -> None:
+        self._database = database
+        self._metrics = metrics
+        self._buffer: Deque[StatisticsEvent] = deque(maxlen=capacity)
+        self._batch_size = batch_size
+        self._interval = interval
+        self._wake: Event | None = None
+        self._task: Task[None] | None = None
+        self._schema_ready = False
+
+    @property
+    def pending(self) -> int:
+        """The number of events waiting to be written."""
+
+        return len(self._buffer)
+
+    def record(
+        self,
+        kind: str,
+        guild_id: int | None,
+        user_id: int | None = None,
+        subject: str | None = None,
+        detail: str | None = None,
+    ) -> None:
+        """Record an event, without waiting for it to be written."""
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self._dropped(1)
+
+        self._buffer.append(
+            StatisticsEvent(
+                kind,
+                int(guild_id or 0),
+                None if user_id is None else int(user_id),
+                subject,
+                detail,
+                datetime.now(timezone.utc),
+            )
+        )
+
+        if self._wake is not None and len(self._buffer) >= self._batch_size:
+            self._wake.set()
+
+    def player_event(self, event: PlayerEvent) -> None:
+        """Record the tracks started and ended by a music player."""
+
+        if event.kind not in ("start", "end") or event.track is None:
+            return
+
+        self.record(
+            f"track_{event.kind}",
+            event.guild_id,
+            event.track.requester,
+            event.track.identifier,
+            event.track.title if event.kind == "start" else event.reason,
+        )
+
+    def _dropped(self, count: int) -> None:
+        if self._metrics is not None:
+            self._metrics.increment("statistics.dropped", count)
+
+    def start(self) -> None:
+        """Start writing events in the background."""
+
+        if self._task is not None:
+            return
+
+        self._wake = Event()
+        self._task = get_running_loop().create_task(self._flush_forever())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop writing in the background, and flush what is left."""
+
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        try:
+            await self._task
+
+        except CancelledError:
+            pass
+
+        self._task = None
+        self._wake = None
+
+        try:
+            await wait_for(self.flush(), timeout)
+
+        except Exception:
+            self.logger.warning(
+                "Could not flush %s events on stop.",
+                len(self._buffer),
+                exc_info=True,
+            )
+
+    async def _flush_forever(self) -> None:
+        assert self._wake is not None
+        delay = self._interval
+
+        while True:
+            try:
+                await wait_for(self._wake.wait(), self._interval)
+
+            except TimeoutError:
+                pass
+
+            self._wake.clear()
+
+            try:
+                await self.flush()
+                delay = self._interval
+
+            except Exception:
+                delay = min(delay * 2, 60.0)
+                self.logger.warning(
+                    "Could not flush statistics, retrying in %.1fs.",
+                    delay,
+                    exc_info=True,
+                )
+                # Back off while the database is unavailable; events keep
+                # being recorded into the buffer meanwhile.
+                await sleep(delay)
+
+    async def flush(self) -> int:
+        """Write every buffered event. Returns the number written."""
+
+        written = 0
+
+        while self._buffer:
+            batch = [
+                self._buffer.popleft()
+                for _ in range(min(self._batch_size, len(self._buffer)))
+            ]
+
+            try:
+                await self._write(batch)
+
+            except BaseException:
+                self._requeue(batch)
+                raise
+
+            written += len(batch)
+
+        return written
+
+    def _requeue(self, batch: List[StatisticsEvent]) -> None:
+        assert self._buffer.maxlen is not None
+        room = self._buffer.maxlen - len(self._buffer)
+
+        if room < len(batch):
+            # Keep dropping the oldest events, not the ones recorded since.
+            self._dropped(len(batch) - room)
+            batch = batch[-room:] if room else []
+
+        self._buffer.extendleft(reversed(batch))
+
+    async def _write(self, batch: List[StatisticsEvent]) -> None:
+        started_at = perf_counter()
+        pool = await self._database.pool()
+
+        async with pool.acquire() as connection:
+            if not self._schema_ready:
+                await connection.execute(SCHEMA)
+                self._schema_ready = True
+
+            async with connection.transaction():
+                await connection.copy_records_to_table(
+                    "statistics_events",
+                    records=batch,
+                    columns=StatisticsEvent._fields,
+                )
+
+                for query, rows in self._rollups(batch):
+                    if rows:
+                        await connection.executemany(query, rows)
+
+        if self._metrics is not None:
+            self._metrics.increment("statistics.written", len(batch))
+            self._metrics.histogram("statistics.flush").observe(
+                perf_counter() - started_at,
+            )
+
+    @staticmethod
+    def _rollups(
+        batch: List[StatisticsEvent],
+    ) -> List[Tuple[str, List[Tuple[Any, ...]]]]:
+        plays: Counter[Tuple[int, str]] = Counter()
+        latest: Dict[Tuple[int, str], StatisticsEvent] = {}
+        uses: Counter[Tuple[int, str]] = Counter()
+        joins: Counter[Tuple[int, int]] = Counter()
+
+        for event in batch:
+            if event.kind == "track_start" and event.subject:
+                key = (event.guild_id, event.subject)
+                plays[key] += 1
+                latest[key] = event
+
+            elif event.kind == "command" and event.subject:
+                uses[event.guild_id, event.subject] += 1
+
+            elif event.kind == "voice_join" and event.user_id is not None:
+                joins[event.guild_id, event.user_id] += 1
+
+        return [
+            (
+                _UPSERT_TRACK_PLAYS,
+                [
+                    (
+                        *key,
+                        latest[key].detail or "",
+                        count,
+                        latest[key].occurred_at,
+                    )
+                    for key, count in plays.items()
+                ],
+            ),
+            (
+                _UPSERT_COMMAND_USES,
+                [(*key, count) for key, count in uses.items()],
+            ),
+            (
+                _UPSERT_VOICE_JOINS,
+                [(*key, count) for key, count in joins.items()],
+            ),
+        ]
+
+    async def top_tracks(self, guild_id: int, limit: int = 10) -> List[Record]:
+        """The guild's most played tracks, from the ``track_plays`` rollup."""
+
+        pool = await self._database.pool()
+
+        return await pool.fetch(
+            "SELECT identifier, title, plays, last_played_at "
+            "FROM track_plays WHERE guild_id = $1 "
+            "ORDER BY plays DESC LIMIT $2",
+            int(guild_id),
+            limit,
+        )
+
+    async def top_commands(
+        self,
+        guild_id: int,
+        limit: int = 10,
+    ) -> List[Record]:
+        """The guild's most used commands, from the ``command_uses`` rollup."""
+
+        pool = await self._database.pool()
+
+        return await pool.fetch(
+            "SELECT command, uses FROM command_uses WHERE guild_id = $1 "
+            "ORDER BY uses DESC LIMIT $2",
+            int(guild_id),
+            limit,
+        )
+
+
+__all__: Final = ("Statistics", "StatisticsEvent")
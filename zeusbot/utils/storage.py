@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import Config
+
+if TYPE_CHECKING:
+    from typing import Any, Final
+
+
+class LocalStorage:
+    """
+    Small documents persisted on the local disk, under ``Config.DATA_PATH``.
+    Writes are atomic, so a crash mid-write never leaves a torn document.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, root: str | Path | None = None) -> None:
+        self._root = Path(
+            root or Path(__file__).parent.parent.parent / Config.DATA_PATH,
+        )
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def path(self, name: str) -> Path:
+        """Get the path of a document."""
+
+        return self._root / name
+
+    def read_bytes(self, name: str) -> bytes | None:
+        """Read a binary document, or ``None`` if it does not exist."""
+
+        try:
+            return self.path(name).read_bytes()
+
+        except FileNotFoundError:
+            return None
+
+    def write_bytes(self, name: str, data: bytes) -> None:
+        """Atomically replace a binary document."""
+
+        path = self.path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+    def read_json(self, name: str, default: Any = None) -> Any:
+        """Read a JSON document, or ``default`` if it does not exist."""
+
+        if (data := self.read_bytes(name)) is None:
+            return default
+
+        return json.loads(data)
+
+    def write_json(self, name: str, document: Any) -> None:
+        """Atomically replace a JSON document."""
+
+        self.write_bytes(
+            name,
+            json.dumps(document, separators=(",", ":")).encode(),
+        )
+
+    def delete(self, name: str) -> None:
+        """Delete a document, if it exists."""
+
+        self.path(name).unlink(missing_ok=True)
+
+
+__all__: Final = ("LocalStorage",)
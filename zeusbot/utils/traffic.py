@@ -0,0 +1,537 @@
+from __future__ import annotations
+
+import gzip
+import json
+from asyncio import (
+    CancelledError,
+    all_tasks,
+    current_task,
+    ensure_future,
+    get_running_loop,
+    shield,
+    sleep,
+    to_thread,
+    wait,
+)
+from logging import getLogger
+from time import monotonic, process_time, time
+from typing import TYPE_CHECKING, NamedTuple
+
+from hikari import ExceptionEvent
+
+if TYPE_CHECKING:
+    from asyncio import Future, Task
+    from typing import Any, Dict, Final, Iterator, List
+
+    from hikari import GatewayBotAware
+    from lavaplayer import Track  # type: ignore
+
+    from .metrics import Metrics
+    from .music import MusicUtility
+
+GATEWAY: Final = "gateway"
+LAVALINK: Final = "lavalink"
+# The strings kept besides IDs; they name what happened, not what was said.
+_KEPT_STRINGS: Final = frozenset(("op", "t", "type", "reason", "status"))
+# The objects whose names are kept: interactions' commands and options.
+_NAMED: Final = frozenset(("data", "options"))
+# The option types of subcommands, which have options instead of a value.
+_SUBCOMMANDS: Final = frozenset((1, 2))
+_DROPPED: Final = object()
+_TIMESTAMP: Final = "2022-01-01T00:00:00+00:00"
+
+
+def strip(value: Any, key: str = "", parent: str = "") -> Any:
+    """
+    Strip a payload down to its IDs, numbers, flags and event names, and
+    the names of the commands and options used, so that no message content,
+    user's name or token is ever recorded.
+    """
+
+    if isinstance(value, dict):
+        return {
+            k: stripped
+            for k, v in value.items()
+            if (stripped := strip(v, k, key)) is not _DROPPED
+        }
+
+    if isinstance(value, list):
+        return [
+            stripped
+            for item in value
+            if (stripped := strip(item, key, parent)) is not _DROPPED
+        ]
+
+    if not isinstance(value, str):
+        return value
+
+    if (
+        key in _KEPT_STRINGS
+        or key == "id"
+        or key.endswith(("_id", "_ids", "Id"))
+        or (key == "name" and parent in _NAMED)
+    ):
+        return value
+
+    return _DROPPED
+
+
+class Frame(NamedTuple):
+    """A recorded gateway dispatch or Lavalink frame."""
+
+    at: float
+    source: str
+    name: str
+    payload: Dict[str, Any]
+
+
+def read_frames(path: str) -> Iterator[Frame]:
+    """Read the frames recorded in a file, in order."""
+
+    # Every flush appends a gzip member, which gzip reads back as one.
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield Frame(*json.loads(line))
+
+
+class TrafficRecorder:
+    """
+    Records inbound gateway dispatches and Lavalink frames, stripped of
+    their content, to an append-only gzip file of JSON lines. Frames are
+    buffered on the event loop and compressed on a thread, once a second.
+    The buffer is bounded, and frames are dropped if writing falls behind.
+    """
+
+    __slots__ = (
+        "_path",
+        "_metrics",
+        "_interval",
+        "_capacity",
+        "_buffer",
+        "_task",
+        "_writing",
+    )
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        path: str,
+        metrics: Metrics | None = None,
+        *,
+        interval: float = 1.0,
+        capacity: int = 100_000,
+    ) -> None:
+        self._path = path
+        self._metrics = metrics
+        self._interval = interval
+        self._capacity = capacity
+        self._buffer: List[str] = []
+        self._task: Task[None] | None = None
+        self._writing: Future[None] | None = None
+
+    @property
+    def recording(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start recording; must be called from the event loop."""
+
+        if self._task is None:
+            self._task = get_running_loop().create_task(self._flush_loop())
+            self.logger.info("Recording traffic to %s.", self._path)
+
+    async def stop(self) -> None:
+        """Stop recording, writing the frames still buffered."""
+
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        try:
+            await self._task
+
+        except CancelledError:
+            pass
+
+        self._task = None
+        await self.flush()
+
+    def record(self, source: str, name: str, payload: Any) -> None:
+        """Record a frame, if recording."""
+
+        if self._task is None:
+            return
+
+        if len(self._buffer) >= self._capacity:
+            if self._metrics is not None:
+                self._metrics.increment("traffic.dropped")
+
+            return
+
+        self._buffer.append(
+            json.dumps(
+                (round(time(), 3), source, name, strip(payload)),
+                separators=(",", ":"),
+            )
+        )
+
+    async def flush(self) -> None:
+        """Write the buffered frames."""
+
+        # A write outlives the flush cancelled while awaiting it, as stopping
+        # does; the next waits for it, so that their gzip members never mix.
+        if self._writing is not None and not self._writing.done():
+            await shield(self._writing)
+
+        if not self._buffer:
+            return
+
+        lines, self._buffer = self._buffer, []
+        self._writing = ensure_future(to_thread(self._write, lines))
+        await shield(self._writing)
+
+        if self._metrics is not None:
+            self._metrics.increment("traffic.recorded", len(lines))
+
+    def _write(self, lines: List[str]) -> None:
+        with gzip.open(self._path, "at", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await sleep(self._interval)
+
+            try:
+                await self.flush()
+
+            except OSError:
+                self.logger.exception("Could not write the traffic.")
+
+
+def _merge(template: Any, value: Any) -> Any:
+    if isinstance(template, dict) and isinstance(value, dict):
+        return {
+            **template,
+            **{k: _merge(template.get(k), v) for k, v in value.items()},
+        }
+
+    return value
+
+
+def _user() -> Dict[str, Any]:
+    return {
+        "id": "0",
+        "username": "user",
+        "discriminator": "0001",
+        "avatar": None,
+    }
+
+
+def _member() -> Dict[str, Any]:
+    return {
+        "user": _user(),
+        "roles": [],
+        "joined_at": _TIMESTAMP,
+        "deaf": False,
+        "mute": False,
+    }
+
+
+def _interaction_member() -> Dict[str, Any]:
+    return {**_member(), "permissions": "0"}
+
+
+def _role() -> Dict[str, Any]:
+    return {
+        "name": "role",
+        "color": 0,
+        "hoist": False,
+        "position": 0,
+        "permissions": "0",
+        "managed": False,
+        "mentionable": False,
+    }
+
+
+def _interaction() -> Dict[str, Any]:
+    return {
+        "member": _interaction_member(),
+        "token": "replay",
+        "locale": "en-US",
+        "version": 1,
+        "data": {},
+    }
+
+
+# Stand-ins for the objects an interaction's options resolve to.
+_RESOLVED_TEMPLATES: Final = {
+    "users": _user,
+    "members": _interaction_member,
+    "roles": _role,
+    "channels": lambda: {"name": "channel", "permissions": "0"},
+}
+
+
+def _stand_in_options(options: List[Dict[str, Any]]) -> None:
+    for option in options:
+        if "options" in option:
+            _stand_in_options(option["options"])
+
+        elif "value" not in option and option.get("type") not in _SUBCOMMANDS:
+            # String values are not recorded; "0" stands in for the text and
+            # IDs alike, while numbers and flags are recorded.
+            option["value"] = "0"
+
+
+def _stand_in_interaction(payload: Dict[str, Any]) -> None:
+    """Stand in for the option values and resolved objects not recorded."""
+
+    data = payload["data"]
+    _stand_in_options(data.get("options", []))
+
+    if resolved := data.get("resolved"):
+        data["resolved"] = {
+            kind: {
+                key: _merge(template(), value)
+                for key, value in resolved.get(kind, {}).items()
+            }
+            for kind, template in _RESOLVED_TEMPLATES.items()
+        }
+
+
+def _message() -> Dict[str, Any]:
+    return {
+        "id": "0",
+        "channel_id": "0",
+        "author": _user(),
+        "member": _member(),
+        "content": "",
+        "timestamp": _TIMESTAMP,
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+        "flags": 0,
+    }
+
+
+# Stand-ins for the fields a recording leaves out, which hikari needs to
+# deserialize the dispatches the bot handles.
+_GATEWAY_TEMPLATES: Final = {
+    "MESSAGE_CREATE": _message,
+    "MESSAGE_UPDATE": _message,
+    "MESSAGE_DELETE": dict,
+    "MESSAGE_DELETE_BULK": dict,
+    "TYPING_START": lambda: {"timestamp": 0, "member": _member()},
+    "GUILD_MEMBER_UPDATE": _member,
+    "MESSAGE_REACTION_ADD": lambda: {
+        "member": _member(),
+        "emoji": {"id": None, "name": "\N{THUMBS UP SIGN}"},
+    },
+    "MESSAGE_REACTION_REMOVE": lambda: {
+        "emoji": {"id": None, "name": "\N{THUMBS UP SIGN}"},
+    },
+    "PRESENCE_UPDATE": lambda: {
+        "status": "online",
+        "activities": [],
+        "client_status": {},
+    },
+    "VOICE_STATE_UPDATE": lambda: {
+        "member": _member(),
+        "session_id": "replay",
+        "deaf": False,
+        "mute": False,
+        "self_deaf": False,
+        "self_mute": False,
+        "self_video": False,
+        "suppress": False,
+        "request_to_speak_timestamp": None,
+    },
+    "VOICE_SERVER_UPDATE": lambda: {
+        "token": "replay",
+        "endpoint": "localhost",
+    },
+    "INTERACTION_CREATE": _interaction,
+}
+# The interactions replayed: application commands, and their autocomplete.
+_REPLAYED_INTERACTIONS: Final = frozenset((2, 4))
+
+
+class ReplayReport(NamedTuple):
+    """How a replay went."""
+
+    frames: int
+    skipped: int
+    errors: int
+    duration: float
+    cpu_time: float
+    max_lateness: float
+
+
+class TrafficReplayer:
+    """
+    Feeds a recording back into a bot and its music utility, at ``speed``
+    times the recorded pace, or as fast as possible with a speed of ``0``.
+
+    Gateway dispatches go through the bot's event manager, with stand-ins
+    for the fields that were not recorded; those without a stand-in, like
+    component interactions, are skipped. Lavalink frames go through
+    lavaplayer's own handling, with a local stand-in for its websocket and
+    track decoding, so no Discord or Lavalink connection is needed.
+    """
+
+    __slots__ = ("_bot", "_speed", "_shard", "_socket")
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        bot: GatewayBotAware,
+        music: MusicUtility,
+        *,
+        speed: float = 1.0,
+    ) -> None:
+        from lavaplayer.websocket import WS  # type: ignore
+
+        self._bot = bot
+        self._speed = speed
+        self._shard = _StandInShard()
+        lavalink = music.lavalink
+        lavalink.set_event_loop(get_running_loop())
+        # Stand in for the websocket, and the REST route decoding tracks.
+        self._socket = WS(lavalink, "localhost", 0)
+        self._socket.send = self._discard
+        lavalink._ws = self._socket
+        lavalink.decodetrack = self._decode_track
+
+    async def _discard(self, _: Dict[str, Any]) -> None:
+        pass
+
+    async def _decode_track(self, encoded: str) -> Track:
+        from lavaplayer import Track
+
+        return Track(
+            track=encoded,
+            identifier=encoded,
+            is_seekable=True,
+            author="",
+            length=180_000,
+            is_stream=False,
+            position=0,
+            title="",
+            uri="",
+        )
+
+    async def replay(self, path: str) -> ReplayReport:
+        """Replay the frames recorded in a file."""
+
+        loop = get_running_loop()
+        running = all_tasks()
+        errors: List[Dict[str, Any]] = []
+        handler = loop.get_exception_handler()
+        loop.set_exception_handler(lambda _, context: errors.append(context))
+
+        async def on_error(event: ExceptionEvent[Any]) -> None:
+            errors.append({"exception": event.exception})
+            self.logger.error(
+                "Replaying %s failed.",
+                type(event.failed_event).__name__,
+                exc_info=event.exc_info,
+            )
+
+        self._bot.event_manager.subscribe(ExceptionEvent, on_error)
+        frames = skipped = 0
+        max_lateness = 0.0
+        first_at: float | None = None
+        started_at = monotonic()
+        cpu_started_at = process_time()
+
+        try:
+            for frame in read_frames(path):
+                first_at = frame.at if first_at is None else first_at
+
+                if self._speed:
+                    due = started_at + (frame.at - first_at) / self._speed
+
+                    if (delay := due - monotonic()) > 0:
+                        await sleep(delay)
+
+                    max_lateness = max(max_lateness, monotonic() - due)
+
+                if self._feed(frame):
+                    frames += 1
+
+                else:
+                    skipped += 1
+
+                # Let the handlers run, as they would between frames.
+                await sleep(0)
+
+            # Wait for the handlers of the last frames.
+            if pending := all_tasks() - running - {current_task()}:
+                await wait(pending, timeout=10)
+
+        finally:
+            loop.set_exception_handler(handler)
+            self._bot.event_manager.unsubscribe(ExceptionEvent, on_error)
+
+        return ReplayReport(
+            frames,
+            skipped,
+            len(errors),
+            monotonic() - started_at,
+            process_time() - cpu_started_at,
+            max_lateness,
+        )
+
+    def _feed(self, frame: Frame) -> bool:
+        if frame.source == LAVALINK:
+            payload = frame.payload
+
+            if payload.get("op") == "event":
+                # The track is not recorded; any string stands in for it.
+                payload = {**payload, "track": "replay"}
+
+            get_running_loop().create_task(self._socket.callback(payload))
+            return True
+
+        if (template := _GATEWAY_TEMPLATES.get(frame.name)) is None:
+            return False
+
+        payload = _merge(template(), frame.payload)
+
+        if frame.name == "INTERACTION_CREATE":
+            if payload.get("type") not in _REPLAYED_INTERACTIONS:
+                return False
+
+            _stand_in_interaction(payload)
+
+        self._bot.event_manager.consume_raw_event(
+            frame.name,
+            self._shard,  # type: ignore
+            payload,
+        )
+        return True
+
+
+class _StandInShard:
+    id = 0
+    shard_count = 1
+
+
+__all__: Final = (
+    "GATEWAY",
+    "LAVALINK",
+    "Frame",
+    "ReplayReport",
+    "TrafficRecorder",
+    "TrafficReplayer",
+    "read_frames",
+    "strip",
+)
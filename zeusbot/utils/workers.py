@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+from asyncio import (
+    Semaphore,
+    TimeoutError,
+    gather,
+    get_running_loop,
+    shield,
+    wait_for,
+)
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging import getLogger
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from time import monotonic
+from typing import TYPE_CHECKING, NamedTuple
+
+from . import Config
+
+if TYPE_CHECKING:
+    from asyncio import Future
+    from typing import Any, Callable, Final, Tuple
+
+    from .metrics import Metrics
+
+    Job = Callable[..., bytes | bytearray | memoryview]
+
+
+class WorkerPoolFullException(Exception):
+    """The exception that is raised when too many jobs are waiting."""
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(f"More than {capacity} jobs are waiting for a worker")
+
+
+class _Shared(NamedTuple):
+    """Bytes passed through shared memory, rather than pickled."""
+
+    name: str
+    size: int
+
+
+def _share(data: bytes) -> _Shared:
+    memory = SharedMemory(create=True, size=max(len(data), 1))
+    memory.buf[: len(data)] = data
+    memory.close()
+
+    return _Shared(memory.name, len(data))
+
+
+def _collect(shared: _Shared, keep: bool = True) -> bytes:
+    memory = SharedMemory(shared.name)
+
+    try:
+        return bytes(memory.buf[: shared.size]) if keep else b""
+
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def _run(
+    job: Job,
+    payload: bytes | _Shared,
+    args: Tuple[Any, ...],
+    threshold: int,
+) -> bytes | _Shared:
+    """Run a job in a worker, passing large bytes through shared memory."""
+
+    if not isinstance(payload, _Shared):
+        with memoryview(payload) as view:
+            result = _bytes(job(view, *args))
+
+    else:
+        memory = SharedMemory(payload.name)
+
+        try:
+            with memory.buf[: payload.size] as view:
+                # Copied before the segment is closed, in case it is a view.
+                result = _bytes(job(view, *args))
+
+        finally:
+            memory.close()
+
+    return _share(result) if len(result) > threshold else result
+
+
+def _bytes(result: Any) -> bytes:
+    if not isinstance(result, (bytes, bytearray, memoryview)):
+        raise TypeError(
+            f"A job must return bytes, not {type(result).__name__}",
+        )
+
+    return bytes(result)
+
+
+def _ping() -> None:
+    pass
+
+
+def _discard(future: Future[bytes | _Shared]) -> None:
+    """Free what a job returns after its caller stopped waiting for it."""
+
+    if future.cancelled() or future.exception() is not None:
+        return
+
+    if isinstance(result := future.result(), _Shared):
+        _collect(result, keep=False)
+
+
+class WorkerPool:
+    """
+    Runs CPU-bound jobs, like rendering images, in a pool of processes, so
+    that they never hold up the event loop.
+
+    A job is a picklable function taking a :class:`memoryview` of
+    the data, and any picklable arguments, and returning bytes. The view is
+    released once the job returns, so it must not be kept; a job that
+    needs :class:`bytes` methods copies it with ``bytes(data)``. Data larger
+    than ``threshold`` is passed through shared memory, copied once each
+    way, rather than pickled into, and out of, the pool's pipes.
+
+    At most ``processes`` jobs run at once, and at most ``capacity`` more
+    wait for a process; beyond that, jobs are rejected with a
+    :class:`WorkerPoolFullException`. A job that takes longer than its
+    ``timeout``, waiting included, raises a :class:`TimeoutError`; a process
+    cannot be interrupted, so its slot is freed once it finishes anyway.
+    After ``recycle_after`` jobs in a row time out, the processes are
+    killed, failing the jobs they run, and replaced; so are they when one
+    dies, which breaks the pool.
+    """
+
+    __slots__ = (
+        "_metrics",
+        "_processes",
+        "_capacity",
+        "_timeout",
+        "_threshold",
+        "_slots",
+        "_waiting",
+        "_executor",
+        "_recycle_after",
+        "_timeouts",
+    )
+    logger = getLogger(__name__)
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        *,
+        processes: int = Config.WORKER_PROCESSES,
+        capacity: int = 64,
+        timeout: float = Config.WORKER_TIMEOUT,
+        threshold: int = 64 * 1024,
+        recycle_after: int = 3,
+    ) -> None:
+        self._metrics = metrics
+        self._processes = processes
+        self._capacity = capacity
+        self._timeout = timeout
+        self._threshold = threshold
+        self._slots = Semaphore(processes)
+        self._waiting = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._recycle_after = recycle_after
+        # The jobs that timed out in a row, likely hung in their processes.
+        self._timeouts = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """
+        The pool's executor; its processes are started on first use.
+        They are spawned, rather than forked from a process with an event
+        loop and threads running. It is kept to :meth:`run`, as hikari only
+        takes a thread pool for its file reads.
+        """
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self._processes,
+                mp_context=get_context("spawn"),
+            )
+
+        return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Kill the processes of a broken or hung executor, to replace it."""
+
+        if self._executor is executor:
+            self._executor = None
+
+        # The executor keeps no public handle on its processes.
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for process in processes:
+            process.terminate()
+
+    def _submit(
+        self,
+        payload: bytes | _Shared,
+        job: Job,
+        args: Tuple[Any, ...],
+    ) -> Tuple[ProcessPoolExecutor, Future[bytes | _Shared]]:
+        loop = get_running_loop()
+        executor = self._pool()
+
+        try:
+            future = loop.run_in_executor(
+                executor,
+                _run,
+                job,
+                payload,
+                args,
+                self._threshold,
+            )
+
+        except BrokenProcessPool:
+            # A process died since the last job; run this one in new ones.
+            self.logger.warning("A worker process died; replacing them.")
+            self._recycle(executor)
+            executor = self._pool()
+            future = loop.run_in_executor(
+                executor,
+                _run,
+                job,
+                payload,
+                args,
+                self._threshold,
+            )
+
+        return executor, future
+
+    def _timed_out(self, executor: ProcessPoolExecutor) -> None:
+        self._timeouts += 1
+
+        if self._timeouts >= self._recycle_after:
+            self.logger.warning(
+                "%s jobs in a row timed out; replacing the worker processes.",
+                self._timeouts,
+            )
+            self._timeouts = 0
+            self._recycle(executor)
+
+    @property
+    def waiting(self) -> int:
+        """The number of jobs waiting for a process."""
+
+        return self._waiting
+
+    async def start(self) -> None:
+        """Start every process, so that the first jobs do not wait for it."""
+
+        started_at = monotonic()
+        loop = get_running_loop()
+        # Processes are started as jobs find none idle.
+        pings = [
+            loop.run_in_executor(self._pool(), _ping)
+            for _ in range(self._processes)
+        ]
+        await wait_for(gather(*pings), 60)
+        self.logger.info(
+            "Started %s worker processes in %.1fms.",
+            self._processes,
+            (monotonic() - started_at) * 1000,
+        )
+
+    def close(self) -> None:
+        """Stop the processes, cancelling the jobs that did not start."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(
+        self,
+        job: Job,
+        data: bytes = b"",
+        *args: Any,
+        timeout: float | None = None,
+    ) -> bytes:
+        """Run ``job(data, *args)`` in a worker process, for its bytes."""
+
+        if self._slots.locked() and self._waiting >= self._capacity:
+            self._metrics.increment("workers.rejected")
+            raise WorkerPoolFullException(self._capacity)
+
+        timeout = self._timeout if timeout is None else timeout
+        started_at = monotonic()
+        self._waiting += 1
+
+        try:
+            await wait_for(self._slots.acquire(), timeout)
+
+        except TimeoutError:
+            self._metrics.increment("workers.timeouts")
+
+            # Every process is busy, and some with jobs that timed out, so
+            # likely hung, rather than merely with a backlog.
+            if self._timeouts and self._executor is not None:
+                self._timed_out(self._executor)
+
+            raise
+
+        finally:
+            self._waiting -= 1
+
+        payload = data if len(data) <= self._threshold else _share(data)
+
+        def finished(_: Future[bytes | _Shared]) -> None:
+            self._slots.release()
+
+            if isinstance(payload, _Shared):
+                _collect(payload, keep=False)
+
+        try:
+            executor, future = self._submit(payload, job, args)
+
+        except BaseException:
+            finished(None)  # type: ignore
+            raise
+
+        future.add_done_callback(finished)
+
+        try:
+            result = await wait_for(
+                shield(future),
+                max(timeout - (monotonic() - started_at), 0),
+            )
+
+        except BaseException as exc:
+            future.add_done_callback(_discard)
+
+            if isinstance(exc, TimeoutError):
+                self._metrics.increment("workers.timeouts")
+                self._timed_out(executor)
+
+            elif (
+                isinstance(exc, BrokenProcessPool)
+                and executor is self._executor
+            ):
+                self.logger.warning("A worker process died; replacing them.")
+                self._recycle(executor)
+
+            raise
+
+        self._timeouts = 0
+
+        self._metrics.histogram("workers.job").observe(
+            monotonic() - started_at,
+        )
+
+        return _collect(result) if isinstance(result, _Shared) else result
+
+
+__all__: Final = ("WorkerPool", "WorkerPoolFullException")